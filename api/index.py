@@ -2,13 +2,14 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import traceback
 import re
-import builtins
 
 # ── COMPILER MODULE IMPORTS ──
 from src.lexer import Lexer
 from src.parser import analyze_syntax
-from src.semantic import analyze_semantics, ASTBuilder
-from src.codegen import CodeGen
+from src.semantic import analyze_program
+from src.codegen import CodeGen, BUILTIN_NAMES
+from src.passes import DEFAULT_LEVEL, LEVELS, memoized_functions
+from src.runtime import runtime_source
 
 app = Flask(__name__)
 
@@ -99,70 +100,75 @@ def print_error_box(error_str, code_text):
 class WebAsyncCodeGen(CodeGen):
     def visit_node_main_func(self, node):
         self.current_function = "lobby"
-        self.generated_code += f"{self.indent()}async def lobby():\n"
+        self.emit("async def lobby():")
         self.indent_level += 1
-        self.generated_code += f"{self.indent()}global console_disp, console_insp\n"
+        self.emit("global console_disp, console_insp")
         if self.global_vars:
-            safe_globals = [f"_{g}" if g in dir(builtins) else g for g in self.global_vars]
-            self.generated_code += f"{self.indent()}global {', '.join(safe_globals)}\n"
+            safe_globals = [f"_{g}" if g in BUILTIN_NAMES else g for g in self.global_vars]
+            self.emit(f"global {', '.join(safe_globals)}")
         if not node.body_n.statements_n:
-            self.generated_code += f"{self.indent()}pass\n"
+            self.emit("pass")
         else:
             self.visit(node.body_n)
         self.indent_level -= 1
-        self.generated_code += "\n"
+        self.code_lines.append("\n")
         self.current_function = None
         return ""
 
     def visit_node_func_dec(self, node):
         func_name = node.id_t["tokenName"]
-        if func_name in dir(builtins): func_name = f"_{func_name}"
+        if func_name in BUILTIN_NAMES: func_name = f"_{func_name}"
         self.current_function = func_name
         params = [p.id_t["tokenName"] for p in node.params_n] if node.params_n else []
-        params = [f"_{p}" if p in dir(builtins) else p for p in params]
+        params = [f"_{p}" if p in BUILTIN_NAMES else p for p in params]
         
-        self.generated_code += f"{self.indent()}async def {func_name}({', '.join(params)}):\n"
+        # Memoized functions cache inline (CodeGen.emit_memo_lookup), which works for coroutines too
+        self.emit_memo_cache(node, func_name)
+        self.emit(f"async def {func_name}({', '.join(params)}):")
         self.indent_level += 1
-        self.generated_code += f"{self.indent()}global console_disp, console_insp\n"
+        self.emit("global console_disp, console_insp")
         if self.global_vars:
-            safe_globals = [f"_{g}" if g in dir(builtins) else g for g in self.global_vars]
-            self.generated_code += f"{self.indent()}global {', '.join(safe_globals)}\n"
+            safe_globals = [f"_{g}" if g in BUILTIN_NAMES else g for g in self.global_vars]
+            self.emit(f"global {', '.join(safe_globals)}")
             
-        if not node.body_n.statements_n: self.generated_code += f"{self.indent()}pass\n"
+        self.emit_memo_lookup(node, params)
+        if not node.body_n.statements_n: self.emit("pass")
         else: self.visit(node.body_n)
         
         self.indent_level -= 1
-        self.generated_code += "\n"
+        self.code_lines.append("\n")
         self.current_function = None
+        self.memo = None
         return ""
 
     def visit_node_input(self, node):
         for target in node.targets_n:
             if type(target).__name__ == "node_iden":
                 var_name = target.id_t["tokenName"]
-                safe_name = f"_{var_name}" if var_name in dir(builtins) else var_name
-                self.generated_code += f"{self.indent()}{safe_name} = await console_insp('{var_name}')\n"
+                safe_name = f"_{var_name}" if var_name in BUILTIN_NAMES else var_name
+                self.emit(f"{safe_name} = await console_insp('{var_name}')")
             elif type(target).__name__ == "node_arr_idx":
                 var_name = target.id_t["tokenName"]
-                safe_name = f"_{var_name}" if var_name in dir(builtins) else var_name
+                safe_name = f"_{var_name}" if var_name in BUILTIN_NAMES else var_name
                 indices = [str(self.visit(idx)) for idx in target.indices_n]
                 idx_str = f"[{', '.join(indices)}]" if len(indices) > 1 else f"[{indices[0]}]"
-                self.generated_code += f"{self.indent()}{safe_name}{idx_str} = await console_insp('{var_name}{idx_str}')\n"
+                self.emit(f"{safe_name}{idx_str} = await console_insp('{var_name}{idx_str}')")
         return ""
 
     def visit_node_func_call(self, node):
         func_name = node.id_t["tokenName"]
-        if func_name in dir(builtins): func_name = f"_{func_name}"
+        if func_name in BUILTIN_NAMES: func_name = f"_{func_name}"
         args = [str(self.visit(arg)) for arg in node.args_n]
         return f"(await {func_name}({', '.join(args)}))"
 
     def compile(self, ast_node) -> tuple[bool, str]:
         try:
-            self.generated_code = "import math\nimport asyncio\n\n"
-            self.generated_code += self.get_runtime_environment()
-            self.generated_code += "\n# --- COMPILED GGSCRIPT ---\n\n"
+            self.code_lines = []
+            self.passes.run(ast_node)
             self.visit(ast_node)
-            return True, self.generated_code
+            # The page loads the runtime once from /api/runtime; standalone code carries the pieces it uses
+            self.header()
+            return True, "".join(self.code_lines)
         except Exception as e:
             return False, f"Code Generation Failed: {str(e)}\n{traceback.format_exc()}"
 
@@ -172,6 +178,10 @@ def compile_code():
     data = request.get_json()
     code = data.get('code', '')
     action = data.get('action', 'run')
+    standalone = bool(data.get('standalone', False))
+    # -O level for the optimization passes (src/passes.py); 'debug' re-checks the program after each pass
+    opt_level = data.get('opt_level', DEFAULT_LEVEL)
+    debug_passes = bool(data.get('debug', False))
 
     try:
         tokens, errors = Lexer(code).make_tokens()
@@ -189,29 +199,42 @@ def compile_code():
         if action == 'syntax':
             return jsonify({"success": True, "stage": "Syntax", "message": syn_msg, "tokens": token_data})
 
-        sem_ok, sem_msg = analyze_semantics(tokens)
+        ast_errors = []
+        sem_ok, sem_msg, ast = analyze_program(tokens, ast_errors)
         if not sem_ok:
             errors_list = [print_error_box(e.strip(), code) for e in sem_msg.split('\n') if e.strip()]
             return jsonify({"success": False, "stage": "Semantic", "errors": errors_list, "tokens": token_data})
         if action == 'semantic':
             return jsonify({"success": True, "stage": "Semantic", "message": sem_msg, "tokens": token_data})
 
-        ast_errors = []
-        ast = ASTBuilder(tokens, ast_errors).parse_program()
         if ast_errors:
             return jsonify({"success": False, "stage": "AST Building", "errors": [print_error_box(str(e), code) for e in ast_errors], "tokens": token_data})
 
-        cg = WebAsyncCodeGen()
+        try:
+            # Form posts and query strings send the level as a string
+            opt_level = int(opt_level)
+        except (TypeError, ValueError):
+            pass
+        if opt_level not in LEVELS:
+            return jsonify({"success": False, "stage": "Code Generation", "errors": [f"Unknown optimization level: {opt_level!r}"], "tokens": token_data})
+        cg = WebAsyncCodeGen(standalone=standalone, opt_level=opt_level, debug_passes=debug_passes)
         success, py_code = cg.compile(ast)
+        passes = [{"pass": name, "ms": round(seconds * 1e3, 3), "changes": changes} for name, seconds, changes in cg.passes.stats]
         if not success:
-            return jsonify({"success": False, "stage": "Code Generation", "errors": [py_code], "tokens": token_data})
+            return jsonify({"success": False, "stage": "Code Generation", "errors": [py_code], "tokens": token_data, "passes": passes})
 
-        return jsonify({"success": True, "stage": "Run", "python_code": py_code, "tokens": token_data})
+        return jsonify({"success": True, "stage": "Run", "python_code": py_code, "tokens": token_data, "passes": passes,
+                        "memoized": memoized_functions(ast)})
 
     except Exception as e:
         # SECURITY LAYER 3: Hides server paths from the user but logs them for you
         print(f"CRITICAL CRASH: {traceback.format_exc()}")
         return jsonify({"success": False, "stage": "Pipeline Crash", "errors": [f"Internal Compiler Error: {str(e)}"], "tokens": []})
 
+@app.route('/api/runtime', methods=['GET'])
+def get_runtime():
+    # Fetched once per page load and exec'd into the Pyodide exec_env (see index.html)
+    return jsonify({"python_code": runtime_source()})
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+Code generation throughput on a large generated program (about 50k GGScript lines by default),
+plus the time to a runnable code object through the text backend and through the ast backend.
+Emission is timed at -O0; the optimization passes of -O1 (or the level given) are timed on their own.
+
+    python benchmarks/bench_codegen.py [lines] [repeats] [-O1|-O2|-O3]
+"""
+import contextlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.astgen import AstCodeGen
+from src.codegen import CodeGen
+from src.lexer import Lexer
+from src.passes import PassManager
+from src.semantic import analyze_program
+
+FUNCTION_TEMPLATE = [
+    "build frag f{i}(frag n) {{",
+    "    frag acc = n;",
+    "    frag vals[4];",
+    "    grind (frag k = 0; k < 4; k++) {{",
+    "        vals[k] = k * n + acc++;",
+    "        clutch (vals[k] % 2 == 0) {{ acc += vals[k]; }}",
+    "        choke {{ acc--; }}",
+    "    }}",
+    "    retry (acc > 100) {{ acc -= 7; }}",
+    "    shout(acc);",
+    "    ggwp acc + {prev};",
+    "}}",
+]
+
+def generate(lines):
+    out = []
+    for i in range(max(1, lines // len(FUNCTION_TEMPLATE))):
+        prev = f"f{i - 1}(1)" if i else "0"
+        out += [line.format(i=i, prev=prev) for line in FUNCTION_TEMPLATE]
+    out += ["frag lobby() {", f"    shout(f{i}(3));", "    ggwp;", "}"]
+    return "\n".join(out)
+
+def checked(source):
+    tokens, _ = Lexer(source).make_tokens()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        ok, message, ast = analyze_program(tokens, [])
+    assert ok, message
+    return ast
+
+def best_of(repeats, fn):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        ok, result = fn()
+        best = min(best, time.perf_counter() - start)
+        assert ok, result
+    return best, result
+
+def main():
+    levels = [int(arg[2:]) for arg in sys.argv[1:] if arg.startswith('-O')]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('-O')]
+    lines = int(args[0]) if args else 50000
+    repeats = int(args[1]) if len(args) > 1 else 3
+    opt_level = levels[-1] if levels else 1
+
+    source = generate(lines)
+    # -O0 leaves the tree alone, so every repeat emits the same program
+    ast = checked(source)
+
+    best, code = best_of(repeats, lambda: CodeGen(opt_level=0).compile(ast))
+    out_lines = code.count("\n")
+    print(f"{source.count(chr(10)) + 1} GGScript lines -> {out_lines} Python lines")
+    print(f"CodeGen.compile -O0: {best * 1e3:.1f} ms ({out_lines / best / 1e3:.0f}k lines/s)")
+
+    text_best, _ = best_of(repeats, lambda: (True, compile(CodeGen(opt_level=0).compile(ast)[1], "<text>", "exec")))
+    ast_best, _ = best_of(repeats, lambda: AstCodeGen(opt_level=0).compile(ast))
+    print(f"to code object -O0: text {text_best * 1e3:.1f} ms, ast {ast_best * 1e3:.1f} ms")
+
+    # The passes rewrite the tree they run on, so each repeat gets a freshly checked one
+    passes_best, stats = float('inf'), []
+    for _ in range(repeats):
+        manager = PassManager(opt_level)
+        program = checked(source)
+        start = time.perf_counter()
+        manager.run(program)
+        elapsed = time.perf_counter() - start
+        if elapsed < passes_best:
+            passes_best, stats = elapsed, manager.stats
+    slowest = ", ".join(f"{name} {seconds * 1e3:.0f} ms" for name, seconds, _ in sorted(stats, key=lambda s: -s[1])[:3])
+    print(f"-O{opt_level} passes: {passes_best * 1e3:.1f} ms ({slowest})")
+
+if __name__ == '__main__':
+    main()
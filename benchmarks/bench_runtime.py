@@ -0,0 +1,89 @@
+"""
+Run time of array-heavy GGScript code (a sieve, a 2-D DP table and an 'elo' fill),
+compiled once and executed against the runtime in src/runtime.py. Its local arrays are
+only indexed within their declared sizes, so from -O1 on they run as plain lists (src/bounds.py).
+
+    python benchmarks/bench_runtime.py [size] [repeats] [-O0|-O1|-O2]
+"""
+import contextlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.codegen import CodeGen
+from src.lexer import Lexer
+from src.passes import DEFAULT_LEVEL
+from src.runtime import runtime_namespace
+from src.semantic import analyze_program
+
+PROGRAM = """
+frag lobby() {{
+    frag sieve[{n}];
+    frag primes = 0;
+    grind (frag i = 2; i < {n}; i++) {{
+        clutch (sieve[i] == 0) {{
+            primes++;
+            frag j = i * 2;
+            retry (j < {n}) {{
+                sieve[j] = 1;
+                j += i;
+            }}
+        }}
+    }}
+    shout(primes);
+    frag grid[{side}][{side}];
+    grind (frag r = 0; r < {side}; r++) {{
+        grind (frag c = 0; c < {side}; c++) {{
+            clutch (r == 0 || c == 0) {{
+                grid[r][c] = 1;
+            }} choke {{
+                grid[r][c] = (grid[r - 1][c] + grid[r][c - 1]) % 1000007;
+            }}
+        }}
+    }}
+    shout(grid[{side} - 1][{side} - 1]);
+    elo w[{n}];
+    elo total = 0.0;
+    grind (frag k = 0; k < {n}; k++) {{
+        w[k] = k * 0.5;
+        total += w[k];
+    }}
+    shout(total);
+    ggwp;
+}}
+"""
+
+def build(n, opt_level=DEFAULT_LEVEL):
+    side = max(2, int(n ** 0.5))
+    source = PROGRAM.format(n=n, side=side)
+    tokens, _ = Lexer(source).make_tokens()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        ok, message, ast = analyze_program(tokens, [])
+    assert ok, message
+    ok, code = CodeGen(opt_level=opt_level).compile(ast)
+    assert ok, code
+    return compile(code, "<bench>", "exec")
+
+def main():
+    levels = [int(arg[2:]) for arg in sys.argv[1:] if arg.startswith('-O')]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('-O')]
+    n = int(args[0]) if args else 200000
+    repeats = int(args[1]) if len(args) > 1 else 3
+    opt_level = levels[-1] if levels else DEFAULT_LEVEL
+    code = build(n, opt_level)
+
+    best = float('inf')
+    for _ in range(repeats):
+        out = []
+        env = {'console_disp': lambda *args: out.append("".join(map(str, args))), **runtime_namespace()}
+        start = time.perf_counter()
+        exec(code, env)
+        best = min(best, time.perf_counter() - start)
+
+    backend = env['GGScriptFragArray'].__name__
+    print(f"size {n} -O{opt_level} ({backend}): {best * 1e3:.1f} ms  (output {' / '.join(out)})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Micro-benchmark for the semantic pass: time, ErrorNode objects and peak traced memory
+per AST node on a generated program that type-checks cleanly.
+
+    python benchmarks/bench_semantic.py [functions] [repeats] [--baseline[=REV]]
+
+--baseline also measures src/semantic.py as of git revision REV (by default the one before
+the per-node allocation cuts) on the same program and prints both sets of numbers.
+"""
+import contextlib
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from src import semantic
+from src.lexer import Lexer
+
+BASELINE_REV = "79f9a2d^"
+
+def generate(functions):
+    lines = ["frag total = 0;", "stun elo RATE = 1.5;"]
+    for i in range(functions):
+        lines += [
+            f"build elo f{i}(frag n, elo w) {{",
+            "    frag acc = 0;",
+            "    elo avg = 0.0;",
+            "    frag vals[8];",
+            "    ign label = \"run\";",
+            "    grind (frag i = 0; i < 8; i++) {",
+            "        vals[i] = i * n % 5 + acc;",
+            "        clutch (vals[i] > 3 && acc < 100) { acc += vals[i]; }",
+            "        choke clutch (vals[i] == 2) { acc -= 1; }",
+            "        choke { acc++; }",
+            "    }",
+            "    avg = acc / 8 * w + RATE;",
+            "    label += \"!\";",
+            "    total += acc;",
+            f"    ggwp avg - {i}.5;" if i == 0 else f"    ggwp avg + f{i - 1}(acc, w);",
+            "}",
+        ]
+    lines += ["frag lobby() {", f"    shout(f{functions - 1}(3, 2.0));", "    ggwp;", "}"]
+    return "\n".join(lines)
+
+def count_nodes(node):
+    if isinstance(node, list):
+        return sum(count_nodes(item) for item in node)
+    if not hasattr(node, '__dict__'):
+        return 0
+    return 1 + sum(count_nodes(val) for attr, val in vars(node).items() if attr.endswith('_n'))
+
+def load_baseline(rev):
+    """src/semantic.py as of git revision `rev`, imported as a sibling of the current one."""
+    source = subprocess.run(['git', 'show', f'{rev}:src/semantic.py'], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    module = importlib.util.module_from_spec(importlib.util.spec_from_loader('src._semantic_baseline', loader=None))
+    module.__package__ = 'src'
+    exec(compile(source, f"{rev}:src/semantic.py", 'exec'), module.__dict__)
+    return module
+
+def measure(module, tokens, repeats):
+    """(AST nodes, best time, ErrorNodes created, peak traced bytes) for checking `tokens` with `module`."""
+    class CountingErrorNode(module.ErrorNode):
+        created = 0
+
+        def __init__(self, *args, **kwargs):
+            CountingErrorNode.created += 1
+            super().__init__(*args, **kwargs)
+
+    def check(ast):
+        errors = module.SemanticAnalyzer().interpret(ast)
+        assert not errors, errors
+
+    asts = [module.ASTBuilder(tokens, []).parse_program() for _ in range(repeats + 2)]
+    nodes = count_nodes(asts[0])
+    module.ErrorNode = CountingErrorNode
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        check(asts.pop())
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            check(asts.pop())
+            best = min(best, time.perf_counter() - start)
+
+        CountingErrorNode.created = 0
+        tracemalloc.start()
+        check(asts.pop())
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return nodes, best, CountingErrorNode.created, peak
+
+def report(label, nodes, best, created, peak):
+    print(f"{label}:")
+    print(f"  time        : {best * 1e3:8.2f} ms  ({best * 1e6 / nodes:.2f} us/node)")
+    print(f"  ErrorNodes  : {created:8d}     ({created / nodes:.2f} /node)")
+    print(f"  peak traced : {peak / 1024:8.1f} KiB ({peak / nodes:.0f} B/node)")
+
+def main():
+    baselines = [arg.partition('=')[2] or BASELINE_REV for arg in sys.argv[1:] if arg.startswith('--baseline')]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--baseline')]
+    functions = int(args[0]) if args else 200
+    repeats = int(args[1]) if len(args) > 1 else 5
+
+    tokens, _ = Lexer(generate(functions)).make_tokens()
+    current = measure(semantic, tokens, repeats)
+    print(f"{current[0]} AST nodes, {functions} functions")
+    if baselines:
+        report(f"baseline ({baselines[-1]})", *measure(load_baseline(baselines[-1]), tokens, repeats))
+    report("current", *current)
+
+if __name__ == '__main__':
+    main()
@@ -13,7 +13,12 @@ import base64
 from src.lexer import Lexer
 from src.token_types import TokenType
 from src.parser import analyze_syntax
-from src.semantic import analyze_semantics, ASTBuilder
+from src.semantic import analyze_semantics, analyze_program
+from src.passes import DEFAULT_LEVEL, LEVELS, memoized_functions
+
+# Process-pool checking of function bodies (src/incremental.py) is opt-in: shipping units to
+# spawned workers costs more than checking them on typical programs. GGSCRIPT_WORKERS=N turns it on.
+SEMANTIC_WORKERS = int(os.environ.get("GGSCRIPT_WORKERS") or 1)
 
 # ── TOKEN CATEGORY HELPER ──
 def get_token_category(raw_type: str) -> str:
@@ -133,6 +138,14 @@ frag lobby() {
         self.btn_lex = self.create_nav_button(nav_frame, "LEXICAL", self.run_lexical)
         self.btn_lex.pack(side="right", padx=(10, 0))
 
+        # Optimization level for RUN (see src/passes.py)
+        self.opt_level = tk.StringVar(value=f"-O{DEFAULT_LEVEL}")
+        opt_menu = tk.OptionMenu(nav_frame, self.opt_level, *(f"-O{level}" for level in sorted(LEVELS)))
+        opt_menu.config(bg="#000000", fg="#ffffff", font=("Consolas", 10, "bold"), activebackground="#222222",
+                        activeforeground="#ffffff", relief="solid", bd=1, highlightthickness=0, cursor="hand2", width=4)
+        opt_menu["menu"].config(bg="#000000", fg="#ffffff", activebackground="#222222", font=("Consolas", 10))
+        opt_menu.pack(side="right", padx=(10, 0))
+
         main_paned = tk.PanedWindow(self.root, orient=tk.HORIZONTAL, bg="#444444", bd=0, sashwidth=8, sashrelief="raised", opaqueresize=True)
         main_paned.pack(side="top", fill="both", expand=True, padx=15, pady=(0, 15))
 
@@ -500,7 +513,7 @@ frag lobby() {
                 self.print_term("Syntax errors found:", "error")
                 return self.print_error_box(syn_msg, code)
                 
-            sem_ok, sem_msg = analyze_semantics(tokens)
+            sem_ok, sem_msg = analyze_semantics(tokens, workers=SEMANTIC_WORKERS)
             if sem_ok:
                 self.print_term(sem_msg, "success")
             else:
@@ -524,7 +537,9 @@ frag lobby() {
                 self.print_term("Syntax Error:", "error")
                 return self.print_error_box(syn_msg, code)
             
-            sem_ok, sem_msg = analyze_semantics(tokens)
+            # The checked AST carries the static types CodeGen relies on, so it is reused below
+            ast_errors = []
+            sem_ok, sem_msg, ast = analyze_program(tokens, ast_errors, workers=SEMANTIC_WORKERS)
             if not sem_ok: 
                 self.print_term("Semantic Error:", "error")
                 for err_msg in sem_msg.split('\n'):
@@ -533,8 +548,6 @@ frag lobby() {
             
             self.print_term("Semantic analysis successful ✓ No errors.", "success")
             
-            ast_errors = []
-            ast = ASTBuilder(tokens, ast_errors).parse_program()
             if ast_errors: return self.print_term("AST Building Failed:\n" + "\n".join(str(e) for e in ast_errors), "error")
                 
             self.print_term("→ Code Generation successful ✓ Executing program...\n", "success")
@@ -542,13 +555,21 @@ frag lobby() {
             # --- CODE GENERATION EXECUTION ---
             try:
                 from src.codegen import CodeGen
+                from src.runtime import runtime_namespace
                 
-                # 1. Translate the GGScript AST into a massive Python string
-                cg = CodeGen()
+                # 1. Translate the GGScript AST into Python source; compile() gets to a code object
+                # faster than AstCodeGen building the ast.Module itself (see benchmarks/bench_codegen.py)
+                cg = CodeGen(opt_level=int(self.opt_level.get()[2:]))
                 success, py_code = cg.compile(ast)
                 
                 if not success:
                     return self.print_term(f"CodeGen Error:\n{py_code}", "error")
+                py_code = compile(py_code, "<ggscript>", "exec")
+                if cg.passes.stats:
+                    self.print_term(f"{self.opt_level.get()} passes:\n{cg.passes.report()}\n", "info")
+                memoized = memoized_functions(ast)
+                if memoized:
+                    self.print_term(f"Memoized: {', '.join(memoized)}\n", "info")
                     
                 # 2. Expose specific UI commands to the generated Python code
                 def console_disp(*args):
@@ -571,7 +592,8 @@ frag lobby() {
                 exec_env = {
                     'console_disp': console_disp,
                     'console_insp': console_insp,
-                    'builtins': builtins
+                    'builtins': builtins,
+                    **runtime_namespace()
                 }
                 
                 # 4. Run the code generator's script inside a background thread!
@@ -0,0 +1,546 @@
+import ast
+import gc
+
+from .codegen import CodeGen, BUILTIN_NAMES, LIST_CASTS, MEMO_SIZE
+from .passes import DEFAULT_LEVEL
+from .semantic import exact_type
+
+# Filename the compiled code objects report in tracebacks
+PROGRAM_FILENAME = "<ggscript>"
+
+# Contexts and operators carry no state, so one instance of each is shared (as CPython's parser does)
+LOAD, STORE = ast.Load(), ast.Store()
+BIN_OPS = {'+': ast.Add(), '-': ast.Sub(), '*': ast.Mult(), '/': ast.FloorDiv(), '%': ast.Mod()}
+AUG_OPS = {'+=': ast.Add(), '-=': ast.Sub(), '*=': ast.Mult(), '/=': ast.FloorDiv(), '%=': ast.Mod(), '++': ast.Add(), '--': ast.Sub()}
+CMP_OPS = {'<': ast.Lt(), '>': ast.Gt(), '<=': ast.LtE(), '>=': ast.GtE(), '==': ast.Eq(), '!=': ast.NotEq()}
+BOOL_OPS = {'&&': ast.And(), '||': ast.Or()}
+UNARY_OPS = {'!': ast.Not(), '-': ast.USub(), '+': ast.UAdd()}
+
+def line_of(node):
+    """Source line of the first token under `node`, or None if it carries no token."""
+    if isinstance(node, list):
+        for item in node:
+            line = line_of(item)
+            if line is not None:
+                return line
+        return None
+    if not hasattr(node, '__dict__'):
+        return None
+    for attr, val in vars(node).items():
+        if attr.endswith('_t') and isinstance(val, dict):
+            return val["tokenLine"]
+        if attr.endswith('_n') and val is not None:
+            line = line_of(val)
+            if line is not None:
+                return line
+    return None
+
+
+def safe_name(name):
+    return f"_{name}" if name in BUILTIN_NAMES else name
+
+class AstCodeGen(CodeGen):
+    """
+    Builds the program as a Python `ast.Module` instead of source text and compiles it
+    straight to a code object, so a run never tokenizes or parses generated Python.
+    Every node carries the GGScript line it came from, which makes runtime tracebacks
+    point at the GGScript source. Mirrors CodeGen statement for statement.
+    """
+    def __init__(self, opt_level=DEFAULT_LEVEL, debug_passes=False):
+        super().__init__(opt_level=opt_level, debug_passes=debug_passes)
+        self.body = []      # statement list currently being filled
+        self.module = None
+        self.at(1)
+
+    def at(self, line):
+        """Moves to GGScript line `line`: every node built from here on is located there."""
+        self.lineno = line
+        self.pos = {'lineno': line, 'col_offset': 0, 'end_lineno': line, 'end_col_offset': 0}
+
+    def node(self, cls, **fields):
+        return cls(**fields, **self.pos)
+
+    def emit(self, stmt):
+        self.body.append(stmt)
+
+    def block(self, fill, *args):
+        """Collects the statements `fill(*args)` emits into a new block."""
+        saved_body, saved_line = self.body, self.lineno
+        self.body = []
+        fill(*args)
+        stmts = self.body
+        self.body = saved_body
+        self.at(saved_line)
+        return stmts or [self.node(ast.Pass)]
+
+    def body_block(self, body_n):
+        return self.block(self.visit, body_n) if body_n.statements_n else [self.node(ast.Pass)]
+
+    def name(self, name, ctx=LOAD):
+        return self.node(ast.Name, id=safe_name(name), ctx=ctx)
+
+    def call(self, func, args):
+        if isinstance(func, str):
+            func = self.node(ast.Name, id=func, ctx=LOAD)
+        return self.node(ast.Call, func=func, args=args, keywords=[])
+
+    def store(self, expr):
+        """Store-context twin of a Name/Subscript load, for '++'/'--' targets."""
+        if isinstance(expr, ast.Subscript):
+            return self.node(ast.Subscript, value=expr.value, slice=expr.slice, ctx=STORE)
+        return self.node(ast.Name, id=expr.id, ctx=STORE)
+
+    def assign(self, target, op, value):
+        if op == '=':
+            self.emit(self.node(ast.Assign, targets=[target], value=value))
+        else:
+            self.emit(self.node(ast.AugAssign, target=target, op=AUG_OPS[op], value=value))
+
+    def function_def(self, name, params, body_n, prologue=()):
+        header = [self.node(ast.Global, names=['console_disp', 'console_insp'])]
+        if self.global_vars:
+            header.append(self.node(ast.Global, names=[safe_name(g) for g in self.global_vars]))
+        header.extend(prologue)
+        args = ast.arguments(posonlyargs=[], args=[self.node(ast.arg, arg=p) for p in params], vararg=None,
+                             kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[])
+        return self.node(ast.FunctionDef, name=name, args=args, body=header + self.body_block(body_n),
+                         decorator_list=[], returns=None)
+
+    def build_module(self, ast_node) -> ast.Module:
+        self.passes.run(ast_node)
+        # Building allocates a node per operand and never frees one, so cyclic GC passes
+        # (which would re-scan the whole GGScript AST each time) are pure overhead here
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self.body = []
+            self.visit(ast_node)
+            if ast_node.main_n:
+                self.emit(self.node(ast.Expr, value=self.call('lobby', [])))
+        finally:
+            if gc_enabled:
+                gc.enable()
+        self.module = ast.Module(body=self.body, type_ignores=[])
+        return self.module
+
+    def compile(self, ast_node) -> tuple[bool, object]:
+        """Returns (True, code object), to exec in a namespace holding runtime_namespace()."""
+        try:
+            return True, compile(self.build_module(ast_node), PROGRAM_FILENAME, "exec")
+        except Exception as e:
+            import traceback
+            return False, f"Code Generation Failed: {str(e)}\n{traceback.format_exc()}"
+
+    def source(self) -> str:
+        """Python text of the last compiled program, for display."""
+        return ast.unparse(self.module) if self.module else ""
+
+    def visit(self, node):
+        if node is None:
+            return None
+        if isinstance(node, list):
+            for n in node:
+                self.visit(n)
+            return None
+        visit_method = getattr(self, f"visit_{type(node).__name__}", self.generic_visit)
+        return visit_method(node)
+
+    # ==========================================
+    # CORE STRUCTURES
+    # ==========================================
+    def visit_node_program(self, node):
+        for glob in node.globals_n:
+            if hasattr(glob, 'id_t'):
+                self.global_vars.add(glob.id_t["tokenName"])
+            self.at(line_of(glob) or self.lineno)
+            self.visit(glob)
+
+        for func in node.funcs_n:
+            self.visit(func)
+
+        if node.main_n:
+            self.visit(node.main_n)
+        return None
+
+    def visit_node_main_func(self, node):
+        self.current_function = "lobby"
+        self.at(line_of(node) or self.lineno)
+        self.emit(self.function_def("lobby", [], node.body_n))
+        self.current_function = None
+        return None
+
+    def visit_node_code_block(self, node):
+        for stmt in node.statements_n:
+            self.at(line_of(stmt) or self.lineno)
+            res = self.visit(stmt)
+            # Bare names left over from '++'/'--' statements have nothing to evaluate
+            if res is not None and not isinstance(res, ast.Name):
+                self.emit(self.node(ast.Expr, value=res))
+        return None
+
+    def visit_node_func_dec(self, node):
+        func_name = safe_name(node.id_t["tokenName"])
+        self.current_function = func_name
+        params = [safe_name(p.id_t["tokenName"]) for p in node.params_n or []]
+        self.at(node.id_t["tokenLine"])
+        self.emit_memo_cache(node, func_name)
+        self.emit(self.function_def(func_name, params, node.body_n, self.memo_lookup(node, params)))
+        self.current_function = None
+        self.memo = None
+        return None
+
+    def emit_memo_cache(self, node, func_name):
+        if getattr(node, 'memo', False):
+            self.memo = f"_memo_{func_name}"
+            cache = self.call(self.require('GGScriptMemo'), [self.node(ast.Constant, value=MEMO_SIZE)])
+            self.emit(self.node(ast.Assign, targets=[self.node(ast.Name, id=self.memo, ctx=STORE)], value=cache))
+
+    def memo_lookup(self, node, params):
+        """The statements that return the cached result on entry to a memoized function (CodeGen.emit_memo_lookup)."""
+        if self.memo is None:
+            return []
+        checks = self.memo_key(node, params)[1]
+        key = self.node(ast.Name, id=params[0], ctx=LOAD) if len(params) == 1 else \
+            self.node(ast.Tuple, elts=[self.node(ast.Name, id=p, ctx=LOAD) for p in params], ctx=LOAD)
+        if checks:
+            tests = [self.node(ast.Compare, left=self.call('type', [self.node(ast.Name, id=p, ctx=LOAD)]), ops=[ast.Is()],
+                               comparators=[self.node(ast.Name, id=cls, ctx=LOAD)]) for p, cls in checks]
+            test = tests[0] if len(tests) == 1 else self.node(ast.BoolOp, op=BOOL_OPS['&&'], values=tests)
+            key = self.node(ast.IfExp, test=test, body=key, orelse=self.node(ast.Constant, value=None))
+        cache = self.node(ast.Name, id=self.memo, ctx=LOAD)
+        hit = self.node(ast.Return, value=self.node(ast.Subscript, value=cache, slice=self.memo_key_name(), ctx=LOAD))
+        return [self.node(ast.Assign, targets=[self.node(ast.Name, id='_memo_key', ctx=STORE)], value=key),
+                self.node(ast.If, test=self.node(ast.Compare, left=self.memo_key_name(), ops=[ast.In()], comparators=[cache]),
+                          body=[hit], orelse=[])]
+
+    def memo_key_name(self):
+        return self.node(ast.Name, id='_memo_key', ctx=LOAD)
+
+    # ==========================================
+    # DECLARATIONS & ASSIGNMENTS
+    # ==========================================
+    def visit_node_vardec(self, node):
+        var_type = node.dtype_t["tokenName"]
+
+        if node.init_value_n:
+            val = self.visit(node.init_value_n)
+            # The cast is only needed when semantic analysis couldn't prove the runtime type
+            if exact_type(node.init_value_n) != var_type:
+                cast = {'frag': 'int', 'elo': 'float', 'surebol': 'bool'}.get(var_type)
+                if cast: val = self.call(cast, [val])
+        else:
+            val = self.node(ast.Constant, value=ast.literal_eval(self.type_defaults.get(var_type, 'None')))
+        self.assign(self.name(node.id_t["tokenName"], STORE), '=', val)
+        return None
+
+    def visit_node_arr_dec(self, node):
+        var_type = node.dtype_t["tokenName"]
+        if getattr(node, 'as_list', False):
+            self.assign(self.name(node.id_t["tokenName"], STORE), '=', self.list_literal(node))
+            return None
+        args = [self.node(ast.Constant, value=var_type), self.node(ast.Constant, value=len(node.sizes_n))]
+
+        if node.init_values_n:
+            def build_init_list(vals):
+                if vals and isinstance(vals[0], list):
+                    return self.node(ast.List, elts=[build_init_list(v) for v in vals], ctx=LOAD)
+                return self.node(ast.List, elts=[self.visit(v) for v in vals], ctx=LOAD)
+            args.append(build_init_list(node.init_values_n))
+        call = self.call(self.array_class(var_type, len(node.sizes_n)), args)
+        sizes = self.size_hint(node)
+        if sizes:
+            value = self.node(ast.Tuple, elts=[self.visit(size) for size in sizes], ctx=LOAD)
+            call.keywords.append(self.node(ast.keyword, arg='sizes', value=value))
+        self.assign(self.name(node.id_t["tokenName"], STORE), '=', call)
+        return None
+
+    def list_literal(self, node):
+        var_type = node.dtype_t["tokenName"]
+        default = self.node(ast.Constant, value=ast.literal_eval(self.type_defaults.get(var_type, 'None')))
+        sizes = [int(size.val_t["tokenName"]) for size in node.sizes_n]
+
+        def cells(vals, n):
+            items = []
+            for val_n in vals:
+                val, cast = self.visit(val_n), LIST_CASTS.get(var_type)
+                items.append(val if exact_type(val_n) == var_type or cast is None else self.call(cast, [val]))
+            if len(items) >= n: return self.node(ast.List, elts=items, ctx=LOAD)
+            pad = self.node(ast.BinOp, left=self.node(ast.List, elts=[default], ctx=LOAD), op=ast.Mult(),
+                            right=self.node(ast.Constant, value=n - len(items)))
+            return self.node(ast.BinOp, left=self.node(ast.List, elts=items, ctx=LOAD), op=ast.Add(), right=pad) if items else pad
+
+        vals = node.init_values_n or []
+        if len(sizes) == 1:
+            return cells(vals, sizes[0])
+        rows = self.node(ast.List, elts=[cells(row, sizes[1]) for row in vals], ctx=LOAD)
+        if len(vals) >= sizes[0]:
+            return rows
+        loop = self.node(ast.comprehension, target=self.name('_', STORE), is_async=0, ifs=[],
+                         iter=self.call('range', [self.node(ast.Constant, value=sizes[0] - len(vals))]))
+        blank = self.node(ast.ListComp, elt=cells([], sizes[1]), generators=[loop])
+        return self.node(ast.BinOp, left=rows, op=ast.Add(), right=blank) if vals else blank
+
+    def visit_node_assign_stmt(self, node):
+        val = self.visit(node.value_n)
+        self.assign(self.name(node.id_t["tokenName"], STORE), node.op_t["tokenName"], val)
+        return None
+
+    def subscript(self, node, ctx=LOAD):
+        """Load/store of element `node`: one subscript per index into an array marked `as_list`."""
+        if not getattr(node, 'as_list', False):
+            return self.node(ast.Subscript, value=self.name(node.id_t["tokenName"]), slice=self.index_of(node.indices_n), ctx=ctx)
+        target = self.name(node.id_t["tokenName"])
+        for i, idx in enumerate(node.indices_n):
+            last = i == len(node.indices_n) - 1
+            target = self.node(ast.Subscript, value=target, slice=self.visit(idx), ctx=ctx if last else LOAD)
+        return target
+
+    def index_of(self, indices_n):
+        indices = [self.visit(idx) for idx in indices_n]
+        return indices[0] if len(indices) == 1 else self.node(ast.Tuple, elts=indices[:2], ctx=LOAD)
+
+    def visit_node_arr_assign_stmt(self, node):
+        var_name = node.arr_idx_n.id_t["tokenName"]
+        op = node.op_t["tokenName"]
+        val = self.visit(node.value_n)
+        arr_symbol = getattr(node.arr_idx_n, 'symbol', None)
+        if getattr(node.arr_idx_n, 'as_list', False):
+            target = self.subscript(node.arr_idx_n, STORE)
+            dtype, exact = arr_symbol["dtype"][1], exact_type(node.value_n)
+            cast = LIST_CASTS.get(dtype) if dtype in ('frag', 'elo') else None
+            # Lists do not coerce, so the store does whatever the runtime's __setitem__ would
+            if cast is None or exact == dtype or (dtype == 'elo' and exact == 'frag' and op != '='):
+                self.assign(target, op, val)
+            elif op != '=':
+                current = self.node(ast.Subscript, value=target.value, slice=target.slice, ctx=LOAD)
+                self.assign(target, '=', self.call(cast, [self.node(ast.BinOp, left=current, op=AUG_OPS[op], right=val)]))
+            else:
+                self.assign(target, '=', self.call(cast, [val]))
+            return None
+        index = self.index_of(node.arr_idx_n.indices_n)
+
+        if op == '=' and arr_symbol and arr_symbol["dtype"][1] in ('frag', 'elo') and exact_type(node.value_n) == arr_symbol["dtype"][1]:
+            # Value already has the element type: skip the coercing __setitem__
+            put = self.node(ast.Attribute, value=self.name(var_name), attr='put', ctx=LOAD)
+            self.emit(self.node(ast.Expr, value=self.call(put, [index, val])))
+            return None
+
+        self.assign(self.node(ast.Subscript, value=self.name(var_name), slice=index, ctx=STORE), op, val)
+        return None
+
+    # ==========================================
+    # I/O STATEMENTS
+    # ==========================================
+    def visit_node_input(self, node):
+        for target in node.targets_n:
+            var_name = target.id_t["tokenName"]
+            if type(target).__name__ == "node_iden":
+                prompt, store = var_name, self.name(var_name, STORE)
+            elif type(target).__name__ == "node_arr_idx":
+                index = self.index_of(target.indices_n)
+                prompt = f"{var_name}[{ast.unparse(index)}]"
+                store = self.node(ast.Subscript, value=self.name(var_name), slice=index, ctx=STORE)
+            else:
+                continue
+            self.assign(store, '=', self.call('console_insp', [self.node(ast.Constant, value=prompt)]))
+        return None
+
+    def visit_node_output(self, node):
+        args = [self.visit(item) for item in node.print_params_n]
+        self.emit(self.node(ast.Expr, value=self.call('console_disp', args)))
+        return None
+
+    # ==========================================
+    # CONTROL FLOW
+    # ==========================================
+    def visit_node_if_stmt(self, node):
+        line = self.lineno
+        test = self.visit(node.condition_n)
+        body = self.body_block(node.body_n)
+
+        chain = []
+        for elif_stmt in node.else_chain_n or []:
+            self.at(line_of(elif_stmt) or line)
+            chain.append((self.lineno, self.visit(elif_stmt.condition_n), self.body_block(elif_stmt.body_n)))
+        self.at(line)
+        orelse = self.body_block(node.else_stmt_n.body_n) if node.else_stmt_n else []
+
+        # 'choke clutch' branches nest in orelse, as Python's own parser does for elif
+        for elif_line, elif_test, elif_body in reversed(chain):
+            self.at(elif_line)
+            orelse = [self.node(ast.If, test=elif_test, body=elif_body, orelse=orelse)]
+        self.at(line)
+        self.emit(self.node(ast.If, test=test, body=body, orelse=orelse))
+        return None
+
+    def visit_node_switch_stmt(self, node):
+        subject = self.visit(node.value_n)
+        cases = []
+        for case_stmt in node.cases_n:
+            val = self.visit(case_stmt.case_value_n)
+            if isinstance(val, ast.Name):
+                # Same as the text backend: a bare name is a capture pattern
+                pattern = self.node(ast.MatchAs, pattern=None, name=val.id)
+            elif isinstance(val, ast.Constant) and isinstance(val.value, bool):
+                pattern = self.node(ast.MatchSingleton, value=val.value)
+            else:
+                pattern = self.node(ast.MatchValue, value=val)
+            cases.append(ast.match_case(pattern=pattern, guard=None, body=self.body_block(case_stmt.body_n)))
+
+        if node.default_n:
+            pattern = self.node(ast.MatchAs, pattern=None, name=None)
+            cases.append(ast.match_case(pattern=pattern, guard=None, body=self.body_block(node.default_n.body_n)))
+        self.emit(self.node(ast.Match, subject=subject, cases=cases))
+        return None
+
+    def visit_node_loop_stmt(self, node):
+        self.loop_depth += 1
+        counted = getattr(node, 'counted', None)
+        self.loop_updates.append(node.update_n if node.loop_type == "grind" and not counted else None)
+
+        if counted:
+            self.visit(node.init_n)
+            stop = self.visit(counted.stop_n)
+            if counted.stop_adjust:
+                adjust = self.node(ast.Constant, value=1)
+                stop = self.node(ast.BinOp, left=stop, op=BIN_OPS['+' if counted.stop_adjust > 0 else '-'], right=adjust)
+            bounds = [self.name(counted.var), stop]
+            if counted.step != 1:
+                bounds.append(self.node(ast.Constant, value=counted.step))
+
+            def fill_else():
+                # Leave the variable where the while loop would: one more test-and-step past the last pass
+                self.at(line_of(node.condition_n) or self.lineno)
+                step = self.block(self.visit, node.update_n)
+                self.emit(self.node(ast.If, test=self.visit(node.condition_n), body=step, orelse=[]))
+            loop = self.node(ast.For, target=self.name(counted.var, STORE), iter=self.call('range', bounds),
+                             body=self.body_block(node.body_n), orelse=self.block(fill_else), type_comment=None)
+            self.emit(loop)
+
+        elif node.loop_type == "grind":
+            if node.init_n:
+                self.visit(node.init_n)
+            test = self.visit(node.condition_n) if node.condition_n else self.node(ast.Constant, value=True)
+
+            def fill():
+                if node.body_n.statements_n:
+                    self.visit(node.body_n)
+                if node.update_n:
+                    self.at(line_of(node.update_n) or self.lineno)
+                    self.visit(node.update_n)
+            self.emit(self.node(ast.While, test=test, body=self.block(fill), orelse=[]))
+
+        elif node.loop_type == "retry":
+            test = self.visit(node.condition_n)
+            self.emit(self.node(ast.While, test=test, body=self.body_block(node.body_n), orelse=[]))
+
+        elif node.loop_type == "try":
+            def fill():
+                if node.body_n.statements_n:
+                    self.visit(node.body_n)
+                self.at(line_of(node.condition_n) or self.lineno)
+                test = self.node(ast.UnaryOp, op=UNARY_OPS['!'], operand=self.visit(node.condition_n))
+                self.emit(self.node(ast.If, test=test, body=[self.node(ast.Break)], orelse=[]))
+            self.emit(self.node(ast.While, test=self.node(ast.Constant, value=True), body=self.block(fill), orelse=[]))
+        self.loop_updates.pop()
+        self.loop_depth -= 1
+        return None
+
+    # ==========================================
+    # EXPRESSIONS, METHOD CALLS, & OPERATORS
+    # ==========================================
+    def visit_node_func_call(self, node):
+        args = [self.visit(arg) for arg in node.args_n]
+        return self.call(self.name(node.id_t["tokenName"]), args)
+
+    def visit_node_method_call(self, node):
+        var = self.name(node.id_t["tokenName"])
+        method_name = node.method_t["tokenName"]
+        args = [self.visit(arg) for arg in node.args_n]
+
+        def method(attr):
+            return self.node(ast.Attribute, value=var, attr=attr, ctx=LOAD)
+
+        # Translate native GGScript Array and String Methods natively to python logic
+        if method_name == "stack":
+            self.emit(self.node(ast.Expr, value=self.call(method('append'), args)))
+            return None
+        elif method_name == "drop":
+            return self.call(method('pop'), [])
+        elif method_name == "craft":
+            self.emit(self.node(ast.Expr, value=self.call(method('insert'), args[:2])))
+            return None
+        elif method_name == "count":
+            return self.call('len', [var])
+
+        return self.call(method(method_name), args)
+
+    def visit_node_bi_op(self, node):
+        left = self.visit(node.left_n)
+        op = node.op_t["tokenName"]
+        right = self.visit(node.right_n)
+        if op in BOOL_OPS:
+            return self.node(ast.BoolOp, op=BOOL_OPS[op], values=[left, right])
+        if op in CMP_OPS:
+            return self.node(ast.Compare, left=left, ops=[CMP_OPS[op]], comparators=[right])
+        return self.node(ast.BinOp, left=left, op=BIN_OPS[op], right=right)
+
+    def visit_node_pre_un_op(self, node):
+        op = node.op_t["tokenName"]
+        right = self.visit(node.right_n)
+        if op in ('++', '--'):
+            self.assign(self.store(right), op, self.node(ast.Constant, value=1))
+            return right
+        return self.node(ast.UnaryOp, op=UNARY_OPS[op], operand=right)
+
+    def visit_node_post_un_op(self, node):
+        left = self.visit(node.left_n)
+        op = node.op_t["tokenName"]
+        if op in ('++', '--'):
+            self.assign(self.store(left), op, self.node(ast.Constant, value=1))
+        return left
+
+    def visit_node_iden(self, node):
+        return self.name(node.id_t["tokenName"])
+
+    def visit_node_arr_idx(self, node):
+        return self.subscript(node)
+
+    def visit_node_num(self, node):
+        val = node.val_t["tokenName"]
+        return self.node(ast.Constant, value=int(val) if node.dtype == "frag" else float(val))
+
+    def visit_node_str(self, node):
+        # Escapes mean what they mean in a Python literal, exactly as in the text backend
+        val = node.val_t["tokenName"]
+        return self.node(ast.Constant, value=ast.literal_eval(val if val.startswith('"') else f'"{val}"'))
+
+    def visit_node_char(self, node):
+        val = node.val_t["tokenName"]
+        return self.node(ast.Constant, value=ast.literal_eval(val if val.startswith("'") else f"'{val}'"))
+
+    def visit_node_bool(self, node):
+        return self.node(ast.Constant, value=node.val_t["tokenName"] == "buff")
+
+    # ==========================================
+    # JUMP STATEMENTS
+    # ==========================================
+    def visit_node_break_stmt(self, node):
+        if self.loop_depth > 0:
+            self.emit(self.node(ast.Break))
+        return None
+
+    def visit_node_continue_stmt(self, node):
+        # 'hop' in a grind still steps the loop variable, as in a C for loop
+        if self.loop_updates and self.loop_updates[-1]:
+            self.visit(self.loop_updates[-1])
+        self.emit(self.node(ast.Continue))
+        return None
+
+    def visit_node_return_block(self, node):
+        val = self.visit(node.ret_value_n) if node.ret_value_n else None
+        if val is not None and self.memo is not None:
+            store = self.node(ast.Attribute, value=self.node(ast.Name, id=self.memo, ctx=LOAD), attr='store', ctx=LOAD)
+            val = self.call(store, [self.memo_key_name(), val])
+        self.emit(self.node(ast.Return, value=val))
+        return None
@@ -0,0 +1,87 @@
+from typing import Optional
+
+from .loops import walk, calls_functions
+from .runtime import GGScriptArray
+
+# ────────────────────────────────────────────────────────────────────────────────
+# LIST-LOWERED ARRAYS
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# Runtime arrays grow on writes past their end and read the default there, so every
+# access is a method call. A local array with constant sizes that never leaves its unit
+# (it is only ever indexed: never passed, printed, counted or read into) and whose every
+# index IntervalAnalyzer proved to lie inside the declared sizes can never hit either
+# case. The code generators emit such an array as a preallocated Python list (a list of
+# rows for 2-D) and index it directly.
+
+def declared_sizes(node) -> Optional[tuple]:
+    """The sizes of array declaration `node` when they are constants a list can be preallocated from."""
+    sizes = []
+    for size in node.sizes_n:
+        if type(size).__name__ != 'node_num' or size.dtype != 'frag':
+            return None
+        sizes.append(int(size.val_t["tokenName"]))
+    cells = 1
+    for n in sizes:
+        cells *= n
+    if len(sizes) not in (1, 2) or min(sizes) < 1 or cells > GGScriptArray.prealloc_max:
+        return None
+    return tuple(sizes)
+
+def idents(node) -> set:
+    return {item.id_t["tokenName"] for item in walk(node) if type(item).__name__ in ('node_iden', 'node_arr_idx')}
+
+def in_bounds(access, sizes) -> bool:
+    ranges = getattr(access, 'index_ranges', None)
+    if ranges is None or len(ranges) != len(sizes):
+        return False
+    return all(itv is not None and itv.kind == 'frag' and itv.lo >= 0 and itv.hi < n for itv, n in zip(ranges, sizes))
+
+def list_arrays(unit, global_names=frozenset()) -> set:
+    """The arr_dec and arr_idx nodes of function or lobby `unit` whose array can be a plain list."""
+    params = {p.id_t["tokenName"] for p in getattr(unit, 'params_n', None) or []}
+    decls, accesses, escaped = {}, {}, set(global_names) | params
+    # '++'/'--' that are whole statements, and every one seen; the code generators emit the
+    # others ahead of their statement, so IntervalAnalyzer's view of the stepped name is off there
+    statements, steps = set(), []
+    for item in walk(unit.body_n):
+        kind = type(item).__name__
+        if kind == 'node_arr_dec':
+            decls.setdefault(item.id_t["tokenName"], []).append(item)
+        elif kind == 'node_vardec':
+            escaped.add(item.id_t["tokenName"])
+        elif kind in ('node_iden', 'node_method_call'):
+            escaped.add(item.id_t["tokenName"])
+        elif kind == 'node_input':
+            escaped.update(t.id_t["tokenName"] for t in item.targets_n)
+        elif kind == 'node_arr_idx':
+            accesses.setdefault(item.id_t["tokenName"], []).append(item)
+        elif kind == 'node_arr_assign_stmt' and item.op_t["tokenName"] == '=' and calls_functions(item.value_n):
+            # Python evaluates the value before the subscript, so a call there may move a global index
+            if idents(item.arr_idx_n) & set(global_names):
+                escaped.add(item.arr_idx_n.id_t["tokenName"])
+        elif kind == 'node_code_block':
+            statements.update(id(stmt) for stmt in item.statements_n)
+        elif kind == 'node_loop_stmt':
+            statements.add(id(item.update_n))
+        elif kind in ('node_pre_un_op', 'node_post_un_op') and item.op_t["tokenName"] in ('++', '--'):
+            steps.append(item)
+    if not decls:
+        return set()
+
+    stepped = set()
+    for step in steps:
+        target = step.right_n if type(step).__name__ == 'node_pre_un_op' else step.left_n
+        if id(step) not in statements and type(target).__name__ == 'node_iden':
+            stepped.add(target.id_t["tokenName"])
+
+    lowered = set()
+    for name, found in decls.items():
+        sizes = declared_sizes(found[0])
+        if len(found) != 1 or name in escaped or sizes is None:
+            continue
+        uses = accesses.get(name, [])
+        if all(in_bounds(use, sizes) and not any(idents(idx) & stepped for idx in use.indices_n) for use in uses):
+            lowered.add(found[0])
+            lowered.update(uses)
+    return lowered
@@ -0,0 +1,495 @@
+from typing import Dict, List, Optional
+
+from .dce import pure
+from .fold import literal_value, literal_type, make_literal
+from .loops import walk, child_fields
+from .semantic import exact_type, node_iden
+
+# ────────────────────────────────────────────────────────────────────────────────
+# CONTROL FLOW GRAPH
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# A CFG is a lowered view of one function or lobby: basic blocks whose items are the
+# unit's own simple statements (the node_* objects of the tree) and Tests, the branch
+# conditions and 'pick' values evaluated at the end of a block. Edges follow the Python
+# CodeGen emits rather than GGScript's reading where the two differ ('afk' outside a
+# loop emits nothing, 'hop' in a 'try' loop skips the condition). Because items are tree
+# nodes, a transformation edits the tree through them, and the code generators go on
+# emitting structured Python from it.
+#
+# The analyses track the unit's scalar locals by name, as Python does: a name declared in
+# two blocks is one variable of the emitted function. Globals (which every unit declares,
+# and calls may change) and arrays are left alone.
+
+class Test:
+    """The expression in field `attr` of `owner` (an 'if', elif, loop or 'pick' node)."""
+    __slots__ = ('owner', 'attr')
+
+    def __init__(self, owner, attr):
+        self.owner = owner
+        self.attr = attr
+
+    @property
+    def expr(self):
+        return getattr(self.owner, self.attr)
+
+class Block:
+    """A basic block; `items` are indices into its CFG's `items`."""
+    __slots__ = ('index', 'items', 'succs', 'preds')
+
+    def __init__(self, index):
+        self.index = index
+        self.items: List[int] = []
+        self.succs: List['Block'] = []
+        self.preds: List['Block'] = []
+
+# Definitions reaching the entry: a parameter's argument, or no value yet
+ENTRY = -1
+
+class CFG:
+    def __init__(self, unit, global_names=frozenset()):
+        self.blocks: List[Block] = []
+        self.items: list = []
+        self.holder: list = []          # per item: the code block listing it, or the 'clutch'/'pick' it tests (else None)
+        self.scope: list = []           # per item: (scope path, position) to tell which declarations it sees
+        self.decls: Dict[str, list] = {}
+        self.dtypes: Dict[str, Optional[str]] = {}
+        self.arrays = set()
+        self.loops: list = []           # (hop target, afk target) of the enclosing loops
+        self.path: tuple = ()
+        self.code_block = None
+        for param in getattr(unit, 'params_n', None) or []:
+            name = param.id_t["tokenName"]
+            if param.is_array:
+                self.arrays.add(name)
+            else:
+                self.declare(name, param.dtype_t["tokenName"], -1)
+        self.entry = self.new_block()
+        self.exit = self.new_block()
+        end = self.lower(unit.body_n, self.entry)
+        if end is not None:
+            self.link(end, self.exit)
+        self.tracked = frozenset(self.dtypes) - self.arrays - set(global_names)
+        self.defs, self.uses, self.stepped = [], [], []
+        for index in range(len(self.items)):
+            self.scan(index)
+
+    # ---- construction ----
+
+    def new_block(self) -> Block:
+        block = Block(len(self.blocks))
+        self.blocks.append(block)
+        return block
+
+    def link(self, src, dst):
+        src.succs.append(dst)
+        dst.preds.append(src)
+
+    def add(self, block, item, holder=None):
+        self.items.append(item)
+        self.holder.append(holder)
+        self.scope.append((self.path, len(self.items)))
+        block.items.append(len(self.items) - 1)
+
+    def declare(self, name, dtype, position):
+        self.decls.setdefault(name, []).append((self.path, position))
+        # A name declared with two types has no single one
+        self.dtypes[name] = dtype if self.dtypes.get(name, dtype) == dtype else None
+
+    def lower(self, node, block) -> Optional[Block]:
+        """Adds `node` from the end of `block`; returns the block after it, or None if control never gets there."""
+        return getattr(self, f"lower_{type(node).__name__}", self.lower_statement)(node, block)
+
+    def lower_statement(self, node, block):
+        self.add(block, node, self.code_block)
+        kind = type(node).__name__
+        if kind == 'node_vardec':
+            self.declare(node.id_t["tokenName"], node.dtype_t["tokenName"], len(self.items))
+        elif kind == 'node_arr_dec':
+            self.arrays.add(node.id_t["tokenName"])
+        return block
+
+    def lower_node_code_block(self, node, block):
+        outer, self.code_block = self.code_block, node
+        self.path += (id(node),)
+        for stmt in node.statements_n:
+            # Statements after a jump still get a block, one nothing leads to
+            block = self.lower(stmt, block if block is not None else self.new_block())
+        self.path = self.path[:-1]
+        self.code_block = outer
+        return block
+
+    def lower_node_if_stmt(self, node, block):
+        join = self.new_block()
+        for branch in [node] + list(node.else_chain_n or []):
+            self.add(block, Test(branch, 'condition_n'), self.code_block if branch is node else None)
+            body, rest = self.new_block(), self.new_block()
+            self.link(block, body)
+            self.link(block, rest)
+            block = rest
+            end = self.lower(branch.body_n, body)
+            if end is not None:
+                self.link(end, join)
+        if node.else_stmt_n is not None:
+            block = self.lower(node.else_stmt_n.body_n, block)
+        if block is not None:
+            self.link(block, join)
+        return join if join.preds else None
+
+    def lower_node_switch_stmt(self, node, block):
+        self.add(block, Test(node, 'value_n'), self.code_block)
+        join = self.new_block()
+        cases = list(node.cases_n) + ([node.default_n] if node.default_n is not None else [])
+        for case in cases:
+            body = self.new_block()
+            self.link(block, body)
+            end = self.lower(case.body_n, body)
+            if end is not None:
+                self.link(end, join)
+        if node.default_n is None:
+            self.link(block, join)
+        return join if join.preds else None
+
+    def lower_node_loop_stmt(self, node, block):
+        self.path += (id(node),)
+        head, body, done = self.new_block(), self.new_block(), self.new_block()
+        if node.loop_type == 'try':
+            # CodeGen emits 'while True:' with the test at the end, so 'hop' skips the test
+            self.link(block, body)
+            self.add(head, Test(node, 'condition_n'))
+            self.link(head, body)
+            self.link(head, done)
+            step = head
+            self.loops.append((body, done))
+        else:
+            inits = node.init_n if isinstance(node.init_n, list) else [node.init_n] if node.init_n else []
+            for init in inits:
+                block = self.lower_statement(init, block)
+                self.holder[-1] = None
+            self.link(block, head)
+            if node.condition_n is not None:
+                self.add(head, Test(node, 'condition_n'))
+                self.link(head, done)
+            self.link(head, body)
+            step = head
+            if node.update_n is not None:
+                step = self.new_block()
+                self.add(step, node.update_n)
+                self.link(step, head)
+            self.loops.append((step, done))
+        end = self.lower(node.body_n, body)
+        self.loops.pop()
+        if end is not None:
+            self.link(end, step)
+        self.path = self.path[:-1]
+        return done if done.preds else None
+
+    def lower_node_break_stmt(self, node, block):
+        # Outside a loop CodeGen emits nothing for 'afk'
+        if not self.loops:
+            return block
+        self.link(block, self.loops[-1][1])
+        return None
+
+    def lower_node_continue_stmt(self, node, block):
+        if not self.loops:
+            return block
+        self.link(block, self.loops[-1][0])
+        return None
+
+    def lower_node_return_block(self, node, block):
+        self.add(block, node, self.code_block)
+        self.link(block, self.exit)
+        return None
+
+    # ---- item facts ----
+
+    def scan(self, index):
+        """Records the tracked names item `index` defines and uses, and whether it steps one inside an expression."""
+        item = self.items[index]
+        node = item.expr if isinstance(item, Test) else item
+        kind = type(node).__name__
+        defs, uses, stepped = set(), set(), False
+        if kind in ('node_vardec', 'node_assign_stmt'):
+            defs.add(node.id_t["tokenName"])
+            if kind == 'node_assign_stmt' and node.op_t["tokenName"] != '=':
+                uses.add(node.id_t["tokenName"])
+        elif kind == 'node_input':
+            defs.update(t.id_t["tokenName"] for t in node.targets_n if type(t).__name__ == 'node_iden')
+        for sub in walk(node):
+            sub_kind = type(sub).__name__
+            if sub_kind == 'node_iden':
+                uses.add(sub.id_t["tokenName"])
+            elif sub_kind in ('node_pre_un_op', 'node_post_un_op') and sub.op_t["tokenName"] in ('++', '--'):
+                target = sub.right_n if sub_kind == 'node_pre_un_op' else sub.left_n
+                if type(target).__name__ == 'node_iden':
+                    defs.add(target.id_t["tokenName"])
+                stepped = stepped or sub is not node
+        facts = (defs & self.tracked, uses & self.tracked, stepped)
+        if index == len(self.defs):
+            self.defs.append(facts[0])
+            self.uses.append(facts[1])
+            self.stepped.append(facts[2])
+        else:
+            self.defs[index], self.uses[index], self.stepped[index] = facts
+
+    def reachable(self) -> set:
+        """Indices of the blocks control can get to from the entry."""
+        seen, todo = {self.entry.index}, [self.entry]
+        while todo:
+            for succ in todo.pop().succs:
+                if succ.index not in seen:
+                    seen.add(succ.index)
+                    todo.append(succ)
+        return seen
+
+    def visible(self, name, index) -> bool:
+        """Whether GGScript's scoping lets item `index` name variable `name`."""
+        path, position = self.scope[index]
+        return any(path[:len(decl_path)] == decl_path and decl_pos < position for decl_path, decl_pos in self.decls.get(name, ()))
+
+# ────────────────────────────────────────────────────────────────────────────────
+# DATAFLOW
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# solve() iterates a per-item transfer function to a fixed point over the blocks and
+# returns the fact at the start of each block (at its end for a backward problem).
+# Facts are sets; `meet` combines those of the neighbours, and `top` (None for the empty
+# set) starts every block but the boundary one.
+
+def solve(cfg, transfer, forward=True, meet=frozenset.union, boundary=frozenset(), top=None):
+    start = cfg.entry if forward else cfg.exit
+    initial = frozenset() if top is None else top
+    facts = {block.index: initial for block in cfg.blocks}
+    facts[start.index] = boundary
+    outs = {}
+    order = cfg.blocks if forward else cfg.blocks[::-1]
+    todo, queued = order[::-1], {block.index for block in order}
+    while todo:
+        block = todo.pop()
+        queued.discard(block.index)
+        fact = facts[block.index]
+        for index in (block.items if forward else reversed(block.items)):
+            fact = transfer(index, fact)
+        if outs.get(block.index) == fact:
+            continue
+        outs[block.index] = fact
+        for nxt in (block.succs if forward else block.preds):
+            if nxt is start:
+                continue
+            # Neighbours not solved yet add nothing to a union or take nothing from an intersection
+            found = [outs[src.index] for src in (nxt.preds if forward else nxt.succs) if src.index in outs]
+            merged = found[0]
+            for other in found[1:]:
+                merged = meet(merged, other)
+            if merged != facts[nxt.index]:
+                facts[nxt.index] = merged
+                if nxt.index not in queued:
+                    queued.add(nxt.index)
+                    todo.append(nxt)
+    return facts
+
+def liveness(cfg):
+    """The tracked names live at the end of each block, and the transfer to step back over an item."""
+    def transfer(index, live):
+        return (live - cfg.defs[index]) | cfg.uses[index]
+    return solve(cfg, transfer, forward=False), transfer
+
+def reaching_definitions(cfg):
+    """
+    The definitions reaching the start of each block, as (item index, name) pairs
+    ((ENTRY, name) for a parameter's argument or a local not yet assigned).
+    """
+    by_name = {}
+    for index, defs in enumerate(cfg.defs):
+        for name in defs:
+            by_name.setdefault(name, set()).add((index, name))
+    for name in cfg.tracked:
+        by_name.setdefault(name, set()).add((ENTRY, name))
+    def transfer(index, reach):
+        for name in cfg.defs[index]:
+            reach = (reach - by_name[name]) | {(index, name)}
+        return reach
+    return solve(cfg, transfer, boundary=frozenset((ENTRY, name) for name in cfg.tracked)), transfer
+
+def copies(cfg) -> dict:
+    """Item index -> (target, source iden) for each item that copies one tracked local into another."""
+    found = {}
+    for index, item in enumerate(cfg.items):
+        kind = type(item).__name__
+        if kind == 'node_vardec':
+            value = item.init_value_n
+            # Without the cast CodeGen would add, the two hold the very same value
+            if value is None or exact_type(value) != item.dtype_t["tokenName"]:
+                continue
+        elif kind == 'node_assign_stmt' and item.op_t["tokenName"] == '=':
+            value = item.value_n
+        else:
+            continue
+        target = item.id_t["tokenName"]
+        if type(value).__name__ != 'node_iden' or value.id_t["tokenName"] == target or cfg.stepped[index]:
+            continue
+        source = value.id_t["tokenName"]
+        if {target, source} <= cfg.tracked and cfg.dtypes[target] is not None and cfg.dtypes[target] == cfg.dtypes[source]:
+            found[index] = (target, value)
+    return found
+
+def available_copies(cfg, found):
+    """The copies (indices into `found`) that hold on every path to the start of each block."""
+    touching = {}
+    for index, (target, value) in found.items():
+        touching.setdefault(target, set()).add(index)
+        touching.setdefault(value.id_t["tokenName"], set()).add(index)
+    def transfer(index, avail):
+        for name in cfg.defs[index]:
+            avail = avail - touching.get(name, frozenset())
+        return avail | {index} if index in found else avail
+    return solve(cfg, transfer, meet=frozenset.intersection, top=frozenset(found)), transfer
+
+# ────────────────────────────────────────────────────────────────────────────────
+# OPTIMIZATIONS
+# ────────────────────────────────────────────────────────────────────────────────
+
+def constant_definitions(cfg) -> dict:
+    """Item index -> literal value for each item that sets a tracked local to a literal of its own type."""
+    found = {}
+    for index, item in enumerate(cfg.items):
+        kind = type(item).__name__
+        if kind == 'node_vardec':
+            value = item.init_value_n
+        elif kind == 'node_assign_stmt' and item.op_t["tokenName"] == '=':
+            value = item.value_n
+        else:
+            continue
+        name = item.id_t["tokenName"]
+        literal = literal_value(value) if value is not None else None
+        if name in cfg.tracked and literal is not None and literal_type(literal) == cfg.dtypes[name]:
+            found[index] = literal
+    return found
+
+def propagate(cfg) -> int:
+    """
+    Replaces a read of a local with the literal, or the other local, it was last set to
+    when that holds on every path (reaching definitions, available copies); returns how
+    many reads it replaced. Index expressions keep their names: IntervalAnalyzer's
+    index_ranges describe them as written.
+    """
+    constants, found = constant_definitions(cfg), copies(cfg)
+    if not constants and not found:
+        return 0
+    reach_in, reach = reaching_definitions(cfg)
+    avail_in, avail = available_copies(cfg, found)
+    live_blocks = cfg.reachable()
+    replaced = 0
+    for block in cfg.blocks:
+        if block.index not in live_blocks:
+            continue
+        reaching, holding = reach_in[block.index], avail_in[block.index]
+        for index in block.items:
+            item = cfg.items[index]
+            if cfg.uses[index] and not cfg.stepped[index] and type(item).__name__ not in ('node_input', 'node_arr_dec'):
+                by_name = {}
+                for def_index, name in reaching:
+                    by_name.setdefault(name, []).append(def_index)
+                copy_of = {found[c][0]: found[c][1] for c in holding}
+
+                def replacement(node, parent_op):
+                    name = node.id_t["tokenName"]
+                    if name not in cfg.tracked:
+                        return None
+                    defs = by_name.get(name, ())
+                    if len(defs) == 1 and defs[0] in constants:
+                        value = constants[defs[0]]
+                        # SemanticAnalyzer rejects a literal zero divisor
+                        if value == 0 and parent_op in ('/', '%'):
+                            return None
+                        return make_literal(value, node.id_t)
+                    source = copy_of.get(name)
+                    if source is not None and cfg.visible(source.id_t["tokenName"], index):
+                        copy = node_iden({**node.id_t, "tokenName": source.id_t["tokenName"]})
+                        for attr in ('static_type', 'symbol'):
+                            if hasattr(source, attr):
+                                setattr(copy, attr, getattr(source, attr))
+                        return copy
+                    return None
+
+                count = substitute(item, replacement)
+                if count:
+                    replaced += count
+                    cfg.scan(index)
+            reaching, holding = reach(index, reaching), avail(index, holding)
+    return replaced
+
+def substitute(item, replacement) -> int:
+    """Puts replacement(iden, parent operator) in place of the idens `item` reads, where it isn't None."""
+    if isinstance(item, Test):
+        node = item.expr
+        if type(node).__name__ == 'node_iden':
+            new = replacement(node, None)
+            if new is None:
+                return 0
+            setattr(item.owner, item.attr, new)
+            return 1
+        return replace_reads(node, replacement)
+    return replace_reads(item, replacement)
+
+def replace_reads(node, replacement) -> int:
+    count = 0
+    kind = type(node).__name__
+    if kind == 'node_arr_idx':
+        return 0
+    if kind in ('node_pre_un_op', 'node_post_un_op') and node.op_t["tokenName"] in ('++', '--'):
+        return 0
+    op = node.op_t["tokenName"] if kind == 'node_bi_op' else None
+    for attr in child_fields(node):
+        val = getattr(node, attr)
+        if isinstance(val, list):
+            for i, sub in enumerate(val):
+                if type(sub).__name__ == 'node_iden':
+                    new = replacement(sub, None)
+                    if new is not None:
+                        val[i] = new
+                        count += 1
+                elif child_fields(sub) is not None:
+                    count += replace_reads(sub, replacement)
+        elif type(val).__name__ == 'node_iden':
+            new = replacement(val, op if attr == 'right_n' else None)
+            if new is not None:
+                setattr(node, attr, new)
+                count += 1
+        elif val is not None and child_fields(val) is not None:
+            count += replace_reads(val, replacement)
+    return count
+
+def dead_store(item) -> bool:
+    """Whether `item` only stores into its target: dropping it leaves everything else as it was."""
+    kind = type(item).__name__
+    if kind == 'node_assign_stmt':
+        # A compound assignment may raise on a target of unproven type
+        return item.op_t["tokenName"] == '=' and pure(item.value_n)
+    if kind in ('node_pre_un_op', 'node_post_un_op') and item.op_t["tokenName"] in ('++', '--'):
+        target = item.right_n if kind == 'node_pre_un_op' else item.left_n
+        return type(target).__name__ == 'node_iden'
+    return False
+
+def eliminate_dead_stores(cfg) -> int:
+    """Removes statements storing into a local no later statement reads (liveness); returns how many."""
+    live_out, transfer = liveness(cfg)
+    removed = {}
+    for block in cfg.blocks:
+        live = live_out[block.index]
+        for index in reversed(block.items):
+            item, holder = cfg.items[index], cfg.holder[index]
+            defs = cfg.defs[index]
+            if holder is not None and defs and not (defs & live) and dead_store(item):
+                removed.setdefault(id(holder), (holder, set()))[1].add(id(item))
+                continue
+            live = transfer(index, live)
+    for holder, ids in removed.values():
+        holder.statements_n = [stmt for stmt in holder.statements_n if id(stmt) not in ids]
+    return sum(len(ids) for _, ids in removed.values())
+
+def optimize_unit(unit, global_names=frozenset()) -> int:
+    """Copy propagation then dead-store elimination over the CFG of function or lobby `unit`."""
+    cfg = CFG(unit, global_names)
+    return propagate(cfg) + eliminate_dead_stores(cfg)
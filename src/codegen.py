@@ -1,12 +1,32 @@
 import builtins
 
+from .passes import DEFAULT_LEVEL, PassManager
+from .runtime import runtime_source
+from .semantic import exact_type
+
+# Identifiers that would shadow a Python builtin are emitted with a leading '_'
+BUILTIN_NAMES = frozenset(dir(builtins))
+
+# Casts that turn a value into an array element of each dtype (GGScriptArray.init_value)
+LIST_CASTS = {'frag': 'int', 'elo': 'float', 'surebol': 'bool', 'ign': 'str', 'tag': 'str'}
+
+# Results a memoized function keeps (GGScriptMemo); past that its cache starts over
+MEMO_SIZE = 1 << 18
+
 class CodeGen:
-    def __init__(self):
-        self.generated_code = ""
+    def __init__(self, standalone=False, opt_level=DEFAULT_LEVEL, debug_passes=False):
+        # standalone: embed the runtime so the output runs without src/ (for exported code)
+        self.standalone = standalone
+        # Optimization passes (src/passes.py) run over the AST before it is visited
+        self.passes = PassManager(opt_level, debug_passes)
+        self.code_lines = []    # output chunks, joined once at the end of compile()
+        self.runtime_uses = set()   # runtime names (src/runtime.py) the emitted code refers to
         self.indent_level = 0
         self.global_vars = set()
         self.current_function = None
+        self.memo = None        # cache name of the function being emitted, when the 'memoize' pass marked it
         self.loop_depth = 0
+        self.loop_updates = []  # per enclosing loop: the grind update a 'hop' has to run first, or None
         
         # GGScript to Python default values mapping
         self.type_defaults = {
@@ -20,95 +40,39 @@ class CodeGen:
     def indent(self):
         return "    " * self.indent_level
 
+    def emit(self, line):
+        """Buffers one line of output at the current indentation."""
+        self.code_lines.append(f"{self.indent()}{line}\n")
+
+    def require(self, name):
+        """Records that the emitted code uses runtime name `name`; returns it for inline use."""
+        self.runtime_uses.add(name)
+        return name
+
     def get_runtime_environment(self):
-        """Injects GGScript built-in classes (like arrays) into the Python execution space"""
-        return """
-class GGScriptArray:
-    def __init__(self, dtype, dims=1, initial_values=None):
-        self.dtype = dtype
-        self.dims = dims
-        self.default = {'frag': 0, 'elo': 0.0, 'ign': "", 'tag': '', 'surebol': False}.get(dtype, None)
-        
-        self.data = []
-        if dims == 1:
-            if initial_values is not None:
-                for val in initial_values:
-                    if dtype == 'frag': self.data.append(int(val))
-                    elif dtype == 'elo': self.data.append(float(val))
-                    elif dtype == 'surebol': self.data.append(bool(val))
-                    else: self.data.append(str(val))
-        elif dims == 2:
-            if initial_values is not None:
-                for row in initial_values:
-                    new_row = []
-                    for val in row:
-                        if dtype == 'frag': new_row.append(int(val))
-                        elif dtype == 'elo': new_row.append(float(val))
-                        elif dtype == 'surebol': new_row.append(bool(val))
-                        else: new_row.append(str(val))
-                    self.data.append(new_row)
-
-    def append(self, val):
-        if self.dtype == 'frag': val = int(val)
-        elif self.dtype == 'elo': val = float(val)
-        elif self.dtype == 'surebol': val = bool(val)
-        self.data.append(val)
-
-    def pop(self):
-        return self.data.pop() if self.data else self.default
-
-    def insert(self, idx, val):
-        if self.dtype == 'frag': val = int(val)
-        elif self.dtype == 'elo': val = float(val)
-        elif self.dtype == 'surebol': val = bool(val)
-        self.data.insert(idx, val)
-
-    def __len__(self):
-        return len(self.data)
-
-    def __getitem__(self, index):
-        if isinstance(index, tuple):   
-            row, col = index
-            if row >= len(self.data) or col >= len(self.data[row]): return self.default
-            return self.data[row][col]
-        else: 
-            if index >= len(self.data): return self.default
-            return self.data[index]
-    
-    def __setitem__(self, index, value):
-        if isinstance(index, tuple): 
-            row, col = index
-            while row >= len(self.data): self.data.append([])
-            while col >= len(self.data[row]): self.data[row].append(self.default)
-            if self.dtype == 'frag': self.data[row][col] = int(value)
-            elif self.dtype == 'elo': self.data[row][col] = float(value)
-            else: self.data[row][col] = value
-        else: 
-            while index >= len(self.data): self.data.append(self.default)
-            if self.dtype == 'frag': self.data[index] = int(value)
-            elif self.dtype == 'elo': self.data[index] = float(value)
-            else: self.data[index] = value
-    
-    def __repr__(self):
-        return str(self.data)
-"""
+        """Source of the runtime pieces the emitted code uses, for standalone output."""
+        return runtime_source(self.runtime_uses)
+
+    def header(self):
+        """Puts the standalone runtime (if any) in front of the emitted program."""
+        runtime = [self.get_runtime_environment(), "\n"] if self.standalone and self.runtime_uses else []
+        self.code_lines[:0] = runtime + ["# --- COMPILED GGSCRIPT ---\n\n"]
 
     def compile(self, ast_node) -> tuple[bool, str]:
         """Main entry point called by the IDE pipeline."""
         try:
-            # Setup imports and Runtime Env
-            self.generated_code = "import math\n\n"
-            self.generated_code += self.get_runtime_environment()
-            self.generated_code += "\n# --- COMPILED GGSCRIPT ---\n\n"
-            
             # Start AST Traversal
+            self.code_lines = []
+            self.passes.run(ast_node)
             self.visit(ast_node)
             
             # Direct Execution Trigger (Bypassing __main__ isolation for IDE exec threads)
-            self.generated_code += "\nif 'lobby' in locals() or 'lobby' in globals():\n"
-            self.generated_code += "    lobby()\n"
-            
-            return True, self.generated_code
+            self.code_lines.append("\nif 'lobby' in locals() or 'lobby' in globals():\n")
+            self.code_lines.append("    lobby()\n")
+
+            # The host injects runtime_namespace(); standalone code carries the pieces it uses
+            self.header()
+            return True, "".join(self.code_lines)
         except Exception as e:
             import traceback
             return False, f"Code Generation Failed: {str(e)}\n{traceback.format_exc()}"
@@ -149,23 +113,23 @@ class GGScriptArray:
 
     def visit_node_main_func(self, node):
         self.current_function = "lobby"
-        self.generated_code += f"{self.indent()}def lobby():\n"
+        self.emit("def lobby():")
         self.indent_level += 1
         
         # FIX: Explicitly bind the IDE terminal commands to the global scope to prevent Thread execution NameErrors
-        self.generated_code += f"{self.indent()}global console_disp, console_insp\n"
+        self.emit("global console_disp, console_insp")
         
         if self.global_vars:
-            safe_globals = [f"_{g}" if g in dir(builtins) else g for g in self.global_vars]
-            self.generated_code += f"{self.indent()}global {', '.join(safe_globals)}\n"
+            safe_globals = [f"_{g}" if g in BUILTIN_NAMES else g for g in self.global_vars]
+            self.emit(f"global {', '.join(safe_globals)}")
             
         if not node.body_n.statements_n:
-            self.generated_code += f"{self.indent()}pass\n"
+            self.emit("pass")
         else:
             self.visit(node.body_n)
             
         self.indent_level -= 1
-        self.generated_code += "\n"
+        self.code_lines.append("\n")
         self.current_function = None
         return ""
 
@@ -174,65 +138,98 @@ class GGScriptArray:
             res = self.visit(stmt)
 
             if res:
-                 self.generated_code += f"{self.indent()}{res}\n"
+                 self.emit(f"{res}")
         return ""
 
     def visit_node_func_dec(self, node):
         func_name = node.id_t["tokenName"]
-        if func_name in dir(builtins): func_name = f"_{func_name}"
+        if func_name in BUILTIN_NAMES: func_name = f"_{func_name}"
         self.current_function = func_name
         
         params = []
         if node.params_n:
             for p in node.params_n:
                 p_name = p.id_t["tokenName"]
-                if p_name in dir(builtins): p_name = f"_{p_name}"
+                if p_name in BUILTIN_NAMES: p_name = f"_{p_name}"
                 params.append(p_name)
                 
-        self.generated_code += f"{self.indent()}def {func_name}({', '.join(params)}):\n"
+        self.emit_memo_cache(node, func_name)
+        self.emit(f"def {func_name}({', '.join(params)}):")
         self.indent_level += 1
         
         # FIX: Explicitly bind the IDE terminal commands to the global scope
-        self.generated_code += f"{self.indent()}global console_disp, console_insp\n"
+        self.emit("global console_disp, console_insp")
         
         if self.global_vars:
-            safe_globals = [f"_{g}" if g in dir(builtins) else g for g in self.global_vars]
-            self.generated_code += f"{self.indent()}global {', '.join(safe_globals)}\n"
+            safe_globals = [f"_{g}" if g in BUILTIN_NAMES else g for g in self.global_vars]
+            self.emit(f"global {', '.join(safe_globals)}")
             
+        self.emit_memo_lookup(node, params)
         if not node.body_n.statements_n:
-            self.generated_code += f"{self.indent()}pass\n"
+            self.emit("pass")
         else:
             self.visit(node.body_n)
             
         self.indent_level -= 1
-        self.generated_code += "\n"
+        self.code_lines.append("\n")
         self.current_function = None
+        self.memo = None
         return ""
 
+    def emit_memo_cache(self, node, func_name):
+        """Declares the result cache of function `node` when the 'memoize' pass marked it (src/purity.py)."""
+        if getattr(node, 'memo', False):
+            self.memo = f"_memo_{func_name}"
+            self.emit(f"{self.memo} = {self.require('GGScriptMemo')}({MEMO_SIZE})")
+
+    def memo_key(self, node, params):
+        """
+        The cache key of a memoized function's arguments `params` and the (param, Python type)
+        pairs that must hold for it: a 'frag' read by comsat may hold text or a float.
+        """
+        checks = [(name, LIST_CASTS[p.dtype_t["tokenName"]]) for name, p in zip(params, node.params_n or [])]
+        return params[0] if len(params) == 1 else f"({', '.join(params)})", checks
+
+    def emit_memo_lookup(self, node, params):
+        """Returns the cached result on entry to a memoized function."""
+        if self.memo is None:
+            return
+        key, checks = self.memo_key(node, params)
+        if checks:
+            key = f"{key} if {' and '.join(f'type({name}) is {cls}' for name, cls in checks)} else None"
+        self.emit(f"_memo_key = {key}")
+        self.emit(f"if _memo_key in {self.memo}:")
+        self.emit(f"    return {self.memo}[_memo_key]")
+
     # ==========================================
     # DECLARATIONS & ASSIGNMENTS
     # ==========================================
     def visit_node_vardec(self, node):
         var_name = node.id_t["tokenName"]
-        if var_name in dir(builtins): var_name = f"_{var_name}"
+        if var_name in BUILTIN_NAMES: var_name = f"_{var_name}"
         var_type = node.dtype_t["tokenName"]
         
         if node.init_value_n:
             val = self.visit(node.init_value_n)
-            if var_type == 'frag': val = f"int({val})"
-            elif var_type == 'elo': val = f"float({val})"
-            elif var_type == 'surebol': val = f"bool({val})"
-            self.generated_code += f"{self.indent()}{var_name} = {val}\n"
+            # The cast is only needed when semantic analysis couldn't prove the runtime type
+            if exact_type(node.init_value_n) != var_type:
+                if var_type == 'frag': val = f"int({val})"
+                elif var_type == 'elo': val = f"float({val})"
+                elif var_type == 'surebol': val = f"bool({val})"
+            self.emit(f"{var_name} = {val}")
         else:
             default_val = self.type_defaults.get(var_type, 'None')
-            self.generated_code += f"{self.indent()}{var_name} = {default_val}\n"
+            self.emit(f"{var_name} = {default_val}")
         return ""
 
     def visit_node_arr_dec(self, node):
         var_name = node.id_t["tokenName"]
-        if var_name in dir(builtins): var_name = f"_{var_name}"
+        if var_name in BUILTIN_NAMES: var_name = f"_{var_name}"
         var_type = node.dtype_t["tokenName"]
         dims = len(node.sizes_n)
+        if getattr(node, 'as_list', False):
+            self.emit(f"{var_name} = {self.list_literal(node)}")
+            return ""
         
         if node.init_values_n:
             def build_init_list(vals):
@@ -242,31 +239,89 @@ class GGScriptArray:
                 else:
                     return "[" + ", ".join(str(self.visit(v)) for v in vals) + "]"
             init_str = build_init_list(node.init_values_n)
-            self.generated_code += f"{self.indent()}{var_name} = GGScriptArray('{var_type}', {dims}, {init_str})\n"
+            args = f"'{var_type}', {dims}, {init_str}"
         else:
-            self.generated_code += f"{self.indent()}{var_name} = GGScriptArray('{var_type}', {dims})\n"
+            args = f"'{var_type}', {dims}"
+        sizes = self.size_hint(node)
+        if sizes:
+            dims_str = ", ".join(str(self.visit(size)) for size in sizes)
+            args += f", sizes=({dims_str},)" if len(sizes) == 1 else f", sizes=({dims_str})"
+        self.emit(f"{var_name} = {self.array_class(var_type, dims)}({args})")
         return ""
 
+    def array_class(self, dtype, dims):
+        """Runtime class for a declared array: unboxed storage for 'frag'/'elo', flat rows for 2-D."""
+        prefix = {'frag': 'GGScriptFragArray', 'elo': 'GGScriptEloArray'}.get(dtype, 'GGScriptArray')
+        return self.require(prefix + '2D' if dims == 2 else prefix)
+
+    def list_literal(self, node):
+        """An array marked `as_list` (src/bounds.py): every declared cell, initializers coerced like init_value()."""
+        var_type = node.dtype_t["tokenName"]
+        default = self.type_defaults.get(var_type, 'None')
+        sizes = [int(size.val_t["tokenName"]) for size in node.sizes_n]
+
+        def cells(vals, n):
+            items = []
+            for val_n in vals:
+                val = str(self.visit(val_n))
+                cast = LIST_CASTS.get(var_type)
+                items.append(val if exact_type(val_n) == var_type or cast is None else f"{cast}({val})")
+            if len(items) >= n: return f"[{', '.join(items)}]"
+            if not items: return f"[{default}] * {n}"
+            return f"[{', '.join(items)}] + [{default}] * {n - len(items)}"
+
+        vals = node.init_values_n or []
+        if len(sizes) == 1:
+            return cells(vals, sizes[0])
+        rows, blank = [cells(row, sizes[1]) for row in vals], f"[{cells([], sizes[1])} for _ in range({sizes[0] - len(vals)})]"
+        if len(rows) >= sizes[0]: return f"[{', '.join(rows)}]"
+        return f"[{', '.join(rows)}] + {blank}" if rows else blank
+
+    def size_hint(self, node):
+        """The declared sizes, as preallocation hints when they are plain numbers or names (so no extra code runs)."""
+        if all(type(size).__name__ in ('node_num', 'node_iden') for size in node.sizes_n):
+            return node.sizes_n
+        return None
+
     def visit_node_assign_stmt(self, node):
         var_name = node.id_t["tokenName"]
-        if var_name in dir(builtins): var_name = f"_{var_name}"
+        if var_name in BUILTIN_NAMES: var_name = f"_{var_name}"
         op = node.op_t["tokenName"]
         if op == '/=': op = '//='
         val = self.visit(node.value_n)
-        self.generated_code += f"{self.indent()}{var_name} {op} {val}\n"
+        self.emit(f"{var_name} {op} {val}")
         return ""
 
     def visit_node_arr_assign_stmt(self, node):
         var_name = node.arr_idx_n.id_t["tokenName"]
-        if var_name in dir(builtins): var_name = f"_{var_name}"
+        if var_name in BUILTIN_NAMES: var_name = f"_{var_name}"
         op = node.op_t["tokenName"]
         if op == '/=': op = '//='
         val = self.visit(node.value_n)
         
         indices = [str(self.visit(idx)) for idx in node.arr_idx_n.indices_n]
         idx_str = f"[{indices[0]}]" if len(indices) == 1 else f"[{', '.join(indices)}]"
+
+        arr_symbol = getattr(node.arr_idx_n, 'symbol', None)
+        if getattr(node.arr_idx_n, 'as_list', False):
+            target = var_name + "".join(f"[{idx}]" for idx in indices)
+            dtype, exact = arr_symbol["dtype"][1], exact_type(node.value_n)
+            cast = LIST_CASTS.get(dtype) if dtype in ('frag', 'elo') else None
+            # Lists do not coerce, so the store does whatever the runtime's __setitem__ would
+            if cast is None or exact == dtype or (dtype == 'elo' and exact == 'frag' and op != '='):
+                self.emit(f"{target} {op} {val}")
+            elif op == '=':
+                self.emit(f"{target} = {cast}({val})")
+            else:
+                self.emit(f"{target} = {cast}({target} {op[:-1]} {val})")
+            return ""
+        if op == '=' and arr_symbol and arr_symbol["dtype"][1] in ('frag', 'elo') and exact_type(node.value_n) == arr_symbol["dtype"][1]:
+            # Value already has the element type: skip the coercing __setitem__
+            key = indices[0] if len(indices) == 1 else f"({', '.join(indices)})"
+            self.emit(f"{var_name}.put({key}, {val})")
+            return ""
             
-        self.generated_code += f"{self.indent()}{var_name}{idx_str} {op} {val}\n"
+        self.emit(f"{var_name}{idx_str} {op} {val}")
         return ""
 
     # ==========================================
@@ -276,14 +331,14 @@ class GGScriptArray:
         for target in node.targets_n:
             if type(target).__name__ == "node_iden":
                 var_name = target.id_t["tokenName"]
-                safe_name = f"_{var_name}" if var_name in dir(builtins) else var_name
-                self.generated_code += f"{self.indent()}{safe_name} = console_insp('{var_name}')\n"
+                safe_name = f"_{var_name}" if var_name in BUILTIN_NAMES else var_name
+                self.emit(f"{safe_name} = console_insp('{var_name}')")
             elif type(target).__name__ == "node_arr_idx":
                 var_name = target.id_t["tokenName"]
-                safe_name = f"_{var_name}" if var_name in dir(builtins) else var_name
+                safe_name = f"_{var_name}" if var_name in BUILTIN_NAMES else var_name
                 indices = [str(self.visit(idx)) for idx in target.indices_n]
                 idx_str = f"[{', '.join(indices)}]" if len(indices) > 1 else f"[{indices[0]}]"
-                self.generated_code += f"{self.indent()}{safe_name}{idx_str} = console_insp('{var_name}{idx_str}')\n"
+                self.emit(f"{safe_name}{idx_str} = console_insp('{var_name}{idx_str}')")
         return ""
 
     def visit_node_output(self, node):
@@ -292,7 +347,7 @@ class GGScriptArray:
             parts.append(str(self.visit(item)))
             
         joined_args = ", ".join(parts)
-        self.generated_code += f"{self.indent()}console_disp({joined_args})\n"
+        self.emit(f"console_disp({joined_args})")
         return ""
 
     # ==========================================
@@ -300,10 +355,10 @@ class GGScriptArray:
     # ==========================================
     def visit_node_if_stmt(self, node):
         cond = self.visit(node.condition_n)
-        self.generated_code += f"{self.indent()}if {cond}:\n"
+        self.emit(f"if {cond}:")
         
         self.indent_level += 1
-        if not node.body_n.statements_n: self.generated_code += f"{self.indent()}pass\n"
+        if not node.body_n.statements_n: self.emit("pass")
         else: self.visit(node.body_n)
         self.indent_level -= 1
         
@@ -317,26 +372,26 @@ class GGScriptArray:
 
     def visit_node_else_if_stmt(self, node):
         cond = self.visit(node.condition_n)
-        self.generated_code += f"{self.indent()}elif {cond}:\n"
+        self.emit(f"elif {cond}:")
         
         self.indent_level += 1
-        if not node.body_n.statements_n: self.generated_code += f"{self.indent()}pass\n"
+        if not node.body_n.statements_n: self.emit("pass")
         else: self.visit(node.body_n)
         self.indent_level -= 1
         return ""
 
     def visit_node_else_stmt(self, node):
-        self.generated_code += f"{self.indent()}else:\n"
+        self.emit("else:")
         
         self.indent_level += 1
-        if not node.body_n.statements_n: self.generated_code += f"{self.indent()}pass\n"
+        if not node.body_n.statements_n: self.emit("pass")
         else: self.visit(node.body_n)
         self.indent_level -= 1
         return ""
 
     def visit_node_switch_stmt(self, node):
         val = self.visit(node.value_n)
-        self.generated_code += f"{self.indent()}match {val}:\n"
+        self.emit(f"match {val}:")
         self.indent_level += 1
         
         for case_stmt in node.cases_n:
@@ -350,17 +405,17 @@ class GGScriptArray:
 
     def visit_node_case_stmt(self, node):
         val = self.visit(node.case_value_n)
-        self.generated_code += f"{self.indent()}case {val}:\n"
+        self.emit(f"case {val}:")
         self.indent_level += 1
-        if not node.body_n.statements_n: self.generated_code += f"{self.indent()}pass\n"
+        if not node.body_n.statements_n: self.emit("pass")
         else: self.visit(node.body_n)
         self.indent_level -= 1
         return ""
 
     def visit_node_default_stmt(self, node):
-        self.generated_code += f"{self.indent()}case _:\n"
+        self.emit("case _:")
         self.indent_level += 1
-        if not node.body_n.statements_n: self.generated_code += f"{self.indent()}pass\n"
+        if not node.body_n.statements_n: self.emit("pass")
         else: self.visit(node.body_n)
         self.indent_level -= 1
         return ""
@@ -368,7 +423,28 @@ class GGScriptArray:
     def visit_node_loop_stmt(self, node):
         self.loop_depth += 1
 
-        if node.loop_type == "grind":
+        counted = getattr(node, 'counted', None)
+        self.loop_updates.append(node.update_n if node.loop_type == "grind" and not counted else None)
+
+        if counted:
+            self.visit(node.init_n[0] if isinstance(node.init_n, list) else node.init_n)
+            var = f"_{counted.var}" if counted.var in BUILTIN_NAMES else counted.var
+            stop = self.visit(counted.stop_n)
+            if counted.stop_adjust: stop = f"{stop} {'+' if counted.stop_adjust > 0 else '-'} 1"
+            step = f", {counted.step}" if counted.step != 1 else ""
+            self.emit(f"for {var} in range({var}, {stop}{step}):")
+            self.indent_level += 1
+            if not node.body_n.statements_n: self.emit("pass")
+            else: self.visit(node.body_n)
+            self.indent_level -= 1
+            # Leave the variable where the while loop would: one more test-and-step past the last pass
+            self.emit("else:")
+            self.emit(f"    if {self.visit(node.condition_n)}:")
+            self.indent_level += 2
+            self.visit(node.update_n)
+            self.indent_level -= 2
+
+        elif node.loop_type == "grind":
             if node.init_n:
                 if isinstance(node.init_n, list):
                     for init in node.init_n: self.visit(init)
@@ -376,14 +452,14 @@ class GGScriptArray:
                     self.visit(node.init_n)
                     
             cond = self.visit(node.condition_n) if node.condition_n else "True"
-            self.generated_code += f"{self.indent()}while {cond}:\n"
+            self.emit(f"while {cond}:")
             
             self.indent_level += 1
             if not node.body_n.statements_n:
                 if node.update_n:
                     self.visit(node.update_n) 
                 else:
-                    self.generated_code += f"{self.indent()}pass\n"
+                    self.emit("pass")
             else: 
                 self.visit(node.body_n)
                 if node.update_n:
@@ -392,22 +468,23 @@ class GGScriptArray:
 
         elif node.loop_type == "retry":
             cond = self.visit(node.condition_n)
-            self.generated_code += f"{self.indent()}while {cond}:\n"
+            self.emit(f"while {cond}:")
             self.indent_level += 1
-            if not node.body_n.statements_n: self.generated_code += f"{self.indent()}pass\n"
+            if not node.body_n.statements_n: self.emit("pass")
             else: self.visit(node.body_n)
             self.indent_level -= 1
 
         elif node.loop_type == "try":
-            self.generated_code += f"{self.indent()}while True:\n"
+            self.emit("while True:")
             self.indent_level += 1
-            if not node.body_n.statements_n: self.generated_code += f"{self.indent()}pass\n"
+            if not node.body_n.statements_n: self.emit("pass")
             else: self.visit(node.body_n)
             
             cond = self.visit(node.condition_n)
-            self.generated_code += f"{self.indent()}if not ({cond}):\n"
-            self.generated_code += f"{self.indent()}    break\n"
+            self.emit(f"if not ({cond}):")
+            self.emit("    break")
             self.indent_level -= 1
+        self.loop_updates.pop()
         self.loop_depth -= 1   
         return ""
 
@@ -416,24 +493,24 @@ class GGScriptArray:
     # ==========================================
     def visit_node_func_call(self, node):
         func_name = node.id_t["tokenName"]
-        if func_name in dir(builtins): func_name = f"_{func_name}"
+        if func_name in BUILTIN_NAMES: func_name = f"_{func_name}"
         args = [str(self.visit(arg)) for arg in node.args_n]
         return f"{func_name}({', '.join(args)})"
 
     def visit_node_method_call(self, node):
         var_name = node.id_t["tokenName"]
-        if var_name in dir(builtins): var_name = f"_{var_name}"
+        if var_name in BUILTIN_NAMES: var_name = f"_{var_name}"
         method_name = node.method_t["tokenName"]
         args = [str(self.visit(arg)) for arg in node.args_n]
         
         # Translate native GGScript Array and String Methods natively to python logic
         if method_name == "stack":
-            self.generated_code += f"{self.indent()}{var_name}.append({', '.join(args)})\n"
+            self.emit(f"{var_name}.append({', '.join(args)})")
             return ""
         elif method_name == "drop":
             return f"{var_name}.pop()"
         elif method_name == "craft":
-            self.generated_code += f"{self.indent()}{var_name}.insert({args[0]}, {args[1]})\n"
+            self.emit(f"{var_name}.insert({args[0]}, {args[1]})")
             return ""
         elif method_name == "count":
             return f"len({var_name})"
@@ -456,10 +533,10 @@ class GGScriptArray:
         right = self.visit(node.right_n)
         if op == '!': return f"(not {right})"
         elif op == '++':
-            self.generated_code += f"{self.indent()}{right} += 1\n"
+            self.emit(f"{right} += 1")
             return right
         elif op == '--':
-            self.generated_code += f"{self.indent()}{right} -= 1\n"
+            self.emit(f"{right} -= 1")
             return right
         return f"({op}{right})"
 
@@ -467,20 +544,21 @@ class GGScriptArray:
         left = self.visit(node.left_n)
         op = node.op_t["tokenName"]
         if op == '++':
-            self.generated_code += f"{self.indent()}{left} += 1\n"
+            self.emit(f"{left} += 1")
         elif op == '--':
-            self.generated_code += f"{self.indent()}{left} -= 1\n"
+            self.emit(f"{left} -= 1")
         return left
 
     def visit_node_iden(self, node):
         var_name = node.id_t["tokenName"]
-        if var_name in dir(builtins): var_name = f"_{var_name}"
+        if var_name in BUILTIN_NAMES: var_name = f"_{var_name}"
         return var_name
 
     def visit_node_arr_idx(self, node):
         var_name = node.id_t["tokenName"]
-        if var_name in dir(builtins): var_name = f"_{var_name}"
+        if var_name in BUILTIN_NAMES: var_name = f"_{var_name}"
         indices = [str(self.visit(idx)) for idx in node.indices_n]
+        if getattr(node, 'as_list', False): return var_name + "".join(f"[{idx}]" for idx in indices)
         if len(indices) == 1: return f"{var_name}[{indices[0]}]"
         return f"{var_name}[{indices[0]}, {indices[1]}]"
 
@@ -507,18 +585,23 @@ class GGScriptArray:
     # JUMP STATEMENTS
     # ==========================================
     def visit_node_break_stmt(self, node):
-        if self.loop_depth > 0:
-            self.generated_code += f"{self.indent()}break\n"
+        # Outside a loop 'afk' does nothing, but it may be all a 'pick' case holds
+        self.emit("break" if self.loop_depth > 0 else "pass")
         return ""
 
     def visit_node_continue_stmt(self, node):
-        self.generated_code += f"{self.indent()}continue\n"
+        # 'hop' in a grind still steps the loop variable, as in a C for loop
+        if self.loop_updates and self.loop_updates[-1]:
+            self.visit(self.loop_updates[-1])
+        self.emit("continue")
         return ""
 
     def visit_node_return_block(self, node):
         if node.ret_value_n:
             val = self.visit(node.ret_value_n)
-            self.generated_code += f"{self.indent()}return {val}\n"
+            if self.memo is not None:
+                val = f"{self.memo}.store(_memo_key, {val})"
+            self.emit(f"return {val}")
         else:
-            self.generated_code += f"{self.indent()}return\n"
+            self.emit("return")
         return ""
\ No newline at end of file
@@ -0,0 +1,205 @@
+from .cfg import CFG, Test
+from .licm import expr_key, may_raise, cannot_raise, resized_arrays, shared_arrays, with_aliases, temporary, read_temporary
+from .fold import first_token
+from .loops import child_fields, walk, written_names
+
+# ────────────────────────────────────────────────────────────────────────────────
+# COMMON SUBEXPRESSION ELIMINATION
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# Within a basic block, an arithmetic expression, array read or count that is evaluated
+# again with nothing in between writing what it reads is computed once, into a `_cseN`
+# temporary declared just before the statement (or 'clutch'/'pick') that first evaluates
+# it. Writes to any element of an array invalidate all of its reads, under any of its
+# names (see licm.shared_arrays); a function call invalidates every array read and
+# every expression that reads a global. Statements that call a function, or step a
+# variable inside an expression, take no part.
+#
+# Declaring the temporary evaluates the first occurrence a little earlier than its
+# statement did, so it only moves when that changes nothing: it cannot raise, or it is
+# always evaluated and whatever its statement evaluates before it that could raise
+# first is computed into an earlier temporary too.
+
+ARITHMETIC = frozenset(('+', '-', '*', '/', '%'))
+
+def candidate(node) -> bool:
+    kind = type(node).__name__
+    if kind == 'node_bi_op':
+        return node.op_t["tokenName"] in ARITHMETIC
+    if kind == 'node_method_call':
+        return node.method_t["tokenName"] == 'count'
+    return kind == 'node_arr_idx'
+
+def operands(node) -> list:
+    """The expressions statement `node` reads, in the order the emitted Python evaluates them."""
+    kind = type(node).__name__
+    if kind == 'node_vardec':
+        return [node.init_value_n] if node.init_value_n is not None else []
+    if kind == 'node_assign_stmt':
+        return [node.value_n]
+    if kind == 'node_arr_assign_stmt':
+        return [node.value_n] + list(node.arr_idx_n.indices_n)
+    if kind == 'node_output':
+        return list(node.print_params_n)
+    if kind == 'node_return_block':
+        return [node.ret_value_n] if node.ret_value_n is not None else []
+    if kind == 'node_input':
+        return [idx for target in node.targets_n if type(target).__name__ == 'node_arr_idx' for idx in target.indices_n]
+    if kind in ('node_pre_un_op', 'node_post_un_op') and node.op_t["tokenName"] in ('++', '--'):
+        target = node.right_n if kind == 'node_pre_un_op' else node.left_n
+        return list(target.indices_n) if type(target).__name__ == 'node_arr_idx' else []
+    return []
+
+class Available:
+    """An expression value a block can reuse: its occurrences, the first of which gets the temporary."""
+    __slots__ = ('nodes', 'names', 'memory', 'anchor', 'holder', 'after', 'read')
+
+    def __init__(self, node, anchor, holder, global_names, after):
+        self.nodes = [node]
+        named = [item for item in walk(node) if hasattr(item, 'id_t')]
+        self.names = {item.id_t["tokenName"] for item in named}
+        self.memory = any(type(item).__name__ != 'node_iden' for item in named) or bool(self.names & global_names)
+        self.anchor = anchor
+        self.holder = holder
+        # What its statement evaluates before it that may raise (see SubexpressionEliminator.find)
+        self.after = after
+        self.read = None
+
+class SubexpressionEliminator:
+    """Reuses the values of repeated expressions within each basic block (see above)."""
+    def __init__(self, global_names=frozenset()):
+        self.global_names = global_names
+        self.temps = 0
+        self.available = {}
+        self.raisers = []
+        self.shared = frozenset()
+
+    def eliminate_program(self, program):
+        units = list(program.funcs_n) + ([program.main_n] if program.main_n else [])
+        return sum(self.eliminate_unit(unit) for unit in units)
+
+    def eliminate_unit(self, unit) -> int:
+        cfg = CFG(unit, self.global_names)
+        self.shared = shared_arrays(unit, self.global_names)
+        found = []
+        for block in cfg.blocks:
+            self.available = {}
+            for index in block.items:
+                self.scan(cfg, index, found)
+        valid = {}
+        reused = [entry for entry in found if self.valid(entry, valid)]
+        if not reused:
+            return 0
+
+        planned = {id(node): entry for entry in reused for node in entry.nodes}
+        inserts = {}
+        for index, item in enumerate(cfg.items):
+            if isinstance(item, Test):
+                setattr(item.owner, item.attr, self.apply(item.expr, planned, inserts))
+            else:
+                # First occurrences are replaced before their repeats: an element store evaluates its value first
+                fields = child_fields(item)
+                if type(item).__name__ == 'node_arr_assign_stmt':
+                    fields = ('value_n', 'arr_idx_n')
+                for attr in fields:
+                    setattr(item, attr, self.apply(getattr(item, attr), planned, inserts))
+        for holder, before in inserts.values():
+            statements = []
+            for stmt in holder.statements_n:
+                statements.extend(before.get(id(stmt), ()))
+                statements.append(stmt)
+            holder.statements_n = statements
+        return sum(len(entry.nodes) - 1 for entry in reused)
+
+    def scan(self, cfg, index, found):
+        """Records the occurrences item `index` evaluates, then drops the values it invalidates."""
+        item = cfg.items[index]
+        node = item.expr if isinstance(item, Test) else item
+        arrays = with_aliases(resized_arrays(node), self.shared)
+        barrier = cfg.stepped[index] or arrays is None or \
+            any(type(sub).__name__ == 'node_method_call' and sub.method_t["tokenName"] != 'count' for sub in walk(node))
+        if not barrier:
+            holder = cfg.holder[index]
+            anchor = item.owner if isinstance(item, Test) else item
+            kind = type(node).__name__
+            # 'comsat' reads before it evaluates the indices, and an element store's order depends on how it is emitted
+            hosts = holder is not None and kind != 'node_input'
+            self.raisers = []
+            for expr in ([node] if isinstance(item, Test) else operands(node)):
+                self.find(expr, False, hosts, kind == 'node_arr_assign_stmt', anchor, holder, found)
+
+        written = written_names(node) | (arrays or set())
+        self.available = {key: entry for key, entry in self.available.items()
+                          if not (entry.names & written or (entry.memory and barrier))}
+
+    def find(self, node, conditional, hosts, strict, anchor, holder, found):
+        """
+        Visits expression `node` in evaluation order; `conditional` under the right operand of
+        '&&'/'||'. `raisers` lists what the statement evaluated so far may raise at: None for
+        a node, (entry, inner) for the first occurrence of `entry`, which raises at its inner
+        raisers unless its temporary computes it beforehand.
+        """
+        if node is None or child_fields(node) is None:
+            return
+        entry = None
+        if candidate(node) and getattr(node, 'static_type', None):
+            key = expr_key(node)
+            if key is not None:
+                if key in self.available:
+                    self.available[key].nodes.append(node)
+                    return
+                safe = cannot_raise(node)
+                if hosts and (safe or not (conditional or strict)):
+                    entry = Available(node, anchor, holder, self.global_names, [] if safe else list(self.raisers))
+                    self.available[key] = entry
+                    found.append(entry)
+        mark = len(self.raisers)
+        if type(node).__name__ == 'node_bi_op':
+            self.find(node.left_n, conditional, hosts, strict, anchor, holder, found)
+            conditional = conditional or node.op_t["tokenName"] in ('&&', '||')
+            self.find(node.right_n, conditional, hosts, strict, anchor, holder, found)
+        else:
+            for attr in child_fields(node):
+                val = getattr(node, attr)
+                for sub in (val if isinstance(val, list) else [val]):
+                    self.find(sub, conditional, hosts, strict, anchor, holder, found)
+        if may_raise(node):
+            self.raisers.append(None)
+        if entry is not None and len(self.raisers) > mark:
+            self.raisers[mark:] = [(entry, self.raisers[mark:])]
+
+    def valid(self, entry, memo) -> bool:
+        """
+        Whether `entry` gets a temporary: it is used again, and whatever its statement could
+        raise at before it gets a temporary of its own, computed earlier.
+        """
+        if id(entry) not in memo:
+            memo[id(entry)] = len(entry.nodes) > 1 and all(self.covered(raiser, memo) for raiser in entry.after)
+        return memo[id(entry)]
+
+    def covered(self, raiser, memo) -> bool:
+        if raiser is None:
+            return False
+        entry, inner = raiser
+        return self.valid(entry, memo) or all(self.covered(sub, memo) for sub in inner)
+
+    def apply(self, val, planned, inserts):
+        """`val` with the planned occurrences below it (or it) replaced by reads of their temporaries."""
+        if isinstance(val, list):
+            return [self.apply(item, planned, inserts) for item in val]
+        if val is None or child_fields(val) is None:
+            return val
+        entry = planned.get(id(val))
+        if entry is not None and val is not entry.nodes[0]:
+            return read_temporary(*entry.read, first_token(val))
+        for attr in child_fields(val):
+            setattr(val, attr, self.apply(getattr(val, attr), planned, inserts))
+        if entry is None:
+            return val
+        self.temps += 1
+        name = f"_cse{self.temps}"
+        statements, symbol = temporary(name, val)
+        before = inserts.setdefault(id(entry.holder), (entry.holder, {}))[1]
+        before.setdefault(id(entry.anchor), []).extend(statements)
+        entry.read = (name, symbol)
+        return read_temporary(name, symbol, first_token(val))
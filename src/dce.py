@@ -0,0 +1,179 @@
+from .fold import make_literal, literal_value, first_token
+from .loops import Rewriter, walk
+from .semantic import exact_type, node_if_stmt, node_else_stmt
+
+# ────────────────────────────────────────────────────────────────────────────────
+# DEAD CODE ELIMINATION
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# Dead means dead in the emitted Python, which is not always GGScript's reading: CodeGen
+# only emits 'afk' inside a loop (where it breaks the loop even from a 'pick' case), so
+# outside one the statements after it still run and are kept.
+
+# Nodes that name a variable of the enclosing unit
+NAME_KINDS = frozenset(('node_iden', 'node_arr_idx', 'node_method_call', 'node_assign_stmt'))
+
+LITERAL_KINDS = frozenset(('node_num', 'node_str', 'node_char', 'node_bool'))
+
+def pure(node) -> bool:
+    """Whether evaluating expression `node` can neither raise nor change anything."""
+    kind = type(node).__name__
+    if kind in LITERAL_KINDS or kind == 'node_iden':
+        return True
+    if kind == 'node_pre_un_op':
+        op = node.op_t["tokenName"]
+        # '-' on a value of unproven type (a 'frag' read by comsat may hold text) can raise
+        return op not in ('++', '--') and (op == '!' or exact_type(node.right_n) is not None) and pure(node.right_n)
+    if kind == 'node_bi_op':
+        op = node.op_t["tokenName"]
+        if op in ('/', '%') and literal_value(node.right_n) in (None, 0):
+            return False
+        if op not in ('&&', '||', '==', '!=') and not (exact_type(node.left_n) and exact_type(node.right_n)):
+            return False
+        return pure(node.left_n) and pure(node.right_n)
+    return False
+
+def removable(decl) -> bool:
+    """Whether declaration `decl` can be dropped once nothing names its variable."""
+    if type(decl).__name__ == 'node_arr_dec':
+        rows = decl.init_values_n or []
+        values = [val for row in rows for val in (row if isinstance(row, list) else [row])]
+        return (all(literal_value(size) is not None for size in decl.sizes_n)
+                and all(type(val).__name__ in LITERAL_KINDS for val in values))
+    init = decl.init_value_n
+    if init is None:
+        return True
+    # int() and float() of a value of unproven type can still raise
+    dtype = decl.dtype_t["tokenName"]
+    return pure(init) and (exact_type(init) == dtype or dtype not in ('frag', 'elo'))
+
+def reachable_functions(program) -> set:
+    """Names of the functions the lobby (or a global initializer) may call, directly or not."""
+    calls = {func.id_t["tokenName"]: func for func in program.funcs_n}
+    found, todo = set(), [program.main_n] + list(program.globals_n)
+    while todo:
+        for item in walk(todo.pop()):
+            if type(item).__name__ == 'node_func_call':
+                name = item.id_t["tokenName"]
+                if name in calls and name not in found:
+                    found.add(name)
+                    todo.append(calls[name])
+    return found
+
+def drop_unused_locals(unit, global_names) -> int:
+    """Removes declarations in `unit` of variables nothing else names; returns how many."""
+    dropped = 0
+    while True:
+        named, blocks = set(), []
+        for item in walk(unit.body_n):
+            kind = type(item).__name__
+            if kind in NAME_KINDS:
+                named.add(item.id_t["tokenName"])
+            elif kind == 'node_code_block':
+                blocks.append(item)
+        before = dropped
+        for block in blocks:
+            kept = []
+            for stmt in block.statements_n:
+                # CodeGen declares every global in every unit, so a local of that name writes the global
+                if (type(stmt).__name__ in ('node_vardec', 'node_arr_dec') and stmt.id_t["tokenName"] not in named
+                        and stmt.id_t["tokenName"] not in global_names and removable(stmt)):
+                    dropped += 1
+                else:
+                    kept.append(stmt)
+            block.statements_n = kept
+        if dropped == before:
+            return dropped
+
+class DeadCodeEliminator(Rewriter):
+    """
+    Drops the statements of a block after one that always leaves it ('ggwp', 'hop',
+    'afk' in a loop, or a 'clutch' whose every branch does), and the 'clutch' branches
+    whose condition is a 'buff'/'nerf' literal (run ConstantFolder first).
+    """
+    def __init__(self):
+        super().__init__()
+        self.loop_depth = 0
+
+    def eliminate_program(self, program, global_names=frozenset()):
+        """Also drops the functions the lobby can't reach and the unused locals (drop_unused_locals)."""
+        for unit in program.funcs_n + ([program.main_n] if program.main_n else []):
+            self.visit(unit)
+        # Calls only found in dropped branches no longer keep a function
+        if program.main_n is not None:
+            reachable = reachable_functions(program)
+            funcs = [func for func in program.funcs_n if func.id_t["tokenName"] in reachable]
+            self.changes += len(program.funcs_n) - len(funcs)
+            program.funcs_n = funcs
+        for unit in program.funcs_n + ([program.main_n] if program.main_n else []):
+            self.changes += drop_unused_locals(unit, global_names)
+        return self.changes
+
+    def terminates(self, stmt) -> bool:
+        kind = type(stmt).__name__
+        if kind in ('node_return_block', 'node_continue_stmt'):
+            return True
+        if kind == 'node_break_stmt':
+            return self.loop_depth > 0
+        if kind == 'node_if_stmt' and stmt.else_stmt_n is not None:
+            bodies = [stmt.body_n] + [branch.body_n for branch in stmt.else_chain_n or []] + [stmt.else_stmt_n.body_n]
+            return all(body.statements_n and self.terminates(body.statements_n[-1]) for body in bodies)
+        return False
+
+    def visit_node_loop_stmt(self, node):
+        self.loop_depth += 1
+        self.rewrite_children(node)
+        self.loop_depth -= 1
+        return node
+
+    def visit_node_code_block(self, node):
+        statements = []
+        for index, stmt in enumerate(node.statements_n):
+            if statements and self.terminates(statements[-1]):
+                self.changes += len(node.statements_n) - index
+                break
+            new = self.visit(stmt)
+            if isinstance(new, list):
+                statements.extend(new)
+            elif new is not None:
+                statements.append(new)
+        node.statements_n = statements
+        return node
+
+    def visit_node_if_stmt(self, node):
+        """The 'clutch' without its constant branches: a node, the statements to splice in its place, or None."""
+        self.rewrite_children(node)
+        branches = [node] + list(node.else_chain_n or [])
+        fallback = node.else_stmt_n.body_n if node.else_stmt_n is not None else None
+        kept = []
+        for branch in branches:
+            value = literal_value(branch.condition_n)
+            if value is True:
+                fallback = branch.body_n
+                break
+            if value is None:
+                kept.append(branch)
+        if len(kept) == len(branches) and (node.else_stmt_n is None or fallback is node.else_stmt_n.body_n):
+            return node
+        if not kept:
+            if fallback is None:
+                self.changes += 1
+                return None
+            return self.unwrap(fallback, node)
+        self.changes += 1
+        first = kept[0]
+        if first is not node:
+            first = node_if_stmt(first.condition_n, first.body_n, [], None)
+        first.else_chain_n = kept[1:]
+        first.else_stmt_n = None if fallback is None else node_else_stmt(fallback)
+        return first
+
+    def unwrap(self, block, node):
+        """The statements of `block`, or a 'clutch (buff)' around it when it declares a name of its own."""
+        if not any(type(stmt).__name__ in ('node_vardec', 'node_arr_dec') for stmt in block.statements_n):
+            self.changes += 1
+            return block.statements_n
+        if block is node.body_n and not node.else_chain_n and node.else_stmt_n is None:
+            return node
+        self.changes += 1
+        return node_if_stmt(make_literal(True, first_token(node.condition_n)), block, [], None)
@@ -0,0 +1,159 @@
+from typing import Optional
+
+from .loops import Rewriter
+from .semantic import SemanticAnalyzer, node_num, node_bool
+
+# ────────────────────────────────────────────────────────────────────────────────
+# CONSTANT FOLDING
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# Operators are evaluated the way the emitted Python evaluates them ('/' is '//' for
+# 'frag' and 'elo' alike, '%' is Python's modulo), and a result only replaces its
+# expression when its Python type is the expression's static type and it lies inside
+# the 'frag'/'elo' bounds. Division and modulo by zero are left to fail at run time.
+
+# Python type of the runtime value of each literal type (bool first: it is an int)
+LITERAL_TYPES = ((bool, 'surebol'), (int, 'frag'), (float, 'elo'))
+
+# Casts the code generators apply to a declaration's initializer
+DECL_CASTS = {'frag': int, 'elo': float, 'surebol': bool}
+
+BINARY = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': lambda a, b: a // b if b != 0 else None,
+    '%': lambda a, b: a % b if b != 0 else None,
+    '<': lambda a, b: a < b,
+    '>': lambda a, b: a > b,
+    '<=': lambda a, b: a <= b,
+    '>=': lambda a, b: a >= b,
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '&&': lambda a, b: a and b,
+    '||': lambda a, b: a or b,
+}
+
+def literal_value(node):
+    """The Python value of literal `node` ('frag', 'elo' and 'surebol' literals only), or None."""
+    kind = type(node).__name__
+    if kind == 'node_num':
+        text = node.val_t["tokenName"]
+        return int(text) if node.dtype == 'frag' else float(text)
+    if kind == 'node_bool':
+        return node.val_t["tokenName"] == 'buff'
+    return None
+
+def literal_type(value) -> Optional[str]:
+    for py_type, dtype in LITERAL_TYPES:
+        if isinstance(value, py_type):
+            return dtype
+    return None
+
+def first_token(node):
+    """The left-most token under `node`, which positions a literal that replaces it."""
+    while True:
+        for attr, val in vars(node).items():
+            if attr.endswith('_t') and isinstance(val, dict):
+                if attr != 'op_t' or type(node).__name__ == 'node_pre_un_op':
+                    return val
+        node = node.left_n if hasattr(node, 'left_n') else node.right_n
+
+def make_literal(value, token):
+    """A checked literal node for Python value `value`, or None if GGScript has no such literal."""
+    dtype = literal_type(value)
+    if dtype == 'surebol':
+        node = node_bool({**token, "tokenName": 'buff' if value else 'nerf'})
+    elif dtype == 'frag' and SemanticAnalyzer.MIN_FRAG <= value <= SemanticAnalyzer.MAX_FRAG:
+        node = node_num({**token, "tokenName": str(value)}, 'frag')
+    elif dtype == 'elo' and SemanticAnalyzer.MIN_ELO <= value <= SemanticAnalyzer.MAX_ELO:
+        node = node_num({**token, "tokenName": repr(value)}, 'elo')
+    else:
+        return None
+    node.static_type = dtype
+    return node
+
+class ConstantFolder(Rewriter):
+    """
+    Replaces constant subexpressions with literals, and reads of 'stun' constants whose
+    initializer folds to a literal with that literal (cast to the declared type).
+    """
+    def fold_program(self, program):
+        program.globals_n = self.rewrite(program.globals_n)
+        program.funcs_n = self.rewrite(program.funcs_n)
+        program.main_n = self.rewrite(program.main_n)
+        return self.changes
+
+    def replace(self, node, value):
+        """`value` as a literal in place of `node` when it keeps the expression's type, else `node`."""
+        if value is None or literal_type(value) != getattr(node, 'static_type', None):
+            return node
+        literal = make_literal(value, first_token(node))
+        if literal is None:
+            return node
+        self.changes += 1
+        return literal
+
+    # ---- declarations ----
+
+    def visit_node_vardec(self, node):
+        value = None
+        if node.init_value_n is not None:
+            node.init_value_n = self.visit(node.init_value_n)
+            value = literal_value(node.init_value_n)
+            cast = DECL_CASTS.get(node.dtype_t["tokenName"])
+            if value is not None and cast is not None and literal_type(value) != node.dtype_t["tokenName"]:
+                # Fold the cast the code generators would emit around the initializer
+                literal = make_literal(cast(value), first_token(node.init_value_n))
+                if literal is not None:
+                    node.init_value_n = literal
+                    self.changes += 1
+                value = literal_value(literal) if literal is not None else None
+        if node.const_b and value is not None and literal_type(value) == node.dtype_t["tokenName"]:
+            self.declare(node.id_t["tokenName"], value)
+        else:
+            self.declare(node.id_t["tokenName"])
+        return node
+
+    # ---- places that name a variable without reading it ----
+
+    def visit_node_input(self, node):
+        for target in node.targets_n:
+            if type(target).__name__ == 'node_arr_idx':
+                self.rewrite_children(target)
+        return node
+
+    def visit_node_pre_un_op(self, node):
+        if node.op_t["tokenName"] in ('++', '--'):
+            if type(node.right_n).__name__ == 'node_arr_idx':
+                self.rewrite_children(node.right_n)
+            return node
+        node.right_n = self.visit(node.right_n)
+        value = literal_value(node.right_n)
+        if value is None or isinstance(value, bool) != (node.op_t["tokenName"] == '!'):
+            return node
+        op = node.op_t["tokenName"]
+        return self.replace(node, not value if op == '!' else -value if op == '-' else value)
+
+    def visit_node_post_un_op(self, node):
+        if type(node.left_n).__name__ == 'node_arr_idx':
+            self.rewrite_children(node.left_n)
+        return node
+
+    # ---- expressions ----
+
+    def visit_node_iden(self, node):
+        value = self.lookup(node.id_t["tokenName"])
+        return self.replace(node, value) if value is not None else node
+
+    def visit_node_bi_op(self, node):
+        op = node.op_t["tokenName"]
+        node.left_n = self.visit(node.left_n)
+        right = self.visit(node.right_n)
+        # SemanticAnalyzer rejects a literal zero divisor, so one is only kept if it was written
+        if op not in ('/', '%') or literal_value(right) != 0 or right is node.right_n:
+            node.right_n = right
+        left, right = literal_value(node.left_n), literal_value(node.right_n)
+        if left is None or right is None or op not in BINARY:
+            return node
+        return self.replace(node, BINARY[op](left, right))
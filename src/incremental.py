@@ -0,0 +1,288 @@
+import contextlib
+import copy
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Set, Tuple
+
+from .semantic import SemanticAnalyzer, SemanticError, node_func_dec, node_program
+from .intervals import IntervalAnalyzer
+from .loops import STRUCTURE_ATTRS
+
+# ────────────────────────────────────────────────────────────────────────────────
+# UNIT FINGERPRINTS
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# A top-level unit (a 'build' function or lobby) is checked against the program
+# interface only: the global declarations and the signatures of the functions
+# declared before it. Its result is keyed by the unit's own source plus the
+# interface entries of every name it mentions, so an edit inside one body leaves
+# every other key untouched, and callers are only re-checked when a signature
+# they use changes. Token positions are left out: only clean results are cached,
+# and those carry no line numbers. So are the annotations analysis adds (global
+# initializers already carry their symbols when the fingerprints are taken).
+
+def _walk(node, parts: List[str], names: Set[str]):
+    if isinstance(node, list):
+        parts.append('[')
+        for item in node:
+            _walk(item, parts, names)
+        parts.append(']')
+    elif isinstance(node, dict):
+        parts.append(repr(node["tokenName"]))
+    elif hasattr(node, '__dict__'):
+        parts.append(type(node).__name__)
+        for attr, val in vars(node).items():
+            if not (attr.endswith(('_n', '_t', '_b')) or attr in STRUCTURE_ATTRS):
+                continue
+            if attr == 'id_t' and val:
+                names.add(val["tokenName"])
+            _walk(val, parts, names)
+    else:
+        parts.append(repr(node))
+
+def _digest(parts: List[str]) -> str:
+    return hashlib.sha1("\x00".join(parts).encode()).hexdigest()
+
+def global_fingerprints(program: node_program) -> Dict[str, str]:
+    """Fingerprint of each global declaration, including the earlier globals its initializer reads."""
+    fps = {}
+    for decl in program.globals_n:
+        parts, names = [], set()
+        _walk(decl, parts, names)
+        parts.extend(fps[name] for name in sorted(names) if name in fps)
+        fps[decl.id_t["tokenName"]] = _digest(parts)
+    return fps
+
+def signature_fingerprint(func: node_func_dec) -> str:
+    # Parameter names are private to the body, callers only see the types
+    parts = [func.dtype_t["tokenName"]]
+    for param in func.params_n or []:
+        parts.append(f'{param.dtype_t["tokenName"]}:{param.is_array}:{param.dims}')
+    return _digest(parts)
+
+def unit_key(unit, globals_fps: Dict[str, str], functions: Dict[str, str]):
+    """Returns the cache key of a unit and the set of names it mentions."""
+    parts, names = [], set()
+    _walk(unit, parts, names)
+    for name in sorted(names):
+        parts.append(name)
+        parts.append(globals_fps.get(name) or functions.get(name) or '-')
+    return _digest(parts), names
+
+# ────────────────────────────────────────────────────────────────────────────────
+# UNIT RESULTS
+# ────────────────────────────────────────────────────────────────────────────────
+
+class UnitResult:
+    """
+    A checked unit, kept as a private copy of its annotated subtree together with the
+    stores it made (see SemanticAnalyzer.store_log), so it can be replayed onto a fresh parse.
+    """
+    __slots__ = ('unit', 'global_syms', 'store_log')
+
+    def __init__(self, unit, global_syms, store_log):
+        self.unit = unit
+        self.global_syms = global_syms
+        self.store_log = store_log
+
+def transfer_annotations(old, new, remap, node_map):
+    """Copies the analysis annotations of a checked subtree onto its structurally identical twin."""
+    if isinstance(old, list):
+        for old_item, new_item in zip(old, new):
+            transfer_annotations(old_item, new_item, remap, node_map)
+        return
+    if not hasattr(old, '__dict__'):
+        return
+    node_map[id(old)] = new
+    fresh = vars(new)
+    for attr, val in vars(old).items():
+        if attr.endswith('_n'):
+            transfer_annotations(val, fresh[attr], remap, node_map)
+        elif attr not in fresh:
+            fresh[attr] = remap(val) if attr == 'symbol' else val
+
+def replay_unit(sem: SemanticAnalyzer, result: UnitResult, unit):
+    """Annotates `unit` from a previous check, as if SemanticAnalyzer had just visited it."""
+    if result.unit is unit:
+        # Checked in this process: the annotations are already in place
+        for entry in result.store_log:
+            if entry[0] == 'track':
+                sem.track_stores(entry[1], entry[2])
+            else:
+                sem.record_store(entry[1], entry[2], entry[3])
+        return
+
+    sym_map = {id(sym): sem.curr_scope.get(name) for name, sym in result.global_syms.items()}
+
+    def remap(sym):
+        # Globals resolve to this analysis' symbols, locals get a fresh copy
+        if id(sym) not in sym_map:
+            sym_map[id(sym)] = dict(sym)
+        return sym_map[id(sym)]
+
+    node_map = {}
+    transfer_annotations(result.unit, unit, remap, node_map)
+    for entry in result.store_log:
+        if entry[0] == 'track':
+            sem.track_stores(remap(entry[1]), entry[2])
+        else:
+            sem.record_store(remap(entry[1]), entry[2], node_map.get(id(entry[3])))
+
+# ────────────────────────────────────────────────────────────────────────────────
+# UNIT CHECKING (in process or in a worker)
+# ────────────────────────────────────────────────────────────────────────────────
+
+def range_interface(ranges: IntervalAnalyzer, names: Set[str]):
+    """The part of the global range state a unit mentioning `names` can observe, or None if the globals failed."""
+    if ranges.errors:
+        return None
+    return (
+        [{name: itv for name, itv in ranges.globals_state[0].items() if name in names}],
+        {name: kind for name, kind in ranges.globals_arrays.items() if name in names},
+        ranges.consts & names,
+        {name: kind for name, kind in ranges.function_types.items() if name in names},
+    )
+
+def check_unit(unit, syms: dict, ranges_state) -> Tuple[Optional[str], Optional[str], Optional[UnitResult]]:
+    """
+    Checks one unit against a frozen slice of the interface (`syms`: the globals and visible
+    functions it names). Returns (semantic error, range error, result).
+    """
+    checker = SemanticAnalyzer()
+    checker.curr_scope.syms = syms
+    # Stores to globals must reach the log, the whole program decides whether they stay exact
+    checker.var_stores = {id(sym): (sym, []) for sym in syms.values() if "exact" in sym}
+    checker.store_log = []
+    try:
+        checker.check_unit(unit)
+    except SemanticError:
+        return checker.errors[0], None, None
+
+    range_error = None
+    if ranges_state is not None:
+        ranges = IntervalAnalyzer()
+        ranges.globals_state, ranges.globals_arrays, ranges.consts, ranges.function_types = ranges_state
+        try:
+            ranges.check_unit(unit)
+        except SemanticError:
+            range_error = ranges.errors[0]
+    return None, range_error, UnitResult(unit, syms, checker.store_log)
+
+def _check_unit_task(task):
+    # Pool entry point: keeps logError's console echo out of the workers' shared stdout
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        return check_unit(*task)
+
+# Callers opt in with workers > 1: spawning, pickling the subtrees and replaying the results
+# outweigh the checking itself unless there are many units and several idle cores
+PARALLEL_MIN_UNITS = 8
+
+_pool = None
+_pool_workers = 0
+
+def run_parallel(tasks: list, workers: int):
+    """Checks `tasks` on a process pool and returns the results in task order, or None when no pool can be used."""
+    global _pool, _pool_workers
+    try:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # 'spawn' keeps workers independent of the caller's threads (the IDE runs compiles off the Tk thread)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        chunksize = max(1, len(tasks) // (workers * 4))
+        return list(_pool.map(_check_unit_task, tasks, chunksize=chunksize))
+    except (OSError, ImportError, NotImplementedError, BrokenProcessPool):
+        # No process support (e.g. Pyodide) or a dead pool: callers fall back to in-process checking
+        _pool = None
+        return None
+
+# ────────────────────────────────────────────────────────────────────────────────
+# INCREMENTAL CHECKING
+# ────────────────────────────────────────────────────────────────────────────────
+
+MAX_CACHED_UNITS = 1024
+
+# Shared by every compile in this process (IDE session or API worker)
+_unit_cache: Dict[str, UnitResult] = {}
+
+def cache_unit(cache: Dict[str, UnitResult], key: str, result: UnitResult):
+    if len(cache) >= MAX_CACHED_UNITS:
+        cache.pop(next(iter(cache), None), None)
+    cache[key] = result
+
+def check_program(program: node_program, cache: Optional[Dict[str, UnitResult]] = _unit_cache, workers: int = 1) -> Optional[str]:
+    """
+    Runs SemanticAnalyzer and IntervalAnalyzer over `program` one top-level unit at a time
+    and returns the first error (semantic errors before range errors, each in source order),
+    or None. Units found in `cache` are not checked again; pass cache=None to check everything.
+    With workers > 1, the remaining units are checked on a process pool when there are enough of them.
+    """
+    sem = SemanticAnalyzer()
+    ranges = IntervalAnalyzer()
+    try:
+        sem.declare_globals(program)
+    except SemanticError:
+        return sem.errors[0]
+
+    try:
+        ranges.declare_globals(program)
+    except SemanticError:
+        pass
+
+    # Interface: signatures in source order; each unit sees the globals and the functions declared so far
+    globals_fps = global_fingerprints(program)
+    functions = {}
+    plan = []
+    interface_error = None
+    for unit in list(program.funcs_n) + ([program.main_n] if program.main_n else []):
+        if isinstance(unit, node_func_dec):
+            try:
+                sem.declare_function(unit)
+            except SemanticError:
+                # Reported once every unit before it is known to be clean
+                interface_error = sem.errors[0]
+                break
+            functions[unit.id_t["tokenName"]] = signature_fingerprint(unit)
+
+        key, names = unit_key(unit, globals_fps, functions)
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            plan.append((unit, key, cached, None))
+        else:
+            syms = {name: sym for name, sym in sem.curr_scope.syms.items() if name in names}
+            plan.append((unit, key, None, (unit, syms, range_interface(ranges, names))))
+
+    tasks = [task for _, _, _, task in plan if task is not None]
+    results = None
+    if workers > 1 and len(tasks) >= PARALLEL_MIN_UNITS:
+        results = run_parallel(tasks, workers)
+    # In process, units are checked lazily so nothing runs past the first error
+    results = iter(results) if results is not None else (check_unit(*task) for task in tasks)
+
+    for unit, key, cached, task in plan:
+        if cached is not None:
+            replay_unit(sem, cached, unit)
+            continue
+
+        error, range_error, result = next(results)
+        if error:
+            return error
+        replay_unit(sem, result, unit)
+        if range_error:
+            ranges.errors.append(range_error)
+        elif cache is not None and task[2] is not None:
+            # Later passes may rewrite the returned AST; results from a worker already are private copies
+            cache_unit(cache, key, copy.deepcopy(result) if result.unit is unit else result)
+
+    if interface_error:
+        return interface_error
+    try:
+        sem.finish_program(program)
+    except SemanticError:
+        return sem.errors[0]
+
+    return ranges.errors[0] if ranges.errors else None
@@ -0,0 +1,377 @@
+import copy
+from itertools import islice
+from typing import Optional
+
+from .fold import make_literal
+from .licm import may_raise, resized_arrays, read_temporary
+from .loops import child_fields, children, walk, written_names, calls_functions
+from .purity import recursive_functions
+from .semantic import exact_type, node_vardec, node_assign_stmt, node_break_stmt, node_loop_stmt, \
+    node_code_block, node_else_stmt, VAR_TYPE
+
+# ────────────────────────────────────────────────────────────────────────────────
+# INLINING
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# A call inside a loop to a small function that cannot reach itself is replaced by the
+# function's body. Its parameters and locals get `_inN_` names, so they capture nothing
+# of the caller, and each scalar argument is stored into its parameter as is (a call
+# never casts); an array parameter is the caller's array itself. Every 'ggwp' assigns
+# the result to `_inN`, which the call site then reads. A 'ggwp' other than the body's
+# last statement needs what follows its 'clutch' to be skipped: that moves into the one
+# branch that falls through, or failing that the body runs in a `retry (buff)` loop
+# that each 'ggwp' 'afk's out of, so functions containing loops, 'afk' or 'hop' are not
+# inlined.
+#
+# The body runs before the statement holding the call, so the call must be the first
+# thing that statement evaluates that could raise, print or change anything, and what
+# it reads before the call must be something the function can't change. A call under
+# the right operand of '&&'/'||' may not run at all and stays. The caller must not
+# declare a global the function uses, which would name its local instead.
+
+# Largest function body (in nodes) that is inlined, and how much one unit may grow
+INLINE_BUDGET = 40
+INLINE_GROWTH = 400
+
+def body_size(func) -> int:
+    return sum(1 for _ in walk(func.body_n))
+
+def inlinable_functions(program, global_names) -> dict:
+    """The functions whose calls may be inlined (see above), by name."""
+    chosen = {}
+    for func in program.funcs_n:
+        nodes = list(islice(walk(func.body_n), INLINE_BUDGET + 1))
+        if len(nodes) > INLINE_BUDGET:
+            continue
+        if any(type(item).__name__ in ('node_loop_stmt', 'node_break_stmt', 'node_continue_stmt') for item in nodes):
+            continue
+        if any(name in global_names for name in local_names(func)):
+            continue
+        chosen[func.id_t["tokenName"]] = func
+    if chosen:
+        for name in recursive_functions(program):
+            chosen.pop(name, None)
+    return chosen
+
+def local_names(unit) -> set:
+    """Names of the parameters and locals `unit` declares."""
+    names = {param.id_t["tokenName"] for param in getattr(unit, 'params_n', None) or []}
+    names.update(item.id_t["tokenName"] for item in walk(unit.body_n)
+                 if type(item).__name__ in ('node_vardec', 'node_arr_dec'))
+    return names
+
+def read_names(node) -> set:
+    """Names of the variables and arrays node `node` itself reads (a compound assignment reads its target)."""
+    kind = type(node).__name__
+    if kind in ('node_iden', 'node_arr_idx', 'node_assign_stmt'):
+        return {node.id_t["tokenName"]}
+    if kind == 'node_method_call' and node.method_t["tokenName"] == 'count':
+        return {node.id_t["tokenName"]}
+    return set()
+
+class Inliner:
+    """Inlines the calls to small functions inside the loops of every unit (see above)."""
+    def __init__(self, global_names=frozenset()):
+        self.global_names = global_names
+        self.count = 0
+        self.changes = 0
+        self.functions = {}
+        self.declared = set()
+        self.growth = 0
+        self.before = []
+
+    def inline_program(self, program):
+        self.functions = inlinable_functions(program, self.global_names)
+        if not self.functions:
+            return 0
+        for unit in list(program.funcs_n) + ([program.main_n] if program.main_n else []):
+            self.declared = local_names(unit)
+            self.growth = 0
+            self.visit_block(unit.body_n, False)
+        return self.changes
+
+    def visit_block(self, block, in_loop):
+        statements = []
+        for stmt in block.statements_n:
+            if in_loop:
+                statements.extend(self.expand(stmt))
+            else:
+                statements.append(stmt)
+            self.descend(stmt, in_loop)
+        block.statements_n = statements
+
+    def descend(self, node, in_loop):
+        in_loop = in_loop or type(node).__name__ == 'node_loop_stmt'
+        for child in children(node):
+            if type(child).__name__ == 'node_code_block':
+                self.visit_block(child, in_loop)
+            else:
+                self.descend(child, in_loop)
+
+    def expand(self, stmt) -> list:
+        """`stmt` preceded by the bodies of the calls inlined out of it (without it if it was the call)."""
+        statements = []
+        while True:
+            call = self.site(stmt)
+            if call is None:
+                return statements + [stmt]
+            func = self.functions[call.id_t["tokenName"]]
+            self.growth += body_size(func)
+            self.changes += 1
+            inlined, result = self.body(call, func)
+            if call is stmt:
+                return statements + inlined
+            statements.extend(inlined)
+            replace(stmt, call, result)
+
+    # ── Call sites ──────────────────────────────────────────────────────────────────
+
+    def site(self, stmt):
+        """The next call in simple statement `stmt` whose function's body can run before the statement, or None."""
+        kind = type(stmt).__name__
+        op = getattr(stmt, 'op_t', None)
+        compound = op is not None and op["tokenName"] != '='
+        if kind == 'node_func_call':
+            exprs = [stmt]
+        elif kind in ('node_vardec', 'node_return_block'):
+            exprs = [stmt.init_value_n if kind == 'node_vardec' else stmt.ret_value_n]
+        elif kind == 'node_assign_stmt':
+            exprs = [stmt.value_n]
+        elif kind == 'node_arr_assign_stmt' and not compound:
+            exprs = [stmt.value_n] + list(stmt.arr_idx_n.indices_n)
+        elif kind == 'node_output':
+            exprs = list(stmt.print_params_n)
+        else:
+            return None
+        self.before = []
+        call = None
+        for expr in exprs:
+            call = self.find(expr, False)
+            if call is not None:
+                break
+        if call is None or self.growth + body_size(self.functions[call.id_t["tokenName"]]) > INLINE_GROWTH:
+            return None
+        evaluated = self.before
+        if kind == 'node_arr_assign_stmt':
+            # Its value and indices are evaluated in whichever order it is emitted in
+            inner = {id(item) for item in walk(call)}
+            evaluated = [item for expr in exprs for item in walk(expr) if id(item) not in inner]
+        if any(may_raise(item) for item in evaluated):
+            return None
+        return None if self.clashes(call, evaluated + [stmt] if compound else evaluated) else call
+
+    def find(self, node, conditional) -> Optional[object]:
+        """
+        The first call of an inlinable function that always runs when expression `node`
+        is evaluated, in evaluation order; what is evaluated before it goes to `before`
+        (its arguments go with it).
+        """
+        if node is None or child_fields(node) is None:
+            return None
+        kind = type(node).__name__
+        mark = len(self.before)
+        if kind == 'node_bi_op':
+            found = self.find(node.left_n, conditional) or \
+                self.find(node.right_n, conditional or node.op_t["tokenName"] in ('&&', '||'))
+        else:
+            found = None
+            for sub in children_in_order(node):
+                found = self.find(sub, conditional)
+                if found is not None:
+                    break
+        if found is not None:
+            return found
+        if kind == 'node_func_call' and not conditional and node.id_t["tokenName"] in self.functions:
+            del self.before[mark:]
+            return node
+        self.before.append(node)
+        return None
+
+    def clashes(self, call, evaluated) -> bool:
+        """
+        Whether the body of `call` could change what the nodes `evaluated` before it read,
+        or uses a global the caller declares a local of.
+        """
+        func = self.functions[call.id_t["tokenName"]]
+        own = local_names(func)
+        free = {item.id_t["tokenName"] for item in walk(func.body_n)
+                if hasattr(item, 'id_t') and type(item).__name__ != 'node_func_call'} - own
+        if free & self.declared:
+            return True
+        reads = set().union(*map(read_names, evaluated))
+        if calls_functions(func.body_n):
+            # A function it calls may change any global, and any array it can reach
+            return any(type(item).__name__ in ('node_arr_idx', 'node_method_call') or read_names(item) & self.global_names
+                       for item in evaluated)
+        aliases = {param.id_t["tokenName"]: arg.id_t["tokenName"]
+                   for param, arg in zip(func.params_n or [], call.args_n) if param.is_array}
+        changed = (written_names(func.body_n) - own) | {aliases.get(name, name) for name in resized_arrays(func.body_n)}
+        return bool(reads & changed)
+
+    # ── Bodies ──────────────────────────────────────────────────────────────────────
+
+    def body(self, call, func) -> tuple:
+        """The statements running `func`'s body for `call`, and a read of what it returned (None for 'dodge')."""
+        self.count += 1
+        prefix = f"_in{self.count}"
+        token = call.id_t
+        dtype = func.dtype_t["tokenName"]
+        renames = {name: f"{prefix}_{name}" for name in local_names(func)}
+        statements = []
+        for param, arg in zip(func.params_n or [], call.args_n):
+            name = param.id_t["tokenName"]
+            if param.is_array:
+                renames[name] = arg.id_t["tokenName"]
+                continue
+            id_t = {**token, "tokenName": renames[name]}
+            dtype_t = {**token, "tokenName": param.dtype_t["tokenName"]}
+            if exact_type(arg) == dtype_t["tokenName"]:
+                statements.append(node_vardec(dtype_t, id_t, False, arg))
+            else:
+                statements += [node_vardec(dtype_t, id_t, False, None), node_assign_stmt(id_t, {**token, "tokenName": '='}, arg)]
+
+        block = copy.deepcopy(func.body_n)
+        # A parameter the body never assigns keeps the exact argument it was given
+        written = written_names(func.body_n)
+        exact_params = {renames[param.id_t["tokenName"]]: {**symbol_of(func, param), "exact": True}
+                 for param, arg in zip(func.params_n or [], call.args_n)
+                 if not param.is_array and param.id_t["tokenName"] not in written
+                 and exact_type(arg) == param.dtype_t["tokenName"]}
+        for item in walk(block):
+            if hasattr(item, 'id_t') and type(item).__name__ != 'node_func_call' and item.id_t["tokenName"] in renames:
+                item.id_t = {**item.id_t, "tokenName": renames[item.id_t["tokenName"]]}
+                if type(item).__name__ == 'node_iden' and item.id_t["tokenName"] in exact_params:
+                    item.symbol = exact_params[item.id_t["tokenName"]]
+
+        body = block.statements_n
+        returns = [item for item in walk(block) if type(item).__name__ == 'node_return_block']
+        exact = all(item.ret_value_n is not None and exact_type(item.ret_value_n) == dtype for item in returns)
+        if all(item is body[-1] for item in returns):
+            last = body.pop().ret_value_n if returns else None
+            statements.extend(body)
+            if last is not None and exact:
+                statements.append(node_vardec({**token, "tokenName": dtype}, {**token, "tokenName": prefix}, False, last))
+            elif last is not None:
+                # The value is stored as is, like a return: a declaration would cast it
+                statements += [node_vardec({**token, "tokenName": dtype}, {**token, "tokenName": prefix}, False, None),
+                               result_store(prefix, last, token)]
+        else:
+            if dtype != 'dodge':
+                statements.append(node_vardec({**token, "tokenName": dtype}, {**token, "tokenName": prefix}, False, None))
+            done = structured(copy.deepcopy(body), prefix, token)
+            statements.extend(done[0] if done is not None else [self.once(block, prefix, token)])
+
+        if dtype == 'dodge':
+            return statements, None
+        symbol = {"value": None, "dtype": VAR_TYPE[dtype], "const": False, "exact": exact}
+        return statements, read_temporary(prefix, symbol, token)
+
+    def once(self, block, prefix, token):
+        """`block` in a `retry (buff)` loop that every 'ggwp' leaves after setting `prefix`."""
+        for holder in [item for item in walk(block) if type(item).__name__ == 'node_code_block']:
+            statements = []
+            for stmt in holder.statements_n:
+                if type(stmt).__name__ != 'node_return_block':
+                    statements.append(stmt)
+                    continue
+                if stmt.ret_value_n is not None:
+                    statements.append(result_store(prefix, stmt.ret_value_n, token))
+                statements.append(node_break_stmt({**token, "tokenName": 'afk'}))
+            holder.statements_n = statements
+        if type(block.statements_n[-1]).__name__ != 'node_break_stmt':
+            block.statements_n.append(node_break_stmt({**token, "tokenName": 'afk'}))
+        return node_loop_stmt('retry', None, make_literal(True, token), None, block)
+
+def result_store(prefix, value, token):
+    return node_assign_stmt({**token, "tokenName": prefix}, {**token, "tokenName": '='}, value)
+
+def returns_in(node) -> bool:
+    return any(type(item).__name__ == 'node_return_block' for item in walk(node))
+
+def structured(statements, prefix, token) -> Optional[tuple]:
+    """
+    `statements` with every 'ggwp' setting `prefix` instead, and whatever follows a
+    'clutch' that returns on some branches moved into the one branch that doesn't (a
+    'choke' is added when it has none), and whether they always returned; None when a
+    'ggwp' needs a jump: it is in a 'pick', or more than one branch (or one that returns
+    on some paths) falls through to statements that follow.
+    """
+    done = []
+    for index, stmt in enumerate(statements):
+        kind = type(stmt).__name__
+        if kind == 'node_return_block':
+            # Whatever follows never runs
+            if stmt.ret_value_n is not None:
+                done.append(result_store(prefix, stmt.ret_value_n, token))
+            return done, True
+        done.append(stmt)
+        if not returns_in(stmt):
+            continue
+        if kind != 'node_if_stmt':
+            return None
+        rest = statements[index + 1:]
+        falls = []
+        for branch in [stmt] + list(stmt.else_chain_n or []) + ([stmt.else_stmt_n] if stmt.else_stmt_n else []):
+            # The end of a branch that returns on some paths only is reached by those too
+            mixed = returns_in(branch.body_n)
+            inner = structured(branch.body_n.statements_n, prefix, token)
+            if inner is None:
+                return None
+            branch.body_n.statements_n = inner[0]
+            if not inner[1]:
+                if mixed and rest:
+                    return None
+                falls.append(branch)
+        if stmt.else_stmt_n is None:
+            falls.append(None)
+        if not falls:
+            return done, True
+        if not rest:
+            return done, False
+        if len(falls) > 1:
+            return None
+        inner = structured(rest, prefix, token)
+        if inner is None:
+            return None
+        if falls[0] is None:
+            stmt.else_stmt_n = node_else_stmt(node_code_block(inner[0]))
+        else:
+            falls[0].body_n.statements_n.extend(inner[0])
+        return done, inner[1]
+    return done, False
+
+def symbol_of(func, param) -> dict:
+    """The symbol of parameter `param` of `func` that semantic analysis gave its reads."""
+    name = param.id_t["tokenName"]
+    for item in walk(func.body_n):
+        if type(item).__name__ == 'node_iden' and item.id_t["tokenName"] == name and hasattr(item, 'symbol'):
+            return item.symbol
+    return {"value": None, "dtype": VAR_TYPE[param.dtype_t["tokenName"]], "const": False, "exact": False}
+
+def children_in_order(node) -> list:
+    """The child nodes of expression `node`, in the order the emitted Python evaluates them."""
+    found = []
+    for attr in child_fields(node):
+        val = getattr(node, attr)
+        for sub in (val if isinstance(val, list) else [val]):
+            if child_fields(sub) is not None:
+                found.append(sub)
+    return found
+
+def replace(node, old, new):
+    """Puts `new` in the place of `old` somewhere below `node`."""
+    for attr in child_fields(node):
+        val = getattr(node, attr)
+        if val is old:
+            setattr(node, attr, new)
+            return True
+        if isinstance(val, list):
+            for i, sub in enumerate(val):
+                if sub is old:
+                    val[i] = new
+                    return True
+                if child_fields(sub) is not None and replace(sub, old, new):
+                    return True
+        elif child_fields(val) is not None and replace(val, old, new):
+            return True
+    return False
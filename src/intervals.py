@@ -0,0 +1,717 @@
+from decimal import Decimal, ROUND_FLOOR
+from typing import List, Dict, Optional
+
+from .semantic import SemanticError, SemanticAnalyzer
+
+# ────────────────────────────────────────────────────────────────────────────────
+# INTERVAL DOMAIN
+# ────────────────────────────────────────────────────────────────────────────────
+
+INF = float('inf')
+
+def _sign(v):
+    return (v > 0) - (v < 0)
+
+def _mul(a, b):
+    # 0 * inf is 0 here: an operand pinned to zero keeps the product at zero
+    if a == 0 or b == 0:
+        return 0
+    if isinstance(a, float) or isinstance(b, float):
+        return INF if _sign(a) * _sign(b) > 0 else -INF
+    return a * b
+
+def _add(a, b):
+    # Infinite bounds are floats, which don't mix with Decimal 'elo' bounds
+    if isinstance(a, float) or isinstance(b, float):
+        return float(a) + float(b)
+    return a + b
+
+def _floor_div(a, b):
+    if isinstance(a, float) or isinstance(b, float):
+        if isinstance(a, float) and isinstance(b, float):
+            return 0
+        if isinstance(b, float):
+            # finite / inf tends to 0 from the side of the quotient's sign
+            return 0 if _sign(a) * _sign(b) >= 0 else -1
+        return INF if _sign(a) * _sign(b) > 0 else -INF
+    if isinstance(a, Decimal) or isinstance(b, Decimal):
+        return (Decimal(a) / Decimal(b)).to_integral_value(rounding=ROUND_FLOOR)
+    return a // b
+
+class Interval:
+    """Closed range [lo, hi] of a numeric ('frag' or 'elo') value. Bounds may be +/-inf."""
+    __slots__ = ('lo', 'hi', 'kind')
+
+    def __init__(self, lo, hi, kind='frag'):
+        self.lo = lo
+        self.hi = hi
+        self.kind = kind
+
+    @classmethod
+    def const(cls, value, kind='frag'):
+        return cls(value, value, kind)
+
+    @classmethod
+    def top(cls, kind='frag'):
+        return cls(-INF, INF, kind)
+
+    def is_const(self):
+        return self.lo == self.hi and not isinstance(self.lo, float)
+
+    def is_empty(self):
+        return self.lo > self.hi
+
+    def __eq__(self, other):
+        return isinstance(other, Interval) and self.lo == other.lo and self.hi == other.hi and self.kind == other.kind
+
+    def __repr__(self):
+        return f"[{self.lo}, {self.hi}]"
+
+    def as_kind(self, kind):
+        if kind == self.kind:
+            return self
+        if kind == 'elo':
+            conv = lambda v: v if isinstance(v, float) else Decimal(v)
+            return Interval(conv(self.lo), conv(self.hi), 'elo')
+        return Interval(self.lo, self.hi, kind)
+
+    def join(self, other):
+        if other is None: return self
+        return Interval(min(self.lo, other.lo), max(self.hi, other.hi), self.kind)
+
+    def widen(self, other):
+        """Classic interval widening: any bound that moved jumps straight to infinity."""
+        lo = self.lo if other.lo >= self.lo else -INF
+        hi = self.hi if other.hi <= self.hi else INF
+        return Interval(lo, hi, self.kind)
+
+    def meet(self, lo=None, hi=None):
+        new_lo = self.lo if lo is None else max(self.lo, lo)
+        new_hi = self.hi if hi is None else min(self.hi, hi)
+        return Interval(new_lo, new_hi, self.kind)
+
+    # ---- arithmetic (mirrors the operators CodeGen emits) ----
+
+    def add(self, other, kind):
+        return Interval(_add(self.lo, other.lo), _add(self.hi, other.hi), kind)
+
+    def sub(self, other, kind):
+        return Interval(_add(self.lo, -other.hi), _add(self.hi, -other.lo), kind)
+
+    def neg(self):
+        return Interval(-self.hi, -self.lo, self.kind)
+
+    def mul(self, other, kind):
+        corners = [_mul(a, b) for a in (self.lo, self.hi) for b in (other.lo, other.hi)]
+        return Interval(min(corners), max(corners), kind)
+
+    def div(self, other, kind):
+        # GGScript '/' is emitted as Python '//', so both 'frag' and 'elo' floor
+        if other.lo <= 0 <= other.hi:
+            return Interval.top(kind)
+        corners = [_floor_div(a, b) for a in (self.lo, self.hi) for b in (other.lo, other.hi)]
+        return Interval(min(corners), max(corners), kind)
+
+    def mod(self, other, kind):
+        if self.is_const() and other.is_const() and other.lo != 0:
+            return Interval.const(self.lo % other.lo, kind)
+        if other.lo > 0:
+            # Python '%' takes the sign of the divisor
+            bound = other.hi - 1
+            if self.lo >= 0 and self.hi < other.lo:
+                return Interval(self.lo, self.hi, kind)
+            return Interval(0, bound, kind)
+        if other.hi < 0:
+            return Interval(other.lo + 1, 0, kind)
+        return Interval.top(kind)
+
+# ────────────────────────────────────────────────────────────────────────────────
+# RANGE ANALYZER (abstract interpretation over the AST)
+# ────────────────────────────────────────────────────────────────────────────────
+
+class IntervalAnalyzer:
+    """
+    Tracks a value interval for every numeric expression and scalar variable,
+    through assignments, branches and loops (with widening), and reports
+    'frag'/'elo' values that are guaranteed to leave the GGScript ranges.
+    """
+    numtypes = ('frag', 'elo')
+    relops = ('<', '<=', '>', '>=', '==', '!=')
+    flip = {'<': '>', '<=': '>=', '>': '<', '>=': '<=', '==': '==', '!=': '!='}
+    negate = {'<': '>=', '<=': '>', '>': '<=', '>=': '<', '==': '!=', '!=': '=='}
+
+    bounds = {
+        'frag': (SemanticAnalyzer.MIN_FRAG, SemanticAnalyzer.MAX_FRAG),
+        'elo': (Decimal(SemanticAnalyzer.MIN_ELO), Decimal(SemanticAnalyzer.MAX_ELO)),
+    }
+
+    MAX_WIDEN_PASSES = 3
+
+    def __init__(self):
+        self.errors = []
+        self.scopes: List[Dict[str, Optional[Interval]]] = [{}]
+        self.consts = set()
+        self.dead = False
+        self.quiet = 0
+        self.loop_exits = []
+        self.array_types = {}
+        self.function_types = {}
+
+    def interpret(self, node):
+        try:
+            self.visit_node(node)
+        except SemanticError:
+            pass
+        return self.errors
+
+    def logError(self, msg, err_tok):
+        full_message = f"Semantic Error Ln {err_tok['tokenLine']}, Col {err_tok['tokenCol']}: {msg}"
+        self.errors.append(full_message)
+        raise SemanticError(full_message)
+
+    def visit_node(self, node):
+        if node is None:
+            return None
+        visit_func = getattr(self, f'visit_{type(node).__name__}', None)
+        if visit_func is None:
+            return None
+        return visit_func(node)
+
+    # ---- state handling ----
+
+    def snapshot(self):
+        return [dict(scope) for scope in self.scopes]
+
+    def restore(self, state):
+        self.scopes = [dict(scope) for scope in state]
+
+    def havoc(self):
+        for scope in self.scopes:
+            for name, itv in scope.items():
+                if itv is not None:
+                    scope[name] = Interval.top(itv.kind)
+
+    def join_states(self, a, b):
+        if a is None: return b
+        if b is None: return a
+        joined = []
+        for sa, sb in zip(a, b):
+            scope = {}
+            for name, itv in sa.items():
+                other = sb.get(name)
+                scope[name] = itv.join(other) if itv is not None and other is not None else itv
+            joined.append(scope)
+        return joined
+
+    def widen_states(self, old, new):
+        widened = []
+        for so, sn in zip(old, new):
+            scope = {}
+            for name, itv in so.items():
+                other = sn.get(name)
+                scope[name] = itv.widen(other) if itv is not None and other is not None else itv
+            widened.append(scope)
+        return widened
+
+    def terminate(self):
+        """Marks the current path as finished; code after it is checked with unknown values."""
+        self.dead = True
+        self.havoc()
+
+    def declare(self, name, itv):
+        self.scopes[-1][name] = itv
+
+    def lookup(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def store(self, name, itv):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                if scope[name] is not None and itv is not None:
+                    scope[name] = itv.as_kind(scope[name].kind)
+                return
+
+    def enter_scope(self):
+        self.scopes.append({})
+
+    def exit_scope(self):
+        self.scopes.pop()
+
+    def clobber_globals(self):
+        # A called function may write any non-constant global
+        for name, itv in self.scopes[0].items():
+            if itv is not None and name not in self.consts:
+                self.scopes[0][name] = Interval.top(itv.kind)
+
+    # ---- diagnostics ----
+
+    def error_location(self, node):
+        """The token SemanticAnalyzer reports for a declaration or expression (its left-most operand)."""
+        while True:
+            if hasattr(node, 'left_n'):
+                node = node.left_n
+            elif type(node).__name__ == 'node_pre_un_op':
+                return node.op_t
+            elif type(node).__name__ == 'node_method_call':
+                return node.method_t
+            else:
+                return node.id_t if hasattr(node, 'id_t') else node.val_t
+
+    def check_range(self, dtype, itv, err_node):
+        if self.quiet or itv is None or dtype not in self.numtypes:
+            return
+        low, high = self.bounds[dtype]
+        if itv.lo > high or itv.hi < low:
+            err_tok = self.error_location(err_node)
+            if itv.is_const():
+                self.logError(f"Value '{itv.lo}' is out of '{dtype}' bounds.", err_tok)
+            self.logError(f"Value range [{itv.lo}, {itv.hi}] is out of '{dtype}' bounds.", err_tok)
+
+    def record_indices(self, node, itvs):
+        """
+        Joins the index intervals of access `node` into its `index_ranges` (see src/bounds.py).
+        Quiet passes run over heads that are not stable yet, so only reporting passes count.
+        """
+        if self.quiet:
+            return
+        seen = getattr(node, 'index_ranges', None)
+        if seen is not None:
+            itvs = [a.join(b) if a is not None and b is not None else None for a, b in zip(seen, itvs)]
+        node.index_ranges = itvs
+
+    # ------------------------------------ STRUCTURE ----------------------------------
+
+    def visit_node_program(self, node):
+        self.declare_globals(node)
+        for func in node.funcs_n:
+            self.check_unit(func)
+        if node.main_n:
+            self.check_unit(node.main_n)
+
+    def declare_globals(self, node):
+        for func in node.funcs_n:
+            self.function_types[func.id_t["tokenName"]] = func.dtype_t["tokenName"]
+
+        for statement in node.globals_n:
+            self.visit_node(statement)
+
+        self.globals_state = self.snapshot()
+        self.globals_arrays = dict(self.array_types)
+
+    def check_unit(self, node):
+        """Checks one function body or lobby; units only share the global declarations."""
+        self.restore(self.globals_state)
+        self.array_types = dict(self.globals_arrays)
+        if type(node).__name__ == 'node_func_dec':
+            # Functions can run at any point, so non-constant globals are unknown on entry
+            self.clobber_globals()
+        self.dead = False
+        self.quiet = 0
+        self.loop_exits = []
+        self.visit_node(node)
+
+    def visit_node_main_func(self, node):
+        self.enter_scope()
+        self.visit_node(node.body_n)
+        self.exit_scope()
+
+    def visit_node_func_dec(self, node):
+        self.enter_scope()
+        for param in node.params_n or []:
+            dtype = param.dtype_t["tokenName"]
+            numeric = dtype in self.numtypes and not param.is_array
+            if param.is_array:
+                self.array_types[param.id_t["tokenName"]] = dtype
+            self.declare(param.id_t["tokenName"], Interval.top(dtype) if numeric else None)
+        self.visit_node(node.body_n)
+        self.exit_scope()
+
+    def visit_node_code_block(self, node):
+        for statement in node.statements_n:
+            self.visit_node(statement)
+
+    # ------------------------------------ DECLARATIONS & ASSIGNMENTS ----------------------------------
+
+    def visit_node_vardec(self, node):
+        dtype = node.dtype_t["tokenName"]
+        name = node.id_t["tokenName"]
+        if dtype not in self.numtypes:
+            if node.init_value_n: self.visit_node(node.init_value_n)
+            self.declare(name, None)
+            return
+
+        if node.init_value_n:
+            itv = self.visit_node(node.init_value_n)
+            itv = itv.as_kind(dtype) if itv is not None else Interval.top(dtype)
+        else:
+            itv = Interval.const(0 if dtype == 'frag' else Decimal('0.0'), dtype)
+
+        self.check_range(dtype, itv, node)
+        self.declare(name, itv)
+        if node.const_b and len(self.scopes) == 1:
+            self.consts.add(name)
+
+    def visit_node_arr_dec(self, node):
+        dtype = node.dtype_t["tokenName"]
+        for size_node in node.sizes_n:
+            self.visit_node(size_node)
+
+        def walk(values):
+            for val_node in values:
+                if isinstance(val_node, list):
+                    walk(val_node)
+                else:
+                    itv = self.visit_node(val_node)
+                    if itv is not None and dtype in self.numtypes:
+                        self.check_range(dtype, itv.as_kind(dtype), val_node)
+
+        if node.init_values_n:
+            walk(node.init_values_n)
+        self.array_types[node.id_t["tokenName"]] = dtype
+        self.declare(node.id_t["tokenName"], None)
+
+    def compound(self, op, current, value, kind):
+        if current is None or value is None:
+            return None
+        if op == '+=': return current.add(value, kind)
+        if op == '-=': return current.sub(value, kind)
+        if op == '*=': return current.mul(value, kind)
+        if op == '/=': return current.div(value, kind)
+        if op == '%=': return current.mod(value, kind)
+        return value
+
+    def visit_node_assign_stmt(self, node):
+        name = node.id_t["tokenName"]
+        current = self.lookup(name)
+        value = self.visit_node(node.value_n)
+        if current is None:
+            return
+
+        kind = current.kind
+        op = node.op_t["tokenName"]
+        if op != '=' and value is not None and value.kind == 'elo':
+            kind = 'elo'
+        result = self.compound(op, current, value, kind) if op != '=' else value
+        result = result.as_kind(current.kind) if result is not None else Interval.top(current.kind)
+
+        self.check_range(current.kind, result, node.value_n)
+        self.store(name, result)
+
+    def visit_node_arr_assign_stmt(self, node):
+        self.record_indices(node.arr_idx_n, [self.visit_node(idx) for idx in node.arr_idx_n.indices_n])
+        value = self.visit_node(node.value_n)
+        if value is None or node.op_t["tokenName"] != '=':
+            return
+        # Only direct stores are checked: array elements themselves are not tracked
+        kind = self.array_types.get(node.arr_idx_n.id_t["tokenName"])
+        if kind in self.numtypes:
+            self.check_range(kind, value.as_kind(kind), node.value_n)
+
+    # ------------------------------------ I/O ----------------------------------
+
+    def visit_node_input(self, node):
+        for target in node.targets_n:
+            if type(target).__name__ == 'node_iden':
+                current = self.lookup(target.id_t["tokenName"])
+                if current is not None:
+                    self.store(target.id_t["tokenName"], Interval.top(current.kind))
+            else:
+                self.visit_node(target)
+
+    def visit_node_output(self, node):
+        for item in node.print_params_n:
+            self.visit_node(item)
+
+    # ------------------------------------ CONTROL FLOW ----------------------------------
+
+    def run_branch(self, pre, body_n, cond_n=None, truth=True):
+        """Analyzes one branch from state `pre`; returns its end state or None when it cannot fall through."""
+        self.restore(pre)
+        self.dead = False
+        if cond_n is not None:
+            self.refine(cond_n, truth)
+        self.enter_scope()
+        self.visit_node(body_n)
+        self.exit_scope()
+        return None if self.dead else self.snapshot()
+
+    def merge(self, states, fallback):
+        result = None
+        for state in states:
+            result = self.join_states(result, state)
+        if result is None:
+            self.restore(fallback)
+            self.terminate()
+        else:
+            self.restore(result)
+            self.dead = False
+
+    def visit_node_if_stmt(self, node):
+        self.visit_node(node.condition_n)
+        pre = self.snapshot()
+        ends = []
+
+        ends.append(self.run_branch(pre, node.body_n, node.condition_n, True))
+        # Falling past a condition means it was false
+        self.restore(pre)
+        self.refine(node.condition_n, False)
+        rest = self.snapshot()
+
+        for elif_stmt in node.else_chain_n or []:
+            self.restore(rest)
+            self.visit_node(elif_stmt.condition_n)
+            cond_pre = self.snapshot()
+            ends.append(self.run_branch(cond_pre, elif_stmt.body_n, elif_stmt.condition_n, True))
+            self.restore(cond_pre)
+            self.refine(elif_stmt.condition_n, False)
+            rest = self.snapshot()
+
+        if node.else_stmt_n:
+            ends.append(self.run_branch(rest, node.else_stmt_n.body_n))
+        else:
+            ends.append(rest)
+
+        self.merge(ends, pre)
+
+    def visit_node_switch_stmt(self, node):
+        self.visit_node(node.value_n)
+        pre = self.snapshot()
+        ends = []
+        for case_stmt in node.cases_n:
+            self.restore(pre)
+            self.visit_node(case_stmt.case_value_n)
+            ends.append(self.run_branch(self.snapshot(), case_stmt.body_n))
+        if node.default_n:
+            ends.append(self.run_branch(pre, node.default_n.body_n))
+        else:
+            ends.append(pre)
+        self.merge(ends, pre)
+
+    def refined(self, state, cond, truth):
+        self.restore(state)
+        self.refine(cond, truth)
+        return self.snapshot()
+
+    def loop_pass(self, node, head):
+        """
+        One trip around the loop from `head`: condition, body, continue points and update.
+        Returns the state reaching the back edge (None if nothing does) and the states at 'afk'.
+        """
+        depth = len(head)
+        self.loop_exits.append({'depth': depth, 'break': [], 'continue': []})
+        self.restore(head)
+        self.dead = False
+
+        if node.loop_type != 'try' and node.condition_n:
+            self.visit_node(node.condition_n)
+            self.refine(node.condition_n, True)
+
+        self.enter_scope()
+        self.visit_node(node.body_n)
+        self.exit_scope()
+        exits = self.loop_exits.pop()
+
+        end = None if self.dead else self.snapshot()
+        for state in exits['continue']:
+            end = self.join_states(end, state)
+
+        if end is not None:
+            self.restore(end)
+            self.dead = False
+            if node.update_n:
+                self.visit_node(node.update_n)
+            if node.loop_type == 'try':
+                self.visit_node(node.condition_n)
+            end = self.snapshot()
+        return end, exits['break']
+
+    def back_edge(self, node, end):
+        if end is None or node.loop_type != 'try':
+            return end
+        return self.refined(end, node.condition_n, True)
+
+    def visit_node_loop_stmt(self, node):
+        self.enter_scope()
+        if node.init_n:
+            for init in (node.init_n if isinstance(node.init_n, list) else [node.init_n]):
+                self.visit_node(init)
+        pre = self.snapshot()
+
+        # Fixpoint with widening, then one narrowing step; diagnostics stay off until the head is stable
+        self.quiet += 1
+        head = pre
+        for _ in range(self.MAX_WIDEN_PASSES):
+            end, _ = self.loop_pass(node, head)
+            new_head = self.widen_states(head, self.join_states(pre, self.back_edge(node, end)))
+            if new_head == head:
+                break
+            head = new_head
+        else:
+            self.restore(head)
+            self.havoc()
+            head = self.snapshot()
+        end, _ = self.loop_pass(node, head)
+        head = self.join_states(pre, self.back_edge(node, end))
+        self.quiet -= 1
+
+        # Final reporting pass over the stable head
+        end, exits = self.loop_pass(node, head)
+        if node.loop_type == 'try':
+            if end is not None:
+                exits.append(self.refined(end, node.condition_n, False))
+        elif node.condition_n:
+            exits.append(self.refined(head, node.condition_n, False))
+
+        self.merge(exits, head)
+        self.exit_scope()
+
+    def visit_node_break_stmt(self, node):
+        if self.loop_exits:
+            exits = self.loop_exits[-1]
+            exits['break'].append(self.snapshot()[:exits['depth']])
+            self.terminate()
+
+    def visit_node_continue_stmt(self, node):
+        if self.loop_exits:
+            exits = self.loop_exits[-1]
+            exits['continue'].append(self.snapshot()[:exits['depth']])
+        self.terminate()
+
+    def visit_node_return_block(self, node):
+        self.visit_node(node.ret_value_n)
+        self.terminate()
+
+    # ------------------------------------ CONDITION REFINEMENT ----------------------------------
+
+    def refine(self, cond, truth):
+        """Narrows variable intervals with what a (side-effect free) condition being `truth` implies."""
+        kind = type(cond).__name__
+        if kind == 'node_pre_un_op' and cond.op_t["tokenName"] == '!':
+            return self.refine(cond.right_n, not truth)
+        if kind != 'node_bi_op':
+            return
+        op = cond.op_t["tokenName"]
+        if (op == '&&' and truth) or (op == '||' and not truth):
+            self.refine(cond.left_n, truth)
+            self.refine(cond.right_n, truth)
+            return
+        if op not in self.relops or not (self.is_pure(cond.left_n) and self.is_pure(cond.right_n)):
+            return
+        if not truth:
+            op = self.negate[op]
+        self.quiet += 1
+        left = self.visit_node(cond.left_n)
+        right = self.visit_node(cond.right_n)
+        self.quiet -= 1
+        if left is None or right is None:
+            return
+        if type(cond.left_n).__name__ == 'node_iden':
+            self.narrow(cond.left_n.id_t["tokenName"], left, op, right)
+        if type(cond.right_n).__name__ == 'node_iden':
+            self.narrow(cond.right_n.id_t["tokenName"], right, self.flip[op], left)
+
+    def narrow(self, name, itv, op, other):
+        step = 1 if itv.kind == 'frag' else 0
+        if op == '<': new = itv.meet(hi=other.hi - step)
+        elif op == '<=': new = itv.meet(hi=other.hi)
+        elif op == '>': new = itv.meet(lo=other.lo + step)
+        elif op == '>=': new = itv.meet(lo=other.lo)
+        elif op == '==': new = itv.meet(lo=other.lo, hi=other.hi)
+        else: return
+        if new.is_empty():
+            # The branch can never be taken; check it with unknown values instead
+            self.havoc()
+            return
+        self.store(name, new)
+
+    def is_pure(self, node):
+        kind = type(node).__name__
+        if kind in ('node_num', 'node_iden', 'node_str', 'node_char', 'node_bool'):
+            return True
+        if kind == 'node_bi_op':
+            return self.is_pure(node.left_n) and self.is_pure(node.right_n)
+        if kind == 'node_pre_un_op':
+            return node.op_t["tokenName"] in ('-', '+', '!') and self.is_pure(node.right_n)
+        if kind == 'node_arr_idx':
+            return all(self.is_pure(idx) for idx in node.indices_n)
+        return False
+
+    # ------------------------------------ EXPRESSIONS ----------------------------------
+
+    def visit_node_num(self, node):
+        if node.dtype == 'frag':
+            return Interval.const(int(node.val_t["tokenName"]), 'frag')
+        return Interval.const(Decimal(node.val_t["tokenName"]), 'elo')
+
+    def visit_node_str(self, node): return None
+    def visit_node_char(self, node): return None
+    def visit_node_bool(self, node): return None
+
+    def visit_node_iden(self, node):
+        itv = self.lookup(node.id_t["tokenName"])
+        return Interval(itv.lo, itv.hi, itv.kind) if itv is not None else None
+
+    def visit_node_arr_idx(self, node):
+        self.record_indices(node, [self.visit_node(idx) for idx in node.indices_n])
+        kind = self.array_types.get(node.id_t["tokenName"])
+        return Interval.top(kind) if kind in self.numtypes else None
+
+    def visit_node_func_call(self, node):
+        for arg in node.args_n:
+            self.visit_node(arg)
+        self.clobber_globals()
+        kind = self.function_types.get(node.id_t["tokenName"])
+        return Interval.top(kind) if kind in self.numtypes else None
+
+    def visit_node_method_call(self, node):
+        for arg in node.args_n:
+            self.visit_node(arg)
+        if node.method_t["tokenName"] == 'count':
+            return Interval(0, INF, 'frag')
+        kind = self.array_types.get(node.id_t["tokenName"])
+        if node.method_t["tokenName"] == 'drop' and kind in self.numtypes:
+            return Interval.top(kind)
+        return None
+
+    def visit_node_bi_op(self, node):
+        left = self.visit_node(node.left_n)
+        right = self.visit_node(node.right_n)
+        op = node.op_t["tokenName"]
+        if left is None or right is None or op not in ('+', '-', '*', '/', '%'):
+            return None
+        kind = 'elo' if 'elo' in (left.kind, right.kind) else 'frag'
+        left, right = left.as_kind(kind), right.as_kind(kind)
+        if op == '+': return left.add(right, kind)
+        if op == '-': return left.sub(right, kind)
+        if op == '*': return left.mul(right, kind)
+        if op == '/': return left.div(right, kind)
+        return left.mod(right, kind)
+
+    def visit_node_pre_un_op(self, node):
+        op = node.op_t["tokenName"]
+        right = self.visit_node(node.right_n)
+        if right is None:
+            return None
+        if op == '-': return right.neg()
+        if op in ('++', '--'):
+            return self.step(node.right_n, right, op)
+        return right
+
+    def visit_node_post_un_op(self, node):
+        left = self.visit_node(node.left_n)
+        if left is None:
+            return None
+        # CodeGen emits the increment first and then reads the variable
+        return self.step(node.left_n, left, node.op_t["tokenName"])
+
+    def step(self, target, current, op):
+        """The value of `target` (currently `current`) after '++' or '--', checked like `target += 1`."""
+        one = Interval.const(1, 'frag')
+        updated = current.add(one, current.kind) if op == '++' else current.sub(one, current.kind)
+        if type(target).__name__ == 'node_iden':
+            self.check_range(current.kind, updated, target)
+            self.store(target.id_t["tokenName"], updated)
+        return updated
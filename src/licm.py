@@ -0,0 +1,253 @@
+from typing import Optional
+
+from .dce import LITERAL_KINDS
+from .fold import literal_value, first_token
+from .loops import Rewriter, child_fields, walk, written_names, calls_functions
+from .semantic import exact_type, node_vardec, node_assign_stmt, node_iden, VAR_TYPE
+
+# ────────────────────────────────────────────────────────────────────────────────
+# TEMPORARIES
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# Passes that cache a value name it `_<prefix><n>`: GGScript identifiers start with a
+# letter, so such a name never meets one from the source.
+
+def expr_key(node) -> Optional[tuple]:
+    """A hashable description of side-effect-free expression `node` (equal keys, equal expressions), or None."""
+    kind = type(node).__name__
+    if kind == 'node_iden':
+        return ('iden', node.id_t["tokenName"])
+    if kind in LITERAL_KINDS:
+        return (kind, node.val_t["tokenName"], getattr(node, 'dtype', None))
+    if kind == 'node_bi_op':
+        left, right = expr_key(node.left_n), expr_key(node.right_n)
+        return (node.op_t["tokenName"], left, right) if left and right else None
+    if kind == 'node_pre_un_op' and node.op_t["tokenName"] not in ('++', '--'):
+        right = expr_key(node.right_n)
+        return ('pre' + node.op_t["tokenName"], right) if right else None
+    if kind == 'node_method_call' and node.method_t["tokenName"] == 'count':
+        return ('count', node.id_t["tokenName"])
+    if kind == 'node_arr_idx':
+        indices = tuple(expr_key(idx) for idx in node.indices_n)
+        return ('index', node.id_t["tokenName"]) + indices if all(indices) else None
+    return None
+
+def temporary(name, expr):
+    """
+    The statements that declare variable `name` holding the value of checked expression
+    `expr`, and its symbol. The value is stored as is: a declaration would cast it.
+    """
+    dtype = expr.static_type
+    token = first_token(expr)
+    id_t, dtype_t = {**token, "tokenName": name}, {**token, "tokenName": dtype}
+    exact = exact_type(expr) == dtype
+    if exact:
+        statements = [node_vardec(dtype_t, id_t, False, expr)]
+    else:
+        statements = [node_vardec(dtype_t, id_t, False, None), node_assign_stmt(id_t, {**token, "tokenName": '='}, expr)]
+    return statements, {"value": None, "dtype": VAR_TYPE[dtype], "const": False, "exact": exact}
+
+def read_temporary(name, symbol, token):
+    """A checked read of the temporary `name` that `temporary` declared with `symbol`."""
+    node = node_iden({**token, "tokenName": name})
+    node.static_type = symbol["dtype"][1]
+    node.symbol = symbol
+    return node
+
+# ────────────────────────────────────────────────────────────────────────────────
+# LOOP-INVARIANT CODE MOTION
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# An expression is invariant in a loop when it only reads variables the loop (init
+# included) never writes, and counts arrays or strings it never resizes, under any of
+# their names (see shared_arrays). Each maximal
+# invariant expression that computes something is evaluated once into an `_invN`
+# temporary declared just before the loop, outer loops first, so an expression leaves
+# every loop it is invariant in.
+#
+# A hoisted expression runs even when the loop body never would, so it must not be able
+# to raise there: no '/' or '%' by anything but a nonzero literal, and no operator on a
+# value of unproven type (a 'frag' read by comsat may hold text). A grind or retry tests
+# its condition on entry, so the condition's unconditional operands may be hoisted
+# regardless, provided no function call in the init or condition could run (and print)
+# before them; such an expression then fails before the init runs instead of after it.
+
+def resized_arrays(node) -> Optional[set]:
+    """
+    Names of the arrays (and strings) `node` may change the count of (writes past the end
+    grow an array), or None when it calls a function, which may grow any array it can reach.
+    """
+    names = set()
+    for item in walk(node):
+        kind = type(item).__name__
+        if kind == 'node_func_call':
+            return None
+        if kind == 'node_arr_dec':
+            names.add(item.id_t["tokenName"])
+        elif kind == 'node_method_call' and item.method_t["tokenName"] != 'count':
+            names.add(item.id_t["tokenName"])
+        elif kind == 'node_arr_assign_stmt':
+            names.add(item.arr_idx_n.id_t["tokenName"])
+        elif kind == 'node_input':
+            names.update(t.id_t["tokenName"] for t in item.targets_n if type(t).__name__ == 'node_arr_idx')
+        elif kind in ('node_pre_un_op', 'node_post_un_op') and item.op_t["tokenName"] in ('++', '--'):
+            target = item.right_n if kind == 'node_pre_un_op' else item.left_n
+            if type(target).__name__ == 'node_arr_idx':
+                names.add(target.id_t["tokenName"])
+    return names
+
+def shared_arrays(unit, global_names) -> frozenset:
+    """
+    Names that may denote the same array as another name of `unit`: when it has array
+    parameters, those (two of them may be bound to one array) and the globals (one may be
+    bound to a global array). Other arrays only have the one name.
+    """
+    params = {param.id_t["tokenName"] for param in getattr(unit, 'params_n', None) or [] if param.is_array}
+    return frozenset(params | set(global_names)) if params else frozenset()
+
+def with_aliases(names, shared):
+    """Array names `names` (or None) with every name of `shared` added once one of them is in it."""
+    if names is None or not names & shared:
+        return names
+    return names | shared
+
+def may_raise(node) -> bool:
+    """Whether evaluating expression `node` can raise once its operands are evaluated."""
+    kind = type(node).__name__
+    if kind in LITERAL_KINDS or kind == 'node_iden':
+        return False
+    if kind == 'node_method_call':
+        return node.method_t["tokenName"] != 'count'
+    if kind == 'node_pre_un_op':
+        op = node.op_t["tokenName"]
+        return op != '!' and (op in ('++', '--') or not exact_type(node.right_n))
+    if kind == 'node_bi_op':
+        op = node.op_t["tokenName"]
+        if op in ('/', '%') and literal_value(node.right_n) in (None, 0):
+            return True
+        return op not in ('&&', '||', '==', '!=') and not (exact_type(node.left_n) and exact_type(node.right_n))
+    # Indexing (a negative index past the start), calls, and '++'/'--'
+    return True
+
+def cannot_raise(node) -> bool:
+    return not any(may_raise(item) for item in walk(node))
+
+class LoopInvariantMotion(Rewriter):
+    """Hoists the invariant expressions of every grind, retry and try loop into temporaries."""
+    def __init__(self, global_names=frozenset()):
+        super().__init__()
+        self.global_names = global_names
+        self.temps = 0
+        # (written names, whether it calls functions, resized arrays or None) of the loop being hoisted from
+        self.loop = (set(), False, None)
+        self.hoisted, self.found = [], {}
+        self.shared = frozenset()
+
+    def hoist_program(self, program):
+        program.funcs_n = self.rewrite(program.funcs_n)
+        self.shared = frozenset()
+        program.main_n = self.rewrite(program.main_n)
+        return self.changes
+
+    def visit_node_func_dec(self, node):
+        self.shared = shared_arrays(node, self.global_names)
+        return super().visit_node_func_dec(node)
+
+    def visit_node_code_block(self, node):
+        statements = []
+        for stmt in node.statements_n:
+            new = self.visit(stmt)
+            if isinstance(new, list):
+                statements.extend(new)
+            else:
+                statements.append(new)
+        node.statements_n = statements
+        return node
+
+    def visit_node_loop_stmt(self, node):
+        """The loop, after the declarations of its temporaries when it has any."""
+        resized = with_aliases(resized_arrays(node), self.shared)
+        self.loop = (written_names(node), resized is None, resized)
+        self.hoisted, self.found = [], {}
+
+        if node.loop_type != 'try':
+            entry = [node.condition_n] + (node.init_n if isinstance(node.init_n, list) else [node.init_n])
+            node.condition_n = self.lift(node.condition_n, not calls_functions(entry))
+        else:
+            node.condition_n = self.lift(node.condition_n, False)
+        self.descend(node.update_n)
+        self.descend(node.body_n)
+        hoisted = self.hoisted
+
+        self.rewrite_children(node)
+        return hoisted + [node] if hoisted else node
+
+    def hoistable(self, node) -> bool:
+        """Whether expression `node` is invariant in the loop and reads something that could vary elsewhere."""
+        written, body_calls, resized = self.loop
+        reads = False
+        for item in walk(node):
+            kind = type(item).__name__
+            if kind == 'node_iden':
+                name = item.id_t["tokenName"]
+                # A called function may assign any global
+                if name in written or (body_calls and name in self.global_names):
+                    return False
+                reads = True
+            elif kind == 'node_method_call':
+                name = item.id_t["tokenName"]
+                if item.method_t["tokenName"] != 'count' or resized is None or name in resized or name in written:
+                    return False
+                reads = True
+            elif kind == 'node_pre_un_op':
+                if item.op_t["tokenName"] in ('++', '--'):
+                    return False
+            elif kind != 'node_bi_op' and kind not in LITERAL_KINDS:
+                return False
+        return reads
+
+    def lift(self, node, certain=False):
+        """`node`, or a read of the temporary holding it once it is hoisted; `certain` if every test evaluates it."""
+        kind = type(node).__name__
+        if kind not in EXPRESSION_KINDS:
+            self.descend(node)
+            return node
+        key = expr_key(node) if kind != 'node_iden' and kind not in LITERAL_KINDS else None
+        if key is not None and getattr(node, 'static_type', None) and self.hoistable(node) \
+                and (certain or cannot_raise(node)):
+            if key not in self.found:
+                self.temps += 1
+                name = f"_inv{self.temps}"
+                statements, symbol = temporary(name, node)
+                self.hoisted.extend(statements)
+                self.found[key] = (name, symbol)
+                self.changes += 1
+            name, symbol = self.found[key]
+            return read_temporary(name, symbol, first_token(node))
+        if kind == 'node_bi_op':
+            node.left_n = self.lift(node.left_n, certain)
+            # The right operand of '&&' and '||' is not always evaluated
+            node.right_n = self.lift(node.right_n, certain and node.op_t["tokenName"] not in ('&&', '||'))
+        else:
+            self.descend(node)
+        return node
+
+    def descend(self, node):
+        """Lifts the expressions below `node`, which stays in place (statements never move)."""
+        if type(node).__name__ == 'node_code_block':
+            for stmt in node.statements_n:
+                self.descend(stmt)
+            return
+        for attr in child_fields(node) or ():
+            setattr(node, attr, self.lift_all(getattr(node, attr)))
+
+    def lift_all(self, val):
+        if isinstance(val, list):
+            return [self.lift_all(item) for item in val]
+        if val is None or child_fields(val) is None:
+            return val
+        return self.lift(val)
+
+# Nodes that are (parts of) expressions
+EXPRESSION_KINDS = frozenset(('node_bi_op', 'node_pre_un_op', 'node_post_un_op', 'node_iden', 'node_arr_idx',
+                              'node_func_call', 'node_method_call')) | LITERAL_KINDS
@@ -0,0 +1,229 @@
+from typing import Optional
+
+from .semantic import exact_type
+
+# ────────────────────────────────────────────────────────────────────────────────
+# AST WALKING
+# ────────────────────────────────────────────────────────────────────────────────
+
+# Node attributes ASTBuilder sets besides the `_n` children, `_t` tokens and `_b` flags
+STRUCTURE_ATTRS = ('loop_type', 'dtype', 'is_array', 'dims')
+
+# Names of the `_n` fields of each node class (every instance sets the same ones); None for non-nodes
+_child_fields = {}
+
+def child_fields(node) -> Optional[tuple]:
+    cls = type(node)
+    if cls not in _child_fields:
+        _child_fields[cls] = tuple(attr for attr in vars(node) if attr.endswith('_n')) if hasattr(node, '__dict__') else None
+    return _child_fields[cls]
+
+def children(node):
+    """The child nodes of `node` (its `_n` fields, nested lists flattened)."""
+    stack = [getattr(node, attr) for attr in child_fields(node)]
+    while stack:
+        item = stack.pop()
+        if type(item) is list:
+            stack.extend(item)
+        elif child_fields(item) is not None:
+            yield item
+
+def walk(node):
+    """`node` and every node below it."""
+    stack = [node]
+    push = stack.append
+    while stack:
+        item = stack.pop()
+        if type(item) is list:
+            stack.extend(item)
+            continue
+        fields = child_fields(item)
+        if fields is None:
+            continue
+        yield item
+        for attr in fields:
+            push(getattr(item, attr))
+
+class Rewriter:
+    """
+    Base for passes that rewrite the AST in place. visit(node) returns the node to put in
+    its place: by default `node` itself, after its children were rewritten in field order.
+    `scopes` follows GGScript's block scoping (units, loops and code blocks open one); the
+    default visitors bind every declared name to None in the innermost scope.
+    """
+    scoped = frozenset(('node_main_func', 'node_func_dec', 'node_code_block', 'node_loop_stmt'))
+
+    def __init__(self):
+        self.scopes = [{}]
+        self.changes = 0
+
+    def visit(self, node):
+        kind = type(node).__name__
+        method = getattr(self, f"visit_{kind}", self.rewrite_children)
+        if kind not in self.scoped:
+            return method(node)
+        self.scopes.append({})
+        node = method(node)
+        self.scopes.pop()
+        return node
+
+    def rewrite(self, val):
+        if isinstance(val, list):
+            return [self.rewrite(item) for item in val]
+        if val is None or child_fields(val) is None:
+            return val
+        return self.visit(val)
+
+    def rewrite_children(self, node):
+        for attr in child_fields(node):
+            setattr(node, attr, self.rewrite(getattr(node, attr)))
+        return node
+
+    def declare(self, name, value=None):
+        self.scopes[-1][name] = value
+
+    def lookup(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def visit_node_func_dec(self, node):
+        for param in node.params_n or []:
+            self.declare(param.id_t["tokenName"])
+        node.body_n = self.visit(node.body_n)
+        return node
+
+    def visit_node_vardec(self, node):
+        self.rewrite_children(node)
+        self.declare(node.id_t["tokenName"])
+        return node
+
+    def visit_node_arr_dec(self, node):
+        self.rewrite_children(node)
+        self.declare(node.id_t["tokenName"])
+        return node
+
+def written_names(node) -> set:
+    """Names of the plain variables `node` may assign, declare, read into or step."""
+    names = set()
+    for item in walk(node):
+        kind = type(item).__name__
+        if kind in ('node_assign_stmt', 'node_vardec'):
+            names.add(item.id_t["tokenName"])
+        elif kind == 'node_input':
+            names.update(t.id_t["tokenName"] for t in item.targets_n if type(t).__name__ == 'node_iden')
+        elif kind in ('node_pre_un_op', 'node_post_un_op') and item.op_t["tokenName"] in ('++', '--'):
+            target = item.right_n if kind == 'node_pre_un_op' else item.left_n
+            if type(target).__name__ == 'node_iden':
+                names.add(target.id_t["tokenName"])
+    return names
+
+def calls_functions(node) -> bool:
+    return any(type(item).__name__ == 'node_func_call' for item in walk(node))
+
+# ────────────────────────────────────────────────────────────────────────────────
+# COUNTED LOOPS
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# A grind is counted when it has the shape `grind (i = start; i REL bound; STEP)`
+# with a 'frag' induction variable the body never writes, a bound that cannot change
+# while the loop runs, and a constant step (i++, i--, i += c, i -= c) heading towards
+# the bound. Such a loop runs exactly the iterations of range(start, stop, step), so
+# the code generators can emit a Python `for` over a range instead of a `while`.
+
+FLIP = {'<': '>', '>': '<', '<=': '>=', '>=': '<='}
+
+class CountedLoop:
+    """
+    The range a counted grind runs: `var` goes over range(var, stop_n + stop_adjust, step),
+    starting from the value the loop's init gave it.
+    """
+    __slots__ = ('var', 'stop_n', 'stop_adjust', 'step')
+
+    def __init__(self, var, stop_n, stop_adjust, step):
+        self.var = var
+        self.stop_n = stop_n
+        self.stop_adjust = stop_adjust
+        self.step = step
+
+def loop_step(update, var) -> Optional[int]:
+    """The constant amount `update` adds to `var`, or None."""
+    kind = type(update).__name__
+    if kind in ('node_pre_un_op', 'node_post_un_op'):
+        target = update.right_n if kind == 'node_pre_un_op' else update.left_n
+        if type(target).__name__ != 'node_iden' or target.id_t["tokenName"] != var:
+            return None
+        return {'++': 1, '--': -1}.get(update.op_t["tokenName"])
+    if kind == 'node_assign_stmt' and update.id_t["tokenName"] == var:
+        op, value = update.op_t["tokenName"], update.value_n
+        if op in ('+=', '-=') and type(value).__name__ == 'node_num' and value.dtype == 'frag':
+            amount = int(value.val_t["tokenName"])
+            return (amount if op == '+=' else -amount) or None
+    return None
+
+def is_fixed_bound(node, var, written, global_names, body_calls) -> bool:
+    """Whether `node` evaluates to the same value, without side effects, on every test of the loop."""
+    kind = type(node).__name__
+    if kind == 'node_num':
+        return True
+    if kind == 'node_iden':
+        name = node.id_t["tokenName"]
+        # A called function may assign any global
+        return name != var and name not in written and not (body_calls and name in global_names)
+    if kind == 'node_bi_op':
+        return node.op_t["tokenName"] in ('+', '-', '*') and \
+            is_fixed_bound(node.left_n, var, written, global_names, body_calls) and \
+            is_fixed_bound(node.right_n, var, written, global_names, body_calls)
+    if kind == 'node_pre_un_op':
+        return node.op_t["tokenName"] == '-' and is_fixed_bound(node.right_n, var, written, global_names, body_calls)
+    return False
+
+def counted_loop(node, global_names=frozenset()) -> Optional[CountedLoop]:
+    """Describes the grind `node` as a counted loop, or returns None if it is not one."""
+    if node.loop_type != "grind" or not node.init_n or not node.condition_n or not node.update_n:
+        return None
+    init = node.init_n
+    if isinstance(init, list):
+        if len(init) != 1:
+            return None
+        init = init[0]
+
+    kind = type(init).__name__
+    if kind == 'node_vardec':
+        # The declaration casts its value to the declared type
+        if init.dtype_t["tokenName"] != 'frag' or init.init_value_n is None:
+            return None
+    elif kind == 'node_assign_stmt':
+        if init.op_t["tokenName"] != '=' or exact_type(init.value_n) != 'frag':
+            return None
+    else:
+        return None
+    var = init.id_t["tokenName"]
+
+    step = loop_step(node.update_n, var)
+    cond = node.condition_n
+    if step is None or type(cond).__name__ != 'node_bi_op':
+        return None
+    op = cond.op_t["tokenName"]
+    if op not in FLIP:
+        return None
+    if type(cond.left_n).__name__ == 'node_iden' and cond.left_n.id_t["tokenName"] == var:
+        bound = cond.right_n
+    elif type(cond.right_n).__name__ == 'node_iden' and cond.right_n.id_t["tokenName"] == var:
+        bound, op = cond.left_n, FLIP[op]
+    else:
+        return None
+    # The step has to head towards the bound, or the loop is not a plain count
+    if (step > 0) != (op in ('<', '<=')):
+        return None
+
+    written = written_names(node.body_n)
+    body_calls = calls_functions(node.body_n)
+    if var in written or (body_calls and var in global_names):
+        return None
+    if exact_type(bound) != 'frag' or not is_fixed_bound(bound, var, written, global_names, body_calls):
+        return None
+
+    stop_adjust = {'<': 0, '>': 0, '<=': 1, '>=': -1}[op]
+    return CountedLoop(var, bound, stop_adjust, step)
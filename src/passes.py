@@ -0,0 +1,204 @@
+import contextlib
+import os
+import time
+from typing import Callable, Dict, List, Tuple
+
+from .bounds import list_arrays
+from .cfg import optimize_unit
+from .cse import SubexpressionEliminator
+from .dce import DeadCodeEliminator
+from .fold import ConstantFolder
+from .inline import Inliner
+from .licm import LoopInvariantMotion
+from .loops import STRUCTURE_ATTRS, counted_loop, walk
+from .purity import memoizable_functions
+from .specialize import Specializer
+from .tailcalls import TailCallEliminator
+
+# ────────────────────────────────────────────────────────────────────────────────
+# PASS REGISTRY
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# A pass takes a checked program AST (as analyze_program returns it), rewrites or
+# annotates it in place and returns how many changes it made. Passes may rely on the
+# analysis annotations (static_type, symbol, index_ranges) and must leave a program
+# that still passes semantic analysis. The AST belongs to the compile that runs the
+# passes: the unit cache keeps its own copies (see check_program).
+#
+# Annotation passes describe the final tree to the code generators, so the levels
+# list them after every pass that rewrites it.
+
+PASSES: Dict[str, Callable] = {}
+
+def register(name):
+    def add(func):
+        PASSES[name] = func
+        return func
+    return add
+
+LEVELS = {
+    0: (),
+    1: ('fold', 'dead_code', 'counted_loops', 'list_arrays'),
+    2: ('fold', 'tail_calls', 'inline', 'dataflow', 'fold', 'dead_code', 'licm', 'cse', 'counted_loops', 'list_arrays'),
+    # Opt-in: memoized functions trade memory for skipped calls, specialized clones code size for folded bodies
+    3: ('fold', 'specialize', 'tail_calls', 'inline', 'dataflow', 'fold', 'dead_code', 'licm', 'cse', 'counted_loops', 'list_arrays', 'memoize'),
+}
+# The passes cost several times what emitting the program does, so compiles opt in to them
+DEFAULT_LEVEL = 0
+
+def units(program) -> list:
+    """The functions and lobby of `program`, in source order."""
+    return list(program.funcs_n) + ([program.main_n] if program.main_n else [])
+
+def global_names(program) -> set:
+    return {glob.id_t["tokenName"] for glob in program.globals_n if hasattr(glob, 'id_t')}
+
+# ────────────────────────────────────────────────────────────────────────────────
+# REWRITE PASSES
+# ────────────────────────────────────────────────────────────────────────────────
+
+@register('fold')
+def fold_constants(program) -> int:
+    """Replaces constant subexpressions and reads of literal 'stun' constants with literals (src/fold.py)."""
+    return ConstantFolder().fold_program(program)
+
+@register('dead_code')
+def eliminate_dead_code(program) -> int:
+    """
+    Drops unreachable statements, constant 'clutch' branches, functions the lobby never
+    calls and unused side-effect-free locals (src/dce.py).
+    """
+    return DeadCodeEliminator().eliminate_program(program, global_names(program))
+
+@register('dataflow')
+def optimize_dataflow(program) -> int:
+    """Copy propagation and dead-store elimination on each unit's control flow graph (src/cfg.py)."""
+    names = global_names(program)
+    return sum(optimize_unit(unit, names) for unit in units(program))
+
+@register('specialize')
+def specialize_calls(program) -> int:
+    """Sends calls with literal arguments to clones of their function folded for them (src/specialize.py)."""
+    return Specializer(global_names(program)).specialize_program(program)
+
+@register('tail_calls')
+def eliminate_tail_calls(program) -> int:
+    """Rewrites self tail calls into parameter rebinding inside a loop (src/tailcalls.py)."""
+    return TailCallEliminator().eliminate_program(program)
+
+@register('inline')
+def inline_calls(program) -> int:
+    """Replaces calls inside loops to small non-recursive functions with their bodies (src/inline.py)."""
+    return Inliner(global_names(program)).inline_program(program)
+
+@register('licm')
+def hoist_invariants(program) -> int:
+    """Moves loop-invariant expressions into temporaries declared before their loop (src/licm.py)."""
+    return LoopInvariantMotion(global_names(program)).hoist_program(program)
+
+@register('cse')
+def eliminate_common_subexpressions(program) -> int:
+    """Computes repeated arithmetic and array reads once per basic block, into temporaries (src/cse.py)."""
+    return SubexpressionEliminator(global_names(program)).eliminate_program(program)
+
+# ────────────────────────────────────────────────────────────────────────────────
+# ANNOTATION PASSES
+# ────────────────────────────────────────────────────────────────────────────────
+
+@register('counted_loops')
+def mark_counted_loops(program) -> int:
+    """Sets `counted` on every grind (src/loops.py); counted ones are emitted as range loops."""
+    names = global_names(program)
+    changes = 0
+    for node in walk(program):
+        if type(node).__name__ == 'node_loop_stmt':
+            node.counted = counted_loop(node, names)
+            changes += node.counted is not None
+    return changes
+
+@register('list_arrays')
+def mark_list_arrays(program) -> int:
+    """
+    Sets `as_list` on the declarations and accesses of arrays that can be plain lists
+    (src/bounds.py). Accesses a pass creates or moves must not carry stale index_ranges.
+    """
+    names = global_names(program)
+    changes = 0
+    for unit in units(program):
+        for node in list_arrays(unit, names):
+            node.as_list = True
+            changes += type(node).__name__ == 'node_arr_dec'
+    return changes
+
+@register('memoize')
+def mark_memoized(program) -> int:
+    """
+    Sets `memo` on every function: True for the pure ones with scalar parameters that
+    recurse or loop (src/purity.py), which CodeGen emits with a cache of their results.
+    """
+    chosen = memoizable_functions(program)
+    for func in program.funcs_n:
+        func.memo = func.id_t["tokenName"] in chosen
+    return len(chosen)
+
+def memoized_functions(program) -> List[str]:
+    """Names of the functions the 'memoize' pass marked, in source order (for reports)."""
+    return [func.id_t["tokenName"] for func in program.funcs_n if getattr(func, 'memo', False)]
+
+# ────────────────────────────────────────────────────────────────────────────────
+# PASS MANAGER
+# ────────────────────────────────────────────────────────────────────────────────
+
+class PassError(Exception):
+    pass
+
+def bare_copy(node):
+    """A copy of the tree under `node` without analysis annotations, as ASTBuilder would build it."""
+    if isinstance(node, list):
+        return [bare_copy(item) for item in node]
+    if not hasattr(node, '__dict__'):
+        return node
+    copy = object.__new__(type(node))
+    fields = vars(copy)
+    for attr, val in vars(node).items():
+        if attr.endswith('_n'):
+            fields[attr] = bare_copy(val)
+        elif attr.endswith(('_t', '_b')) or attr in STRUCTURE_ATTRS:
+            fields[attr] = val
+    return copy
+
+class PassManager:
+    """
+    Runs the passes of optimization level `level` (or an explicit list of pass names)
+    over a checked program. `stats` holds (pass, seconds, changes) for the last run.
+    With debug=True the program is checked again after every pass, and a pass that
+    leaves it failing semantic analysis raises PassError.
+    """
+    def __init__(self, level=DEFAULT_LEVEL, debug=False, passes=None):
+        self.level = level
+        self.passes = list(LEVELS[level] if passes is None else passes)
+        self.debug = debug
+        self.stats: List[Tuple[str, float, int]] = []
+
+    def run(self, program):
+        self.stats = []
+        for name in self.passes:
+            start = time.perf_counter()
+            changes = PASSES[name](program)
+            self.stats.append((name, time.perf_counter() - start, changes))
+            if self.debug:
+                self.verify(name, program)
+        return program
+
+    def verify(self, name, program):
+        from .incremental import check_program
+        # Checked on a fresh copy, so the annotations later passes and CodeGen read stay as they are;
+        # SemanticAnalyzer echoes its errors to the console
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            error = check_program(bare_copy(program), cache=None)
+        if error:
+            raise PassError(f"Pass '{name}' left a program that fails semantic analysis: {error}")
+
+    def report(self) -> str:
+        """One line per pass run: its change count and time."""
+        return "\n".join(f"{name}: {changes} changes, {seconds * 1e3:.2f} ms" for name, seconds, changes in self.stats)
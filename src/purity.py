@@ -0,0 +1,123 @@
+from .loops import walk
+
+# ────────────────────────────────────────────────────────────────────────────────
+# CALL GRAPH
+# ────────────────────────────────────────────────────────────────────────────────
+
+def callees(func) -> set:
+    """Names of the functions `func` calls."""
+    return {item.id_t["tokenName"] for item in walk(func.body_n) if type(item).__name__ == 'node_func_call'}
+
+def recursive_functions(program) -> set:
+    """Names of the functions that can call themselves, directly or through others."""
+    calls = {func.id_t["tokenName"]: callees(func) for func in program.funcs_n}
+    # Tarjan's strongly connected components: a function recurses when its component has a cycle
+    index, low, stack, on_stack, found = {}, {}, [], set(), set()
+    for root in calls:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(calls[root]))]
+        while work:
+            name, edges = work[-1]
+            for callee in edges:
+                if callee not in calls:
+                    continue
+                if callee not in index:
+                    index[callee] = low[callee] = len(index)
+                    stack.append(callee)
+                    on_stack.add(callee)
+                    work.append((callee, iter(calls[callee])))
+                    break
+                if callee in on_stack:
+                    low[name] = min(low[name], index[callee])
+            else:
+                work.pop()
+                if work:
+                    caller = work[-1][0]
+                    low[caller] = min(low[caller], low[name])
+                if low[name] == index[name]:
+                    component = []
+                    while not component or component[-1] != name:
+                        component.append(stack.pop())
+                        on_stack.discard(component[-1])
+                    if len(component) > 1 or name in calls[name]:
+                        found.update(component)
+    return found
+
+# ────────────────────────────────────────────────────────────────────────────────
+# PURITY
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# A function is pure when calling it changes nothing its caller can see and its result
+# only depends on its arguments (the contents of array arguments included): it names no
+# global but 'stun' constants (CodeGen declares every global in every unit, so even a
+# local of that name is the global), neither reads input nor prints, writes no array
+# parameter, and only calls pure functions.
+
+def mutable_globals(program) -> set:
+    return {glob.id_t["tokenName"] for glob in program.globals_n if hasattr(glob, 'id_t') and not glob.const_b}
+
+def locally_pure(func, mutable) -> bool:
+    """Whether `func` is pure provided its callees are."""
+    arrays = {param.id_t["tokenName"] for param in func.params_n or [] if param.is_array}
+    for item in walk(func):
+        kind = type(item).__name__
+        if kind in ('node_input', 'node_output'):
+            return False
+        if kind == 'node_func_call':
+            continue
+        if hasattr(item, 'id_t') and item.id_t["tokenName"] in mutable:
+            return False
+        if kind == 'node_arr_assign_stmt':
+            if item.arr_idx_n.id_t["tokenName"] in arrays:
+                return False
+        elif kind == 'node_method_call':
+            if item.method_t["tokenName"] != 'count' and item.id_t["tokenName"] in arrays:
+                return False
+        elif kind in ('node_pre_un_op', 'node_post_un_op') and item.op_t["tokenName"] in ('++', '--'):
+            target = item.right_n if kind == 'node_pre_un_op' else item.left_n
+            if type(target).__name__ == 'node_arr_idx' and target.id_t["tokenName"] in arrays:
+                return False
+    return True
+
+def pure_functions(program) -> set:
+    """Names of the pure functions of `program` (see above)."""
+    mutable = mutable_globals(program)
+    calls = {func.id_t["tokenName"]: callees(func) for func in program.funcs_n if locally_pure(func, mutable)}
+    # Drop the functions calling one that is not pure until none is left
+    while True:
+        impure = {name for name, called in calls.items() if not called <= calls.keys()}
+        if not impure:
+            return set(calls)
+        for name in impure:
+            del calls[name]
+
+# ────────────────────────────────────────────────────────────────────────────────
+# MEMOIZATION
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# CodeGen gives a memoized function a cache of its results keyed by its arguments
+# (GGScriptMemo). That pays off for pure functions that recurse or loop, which are the
+# ones whose calls are worth skipping, and only works for scalar parameters. 'elo' ones
+# are left out: 0.0 and -0.0 (or 2 and 2.0, which an 'elo' parameter may receive) are
+# equal keys yet print differently.
+
+MEMO_TYPES = frozenset(('frag', 'surebol', 'ign', 'tag'))
+
+def memoizable_functions(program) -> set:
+    """Names of the functions worth a result cache (see above)."""
+    pure = pure_functions(program)
+    recursive = recursive_functions(program)
+    chosen = set()
+    for func in program.funcs_n:
+        name = func.id_t["tokenName"]
+        if name not in pure or func.dtype_t["tokenName"] == 'dodge':
+            continue
+        if any(param.is_array or param.dtype_t["tokenName"] not in MEMO_TYPES for param in func.params_n or []):
+            continue
+        if name in recursive or any(type(item).__name__ == 'node_loop_stmt' for item in walk(func.body_n)):
+            chosen.add(name)
+    return chosen
@@ -0,0 +1,502 @@
+"""
+GGScript runtime: the built-ins compiled programs rely on.
+
+Hosts import this module once and inject runtime_namespace() into the namespace
+compiled programs run in; CodeGen(standalone=True) embeds runtime_source() for
+just the names the program uses instead.
+"""
+import inspect
+import math
+from array import array
+
+# ────────────────────────────────────────────────────────────────────────────────
+# ARRAYS
+# ────────────────────────────────────────────────────────────────────────────────
+
+class GGScriptArray:
+    """
+    A 1-D GGScript array: reads past the end give the dtype default, writes past it grow the array.
+    `sizes` are the declared sizes, used where storage can be laid out up front without changing
+    the length, which stays set by writes (1-D appends are already amortized O(1)).
+    """
+    # Declared sizes above this many cells are not preallocated; such arrays grow on demand
+    prealloc_max = 1 << 20
+    # A write that would grow the array past sparse_min cells, to over dense_ratio times its
+    # current size, switches it to sparse storage (see SPARSE ARRAYS)
+    sparse_min = 1 << 16
+    dense_ratio = 8
+
+    def __init__(self, dtype, dims=1, initial_values=None, sizes=None):
+        self.dtype = dtype
+        self.dims = dims
+        self.default = {'frag': 0, 'elo': 0.0, 'ign': "", 'tag': '', 'surebol': False}.get(dtype, None)
+        
+        self.data = []
+        if initial_values is not None:
+            for val in initial_values:
+                self.data.append(self.init_value(val))
+
+    def prealloc(self, sizes):
+        """Cells worth allocating up front for the declared `sizes` (0 when unknown or too large)."""
+        cells = 1 if sizes else 0
+        for n in sizes or ():
+            cells *= max(n, 0)
+        return cells if cells <= self.prealloc_max else 0
+
+    def init_value(self, val):
+        if self.dtype == 'frag': return int(val)
+        elif self.dtype == 'elo': return float(val)
+        elif self.dtype == 'surebol': return bool(val)
+        else: return str(val)
+
+    def storage(self, values):
+        """Backing storage holding `values` (already coerced)."""
+        return list(values)
+
+    def blank(self, n):
+        """Backing storage holding `n` default elements."""
+        return [self.default] * n
+
+    def append(self, val):
+        if self.dtype == 'frag': val = int(val)
+        elif self.dtype == 'elo': val = float(val)
+        elif self.dtype == 'surebol': val = bool(val)
+        self.data.append(val)
+
+    def pop(self):
+        return self.data.pop() if self.data else self.default
+
+    def insert(self, idx, val):
+        if self.dtype == 'frag': val = int(val)
+        elif self.dtype == 'elo': val = float(val)
+        elif self.dtype == 'surebol': val = bool(val)
+        self.data.insert(idx, val)
+
+    def put(self, index, value):
+        # Store without coercion: the compiler already proved value matches dtype
+        data = self.data
+        if index < len(data): data[index] = value
+        elif index == len(data): data.append(value)
+        else: self.put_far(index, value)
+
+    def is_far(self, cells, needed):
+        """Whether growing from `cells` to `needed` cells for a single write should go sparse instead."""
+        return needed > self.sparse_min and cells * self.dense_ratio < needed
+
+    def put_far(self, index, value):
+        """put() for an index past the end: grows the array, or switches it to sparse storage."""
+        if index >= 0 and self.is_far(len(self), index + 1): GGScriptSparseArray.convert(self)
+        else: self.reserve(index + 1)
+        self.put(index, value)
+
+    def cells(self, start, stop):
+        """Elements start..stop-1 (all below len()), as a sequence."""
+        return self.data[start:stop]
+
+    def reserve(self, n):
+        """Makes indexes below n addressable."""
+        if n > len(self.data): self.data.extend(self.blank(n - len(self.data)))
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        if index >= len(self.data): return self.default
+        return self.data[index]
+    
+    def __setitem__(self, index, value):
+        if self.dtype == 'frag': value = int(value)
+        elif self.dtype == 'elo': value = float(value)
+        self.put(index, value)
+    
+    def __repr__(self):
+        return str(list(self.data))
+
+class GGScriptArray2D(GGScriptArray):
+    """
+    A 2-D GGScript array, indexed with (row, col) tuples and stored row-major in one flat
+    sequence: cell (row, col) lives at row * stride + col. A write past the last column
+    widens every row, so cells that were never written still read as the default.
+    Declared sizes set the stride and room for the declared rows up front, so filling
+    the array never re-lays it out; len() still counts the rows written so far.
+    """
+    def __init__(self, dtype, dims=2, initial_values=None, sizes=None):
+        super().__init__(dtype, dims)
+        rows = [[self.init_value(val) for val in row] for row in initial_values or ()]
+        self.rows = len(rows)
+        self.stride = max((len(row) for row in rows), default=0)
+        capacity = self.rows
+        if self.prealloc(sizes):
+            capacity = max(capacity, sizes[0])
+            self.stride = max(self.stride, sizes[1])
+        self.data = self.blank(capacity * self.stride)
+        for r, row in enumerate(rows):
+            self.data[r * self.stride:r * self.stride + len(row)] = self.storage(row)
+
+    def grow(self, row, col):
+        """Makes (row, col) addressable, re-laying out the rows when the stride changes."""
+        rows, stride = max(self.rows, row + 1), max(self.stride, col + 1)
+        if stride == self.stride:
+            # Rows past self.rows may already be allocated (and blank)
+            if len(self.data) < rows * stride: self.data.extend(self.blank(rows * stride - len(self.data)))
+        else:
+            old, old_stride = self.data, self.stride
+            self.data = self.blank(rows * stride)
+            for r in range(self.rows):
+                self.data[r * stride:r * stride + old_stride] = old[r * old_stride:(r + 1) * old_stride]
+        self.rows, self.stride = rows, stride
+
+    def cell(self, row, col):
+        """Index of (row, col) in data, with negative indexes counting back from the last row and column."""
+        if row < 0: row += self.rows
+        if col < 0: col += self.stride
+        if row < 0 or col < 0: raise IndexError("array index out of range")
+        return row * self.stride + col
+
+    def put(self, index, value):
+        row, col = index
+        if row >= self.rows or col >= self.stride: return self.put_far(index, value)
+        self.data[self.cell(row, col) if row < 0 or col < 0 else row * self.stride + col] = value
+
+    def put_far(self, index, value):
+        row, col = index
+        needed = max(self.rows, row + 1) * max(self.stride, col + 1)
+        if row >= 0 and col >= 0 and self.is_far(self.rows * self.stride, needed): GGScriptSparseArray2D.convert(self)
+        else: self.grow(row, col)
+        self.put(index, value)
+
+    def row(self, r):
+        """The cells of row r, as a sequence of length stride."""
+        return self.data[r * self.stride:(r + 1) * self.stride]
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, index):
+        row, col = index
+        if row >= self.rows or col >= self.stride: return self.default
+        return self.data[self.cell(row, col) if row < 0 or col < 0 else row * self.stride + col]
+
+    def __setitem__(self, index, value):
+        if self.dtype == 'frag': value = int(value)
+        elif self.dtype == 'elo': value = float(value)
+        self.put(index, value)
+
+    def __repr__(self):
+        return str([list(self.row(r)) for r in range(self.rows)])
+# ────────────────────────────────────────────────────────────────────────────────
+# TYPED NUMERIC ARRAYS
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# 'frag' and 'elo' arrays keep their elements unboxed in an array.array and coerce
+# with a class-level `coerce` instead of comparing dtype strings on every store. `pad`
+# is one default element; growing repeats it, and new storage takes its typecode.
+# Frag arithmetic is unbounded while 'q' stops at 64 bits: a store that does not fit
+# turns the array into its list-backed `plain` class in place (as SPARSE ARRAYS do),
+# so every name bound to it follows along.
+
+class GGScriptNumArray(GGScriptArray):
+    pad, coerce = array('q', (0,)), int
+    plain = GGScriptArray
+
+    def __init__(self, dtype, dims=1, initial_values=None, sizes=None):
+        self.dtype = dtype
+        self.dims = dims
+        self.default = self.coerce(0)
+        values = [self.coerce(val) for val in initial_values or ()]
+        try:
+            self.data = self.storage(values)
+        except OverflowError:
+            self.__class__, self.data = self.plain, values
+
+    def widen(self):
+        """Switches to list storage, for a value the typecode cannot hold."""
+        self.__class__ = self.plain
+        self.data = list(self.data)
+
+    def init_value(self, val):
+        return self.coerce(val)
+
+    def storage(self, values):
+        return array(self.pad.typecode, values)
+
+    def blank(self, n):
+        return self.pad * n
+
+    def append(self, val):
+        val = self.coerce(val)
+        try:
+            self.data.append(val)
+        except OverflowError:
+            self.widen()
+            self.data.append(val)
+
+    def insert(self, idx, val):
+        val = self.coerce(val)
+        try:
+            self.data.insert(idx, val)
+        except OverflowError:
+            self.widen()
+            self.data.insert(idx, val)
+
+    def put(self, index, value):
+        data = self.data
+        try:
+            if index < len(data): data[index] = value
+            elif index == len(data): data.append(value)
+            else: self.put_far(index, value)
+        except OverflowError:
+            self.widen()
+            self.put(index, value)
+
+    def __setitem__(self, index, value):
+        data, value = self.data, self.coerce(value)
+        try:
+            if index < len(data): data[index] = value
+            elif index == len(data): data.append(value)
+            else: self.put_far(index, value)
+        except OverflowError:
+            self.widen()
+            self.put(index, value)
+
+class GGScriptFragArray(GGScriptNumArray):
+    pad, coerce = array('q', (0,)), int
+
+class GGScriptEloArray(GGScriptNumArray):
+    pad, coerce = array('d', (0.0,)), float
+
+class GGScriptNumArray2D(GGScriptArray2D):
+    pad, coerce = array('q', (0,)), int
+    plain = GGScriptArray2D
+
+    def __init__(self, dtype, dims=2, initial_values=None, sizes=None):
+        try:
+            super().__init__(dtype, dims, initial_values, sizes)
+        except OverflowError:
+            self.__class__ = self.plain
+            self.__init__(dtype, dims, initial_values, sizes)
+
+    widen = GGScriptNumArray.widen
+    init_value = GGScriptNumArray.init_value
+    storage = GGScriptNumArray.storage
+    blank = GGScriptNumArray.blank
+
+    def put(self, index, value):
+        row, col = index
+        try:
+            if row >= self.rows or col >= self.stride: return self.put_far(index, value)
+            self.data[self.cell(row, col) if row < 0 or col < 0 else row * self.stride + col] = value
+        except OverflowError:
+            self.widen()
+            self.put(index, value)
+
+    def __setitem__(self, index, value):
+        row, col, value = *index, self.coerce(value)
+        try:
+            if row >= self.rows or col >= self.stride: return self.put_far(index, value)
+            self.data[self.cell(row, col) if row < 0 or col < 0 else row * self.stride + col] = value
+        except OverflowError:
+            self.widen()
+            self.put(index, value)
+
+class GGScriptFragArray2D(GGScriptNumArray2D):
+    pad, coerce = array('q', (0,)), int
+
+class GGScriptEloArray2D(GGScriptNumArray2D):
+    pad, coerce = array('d', (0.0,)), float
+
+# ────────────────────────────────────────────────────────────────────────────────
+# SPARSE ARRAYS
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# One far write (a[100000000] = 1) would make a dense array allocate every cell up to
+# it. put_far() converts such an array in place instead: its class becomes one of the
+# classes below, which keep the stored cells in a dict, and `dense` remembers the class
+# to return to once at least 1/dense_ratio of the cells are stored. The object stays the
+# same, so every name bound to it follows along, and len(), default reads and coercion
+# behave exactly as in dense mode.
+
+class GGScriptSparseArray:
+    @staticmethod
+    def convert(arr):
+        """Switches the dense 1-D array `arr` to sparse storage."""
+        cells, length, dense = dict(enumerate(arr.cells(0, len(arr)))), len(arr), type(arr)
+        arr.__class__ = GGScriptSparseArray
+        arr.data, arr.length, arr.dense = cells, length, dense
+
+    def densify(self):
+        arr = self.dense(self.dtype, self.dims)
+        arr.reserve(self.length)
+        for index, value in self.data.items():
+            arr.put(index, value)
+        # arr may have widened to list storage while filling
+        self.__class__ = type(arr)
+        self.__dict__ = arr.__dict__
+
+    def is_dense(self, stored, cells):
+        return stored * self.dense.dense_ratio >= cells
+
+    def put(self, index, value):
+        if index < 0:
+            index += self.length
+            if index < 0: raise IndexError("array assignment index out of range")
+        self.data[index] = value
+        if index >= self.length: self.length = index + 1
+        if self.is_dense(len(self.data), self.length): self.densify()
+
+    def append(self, val):
+        self.insert(self.length, val)
+
+    def pop(self):
+        if not self.length: return self.default
+        self.length -= 1
+        return self.data.pop(self.length, self.default)
+
+    def insert(self, idx, val):
+        # Same position rules as list.insert
+        if self.dtype == 'frag': val = int(val)
+        elif self.dtype == 'elo': val = float(val)
+        elif self.dtype == 'surebol': val = bool(val)
+        idx = min(max(idx + self.length, 0) if idx < 0 else idx, self.length)
+        self.data = {(i + 1 if i >= idx else i): v for i, v in self.data.items()}
+        self.length += 1
+        self.put(idx, val)
+
+    def cells(self, start, stop):
+        return [self.data.get(i, self.default) for i in range(start, stop)]
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if index >= self.length: return self.default
+        if index < 0:
+            index += self.length
+            if index < 0: raise IndexError("array index out of range")
+        return self.data.get(index, self.default)
+
+    def __setitem__(self, index, value):
+        if self.dtype == 'frag': value = int(value)
+        elif self.dtype == 'elo': value = float(value)
+        self.put(index, value)
+
+    def __repr__(self):
+        return str(self.cells(0, self.length))
+
+class GGScriptSparseArray2D:
+    """Sparse counterpart of the 2-D arrays: cells keyed by (row, col), rows x stride as in dense mode."""
+    @staticmethod
+    def convert(arr):
+        cells = {(r, c): val for r in range(arr.rows) for c, val in enumerate(arr.row(r))}
+        rows, stride, dense = arr.rows, arr.stride, type(arr)
+        arr.__class__ = GGScriptSparseArray2D
+        arr.data, arr.rows, arr.stride, arr.dense = cells, rows, stride, dense
+
+    def densify(self):
+        arr = self.dense(self.dtype, self.dims)
+        if self.rows and self.stride: arr.grow(self.rows - 1, self.stride - 1)
+        for index, value in self.data.items():
+            arr.put(index, value)
+        # arr may have widened to list storage while filling
+        self.__class__ = type(arr)
+        self.__dict__ = arr.__dict__
+
+    def put(self, index, value):
+        row, col = index
+        if row < 0 or col < 0: index = row, col = divmod(GGScriptArray2D.cell(self, row, col), self.stride)
+        self.data[index] = value
+        if row >= self.rows: self.rows = row + 1
+        if col >= self.stride: self.stride = col + 1
+        if len(self.data) * self.dense.dense_ratio >= self.rows * self.stride: self.densify()
+
+    def row(self, r):
+        return [self.data.get((r, c), self.default) for c in range(self.stride)]
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, index):
+        row, col = index
+        if row < 0 or col < 0: index = divmod(GGScriptArray2D.cell(self, row, col), self.stride)
+        return self.data.get(index, self.default)
+
+    def __setitem__(self, index, value):
+        if self.dtype == 'frag': value = int(value)
+        elif self.dtype == 'elo': value = float(value)
+        self.put(index, value)
+
+    def __repr__(self):
+        return str([self.row(r) for r in range(self.rows)])
+
+# ────────────────────────────────────────────────────────────────────────────────
+# MEMOIZATION
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# Functions the 'memoize' pass proved pure look their arguments up here on entry and
+# store what they return. The lookup is emitted inline rather than as a wrapper, so a
+# memoized call costs no extra frame (recursion depth stays the same) and works the
+# same in async output. A key of None means the arguments aren't of their declared
+# types, and nothing is stored for it.
+
+class GGScriptMemo(dict):
+    """Results of one function by key, at most `size` of them: a full cache starts over."""
+    __slots__ = ('size',)
+
+    def __init__(self, size):
+        super().__init__()
+        self.size = size
+
+    def store(self, key, value):
+        if key is not None:
+            if len(self) >= self.size:
+                self.clear()
+            self[key] = value
+        return value
+
+# ────────────────────────────────────────────────────────────────────────────────
+# HOST INTERFACE
+# ────────────────────────────────────────────────────────────────────────────────
+
+# Runtime names in the order standalone output defines them, with the names each one needs
+RUNTIME_PIECES = {
+    'math': (),
+    'array': (),
+    'GGScriptSparseArray': (),
+    'GGScriptSparseArray2D': (),
+    'GGScriptArray': ('GGScriptSparseArray',),
+    'GGScriptArray2D': ('GGScriptArray', 'GGScriptSparseArray2D'),
+    'GGScriptNumArray': ('GGScriptArray', 'array'),
+    'GGScriptFragArray': ('GGScriptNumArray',),
+    'GGScriptEloArray': ('GGScriptNumArray',),
+    'GGScriptNumArray2D': ('GGScriptArray2D', 'GGScriptNumArray'),
+    'GGScriptFragArray2D': ('GGScriptNumArray2D',),
+    'GGScriptEloArray2D': ('GGScriptNumArray2D',),
+    'GGScriptMemo': (),
+}
+
+def runtime_namespace():
+    """The globals a compiled program expects to find, ready to merge into its exec namespace."""
+    return {name: globals()[name] for name in RUNTIME_PIECES}
+
+def runtime_source(names=None) -> str:
+    """
+    Source defining the runtime names in `names` and everything they need (all of them when None),
+    for output that has to run without this module.
+    """
+    needed = set(RUNTIME_PIECES if names is None else names)
+    for name in reversed(list(RUNTIME_PIECES)):
+        if name in needed:
+            needed.update(RUNTIME_PIECES[name])
+
+    parts = []
+    for name in RUNTIME_PIECES:
+        if name not in needed:
+            continue
+        obj = globals()[name]
+        if inspect.ismodule(obj):
+            parts.append(f"import {name}\n")
+        elif obj.__module__ != __name__:
+            parts.append(f"from {obj.__module__} import {name}\n")
+        else:
+            parts.append(inspect.getsource(obj))
+    return "\n".join(parts)
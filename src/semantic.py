@@ -235,12 +235,63 @@ class SymbolTable:
         if self.parent:
             self.parent.print_symbol_tree(indent + 1) 
 
+# ────────────────────────────────────────────────────────────────────────────────
+# STATIC TYPE ANNOTATIONS (consumed by CodeGen)
+# ────────────────────────────────────────────────────────────────────────────────
+
+def exact_type(node) -> Optional[str]:
+    """
+    Returns the GGScript type an analyzed expression is guaranteed to produce at runtime
+    (e.g. a Python int for 'frag'), or None when the value may differ from its static type.
+    """
+    static = getattr(node, 'static_type', None)
+    if static is None:
+        return None
+    kind = type(node).__name__
+    if kind in ('node_num', 'node_str', 'node_char', 'node_bool'):
+        return static
+    if kind == 'node_iden':
+        sym = getattr(node, 'symbol', None)
+        return static if sym and sym.get("exact") else None
+    if kind == 'node_arr_idx':
+        # 'frag'/'elo' arrays coerce every write; indexing an 'ign' yields a character
+        sym = getattr(node, 'symbol', None)
+        if sym is None: return None
+        return static if sym["dtype"][0] != 'arr' or static in ('frag', 'elo') else None
+    if kind == 'node_bi_op':
+        if node.op_t["tokenName"] in ('==', '!=', '<', '<=', '>', '>='):
+            return static
+        return static if exact_type(node.left_n) and exact_type(node.right_n) else None
+    if kind == 'node_pre_un_op':
+        if node.op_t["tokenName"] == '!':
+            return static
+        return static if exact_type(node.right_n) else None
+    if kind == 'node_post_un_op':
+        return static if exact_type(node.left_n) else None
+    if kind == 'node_method_call':
+        return static if node.method_t["tokenName"] == 'count' else None
+    return None
+
 # ────────────────────────────────────────────────────────────────────────────────
 # SEMANTIC ANALYZER
 # ────────────────────────────────────────────────────────────────────────────────
 
+# Interned (kind, dtype) type descriptors: LIT_TYPE['frag'] is always the same ('lit', 'frag') tuple
+GG_TYPES = ('frag', 'elo', 'ign', 'surebol', 'tag', 'dodge')
+LIT_TYPE, VAR_TYPE, ARR_TYPE, FUNC_TYPE = ({dtype: (kind, dtype) for dtype in GG_TYPES} for kind in ('lit', 'var', 'arr', 'func'))
+
 class SemanticAnalyzer:
-    numtypes = ['frag', 'elo']
+    numtypes = frozenset(('frag', 'elo'))
+    text_types = frozenset(('ign', 'tag'))
+    switch_types = frozenset(('ign', 'frag', 'tag'))
+    compound_ops = frozenset(('+=', '-=', '*=', '/=', '%='))
+    arith_ops = frozenset(('-', '*', '/', '%'))
+    relational_ops = frozenset(('==', '!=', '<', '<=', '>', '>='))
+    equality_ops = frozenset(('==', '!='))
+    logical_ops = frozenset(('&&', '||'))
+    sign_ops = frozenset(('-', '+'))
+    step_ops = frozenset(('++', '--'))
+    array_methods = frozenset(('stack', 'craft', 'drop', 'count'))
 
     default_vals = { 
         'ign': '',
@@ -257,54 +308,75 @@ class SemanticAnalyzer:
     MIN_ELO = -999999990.0
     MAX_ELO =  999999990.0
 
-    def __init__(self):
+    # Expression nodes that get a 'static_type' annotation for CodeGen
+    expr_nodes = frozenset((node_iden, node_num, node_str, node_bool, node_char, node_bi_op, node_post_un_op, node_pre_un_op, node_arr_idx, node_func_call, node_method_call))
+    call_nodes = frozenset((node_func_call, node_method_call))
+
+    # visit_<nodeName> method per node class, resolved once
+    visitors = {}
+
+    def __init__(self, debug=False):
+        self.debug = debug
         self.curr_scope = SymbolTable() 
         self.errors = []    
         self.loop_depth = 0    
         self.switch_depth = 0  
         self.function_return_stack = [] 
+        self.var_stores = {}
+        self.store_log = None
 
     def interpret(self, node):
             try:
                 self.visit_node(node) 
                 # Success message removed from the error list
-                print("Semantic checking completed successfully. No Semantic Errors found.")
-                print('---------GLOBAL TABLE---------\n\t\t')
-                self.print_symbols(self.curr_scope.syms, indent=2)
+                if self.debug:
+                    print("Semantic checking completed successfully. No Semantic Errors found.")
+                    print('---------GLOBAL TABLE---------\n\t\t')
+                    self.print_symbols(self.curr_scope.syms, indent=2)
             except SemanticError as e:
                 pass
             return self.errors
 
     def enter_scope(self, nodeName): 
-        print(f'\n(semantic)(dbg) ENTERING scope {nodeName}')
+        if self.debug:
+            print(f'\n(semantic)(dbg) ENTERING scope {nodeName}')
         self.curr_scope = SymbolTable(self.curr_scope) 
     
     def exit_scope(self, nodeName):
-        print(f'\n(semantic)(dbg) EXITING scope {nodeName}, table: ')
-        self.print_symbols(self.curr_scope.syms, indent=2)
+        if self.debug:
+            print(f'\n(semantic)(dbg) EXITING scope {nodeName}, table: ')
+            self.print_symbols(self.curr_scope.syms, indent=2)
         self.curr_scope = self.curr_scope.parent
 
     def visit_node(self, node, funcExpectedVal=True):
         if node is None:
             return None
-        nodeName = type(node).__name__
-        visit_func = getattr(self, f'visit_{nodeName}', None)
+        node_cls = type(node)
+        if node_cls not in self.visitors:
+            self.visitors[node_cls] = getattr(SemanticAnalyzer, f'visit_{node_cls.__name__}', None)
+        visit_func = self.visitors[node_cls]
 
         if visit_func is None:
-            print(f"\n(semantic)(dbg) Not implemented yet: {nodeName}")
+            if self.debug:
+                print(f"\n(semantic)(dbg) Not implemented yet: {node_cls.__name__}")
             return None
+
+        if self.debug:
+            print(f'\n(semantic)(dbg) VISITING {node_cls.__name__}!!')
+        if node_cls in self.call_nodes:
+            ret_val = visit_func(self, node, expected_val=funcExpectedVal) 
         else:
-            print(f'\n(semantic)(dbg) VISITING {nodeName}!!')
-            ret_val = None
-            if nodeName in ['node_func_call', 'node_method_call']:
-                ret_val = visit_func(node, expected_val=funcExpectedVal) 
+            ret_val = visit_func(self, node)
+
+        if ret_val and node_cls in self.expr_nodes:
+            dtype = ret_val[0]
+            if dtype[0] == 'arr':
+                node.static_type = None
             else:
-                ret_val = visit_func(node)
-                
-            if nodeName in ['node_iden', 'node_num', 'node_bi_op', 'node_un_op', 'node_post_un_op', 'node_pre_un_op', 'node_arr_idx', 'node_func_call', 'node_method_call']:
-                if ret_val and ret_val[0][1] == 'elo' and ret_val[0][0] in ['var', 'lit']:  
-                    ret_val = (ret_val[0], Decimal(ret_val[1] if ret_val[1] is not None else 0), ret_val[2]) 
-            return ret_val
+                node.static_type = dtype[1]
+                if dtype[1] == 'elo' and not isinstance(ret_val[1], Decimal):
+                    ret_val = (dtype, Decimal(ret_val[1] if ret_val[1] is not None else 0), ret_val[2]) 
+        return ret_val
         
     def print_symbols(self, d, indent=2):
         if isinstance(d, dict):
@@ -339,6 +411,9 @@ class SemanticAnalyzer:
         else: print(d) 
 
     def logError(self, msg, err_n=None): 
+        # Visitors pass locations around as token refs; the ErrorNode is only built on failure
+        if isinstance(err_n, dict):
+            err_n = ErrorNode(err_n["tokenLine"], err_n["tokenCol"], err_n["tokenName"])
         if isinstance(err_n, ErrorNode):
             full_message = f"Semantic Error Ln {err_n.line}, Col {err_n.startCol}: {msg}"
         else:
@@ -351,45 +426,91 @@ class SemanticAnalyzer:
     # ------------------------------------ NODE VISITATION FUNCS ----------------------------------
 
     def visit_node_program(self, node):
-            self.has_main = False
-            
-            for statement in node.globals_n: 
-                self.visit_node(statement)
+            self.declare_globals(node)
 
             for func in node.funcs_n:
                 self.visit_node(func)
 
             if node.main_n:
-                self.has_main = True
-                self.current_function_name = "lobby" 
-                self.function_return_stack.append("frag")
-                self.count_return = 0
-                    
                 self.visit_node(node.main_n)
-                
-                self.function_return_stack.pop()
-                self.current_function_name = None
-            
-            if not self.has_main:
-                self.logError(f"Program must contain a main 'lobby' function.", ErrorNode(1, 1))
+
+            self.finish_program(node)
+
+    # A program is checked as an interface (globals, then each function signature in order)
+    # plus independent top-level units (function bodies and lobby), see incremental.py
+
+    def declare_globals(self, node):
+        for statement in node.globals_n: 
+            self.visit_node(statement)
+
+    def check_unit(self, node):
+        if isinstance(node, node_func_dec):
+            self.check_function_body(node)
+        else:
+            self.visit_node(node)
+
+    def finish_program(self, node):
+        self.has_main = node.main_n is not None
+        if not self.has_main:
+            self.logError(f"Program must contain a main 'lobby' function.", ErrorNode(1, 1))
+
+        self.resolve_exact_types()
+
+    def track_stores(self, sym, exact):
+        sym["exact"] = exact
+        self.var_stores[id(sym)] = (sym, [])
+        if self.store_log is not None:
+            self.store_log.append(('track', sym, exact))
+
+    def record_store(self, sym, op, value_n):
+        if id(sym) in self.var_stores:
+            self.var_stores[id(sym)][1].append((op, value_n))
+            if self.store_log is not None:
+                self.store_log.append(('store', sym, op, value_n))
+
+    def store_is_exact(self, sym, op, value_n):
+        if value_n is None:
+            return False
+        value_type = exact_type(value_n)
+        dtype = sym["dtype"][1]
+        if op == '=' or value_type == dtype:
+            return value_type == dtype
+        return (dtype == 'elo' and value_type == 'frag') or (dtype == 'ign' and value_type == 'tag')
+
+    def resolve_exact_types(self):
+        """Marks the variables whose every store keeps exactly their declared type (greatest fixpoint)."""
+        changed = True
+        while changed:
+            changed = False
+            for sym, stores in self.var_stores.values():
+                if sym["exact"] and not all(self.store_is_exact(sym, op, value_n) for op, value_n in stores):
+                    sym["exact"] = False
+                    changed = True
 
     def visit_node_main_func(self, node):
+        self.current_function_name = "lobby" 
+        self.function_return_stack.append("frag")
+        self.count_return = 0
+
         self.enter_scope("lobby") 
         self.visit_node(node.body_n) 
         self.exit_scope("lobby")
 
+        self.function_return_stack.pop()
+        self.current_function_name = None
+
     def visit_node_code_block(self, node):
         for statement in node.statements_n:
             self.visit_node(statement, funcExpectedVal=False)
 
     def visit_node_vardec(self, node):
-        err_n = ErrorNode(node.id_t["tokenLine"], node.id_t["tokenCol"], node.id_t["tokenName"])
+        err_n = node.id_t
 
         if self.curr_scope.get(node.id_t["tokenName"], False):
             self.logError(f"Symbol '{node.id_t['tokenName']}' has already been declared.", err_n)
             
         const = node.const_b
-        dtype = ('var', node.dtype_t["tokenName"])
+        dtype = VAR_TYPE[node.dtype_t["tokenName"]]
         id_name = node.id_t["tokenName"]
         
         val_type = None
@@ -403,21 +524,23 @@ class SemanticAnalyzer:
         if not val_type and value is None:
             if const:
                 self.logError("Constant ('stun') variables must be initialized.", err_n)
-            val_type = ('lit', dtype[1])   
+            val_type = LIT_TYPE[dtype[1]]   
             value = default_val
 
         self.check_type_and_range("variable", dtype, val_type, value, id_n=node.id_t, err_n=err_n)
         self.curr_scope.set(id_name, value, dtype=dtype, const=const)
+        # Declarations are always emitted with a cast unless the initializer is already exact
+        self.track_stores(self.curr_scope.syms[id_name], exact=True)
 
     def visit_node_arr_dec(self, node):
-            err_n = ErrorNode(node.id_t["tokenLine"], node.id_t["tokenCol"], node.id_t["tokenName"])
+            err_n = node.id_t
             id_name = node.id_t["tokenName"]
             const = node.const_b
             
             if self.curr_scope.get(id_name, checkParent=False):
                 self.logError(f"Symbol '{id_name}' has already been declared.", err_n)
 
-            dtype = ('arr', node.dtype_t["tokenName"])
+            dtype = ARR_TYPE[node.dtype_t["tokenName"]]
             base_val = self.default_vals[dtype[1]]
 
             dim = len(node.sizes_n)
@@ -466,9 +589,13 @@ class SemanticAnalyzer:
             self.curr_scope.set_array(id_name, arr_vals, dtype=dtype, arr_info={'dimension': dim, 'sizes': evaluated_sizes}, const=const)
 
     def visit_node_func_dec(self, node):
+        self.declare_function(node)
+        self.check_function_body(node)
+
+    def declare_function(self, node):
         func_name = node.id_t["tokenName"]
-        err_n = ErrorNode(node.id_t["tokenLine"], node.id_t["tokenCol"])
-        return_type = ('func', node.dtype_t["tokenName"])
+        err_n = node.id_t
+        return_type = FUNC_TYPE[node.dtype_t["tokenName"]]
 
         if self.curr_scope.get(func_name, checkParent=False):
             self.logError(f"Symbol '{func_name}' has already been declared.", err_n)
@@ -476,15 +603,20 @@ class SemanticAnalyzer:
         param_types = []
         if node.params_n: 
             for param in node.params_n:
-                dtype_tuple = ('arr', param.dtype_t["tokenName"]) if param.is_array else ("var", param.dtype_t["tokenName"])
+                dtype_tuple = (ARR_TYPE if param.is_array else VAR_TYPE)[param.dtype_t["tokenName"]]
                 param_types.append({
                     "dtype": dtype_tuple,
                     "dims": param.dims
                 })  
         
-        self.current_function_name = func_name
         self.curr_scope.set_function(func_name, return_type, param_types)
 
+    def check_function_body(self, node):
+        func_name = node.id_t["tokenName"]
+        err_n = node.id_t
+        return_type = FUNC_TYPE[node.dtype_t["tokenName"]]
+        self.current_function_name = func_name
+
         self.enter_scope(f"Function: {func_name}")
         
         if node.params_n:
@@ -493,13 +625,15 @@ class SemanticAnalyzer:
                 if self.curr_scope.get(param_name, checkParent=False):
                     self.logError(f"Parameter '{param_name}' already declared in function '{func_name}'.", err_n)
                 
-                var_dtype = ('arr', param.dtype_t["tokenName"]) if param.is_array else ('var', param.dtype_t["tokenName"])
+                var_dtype = (ARR_TYPE if param.is_array else VAR_TYPE)[param.dtype_t["tokenName"]]
                 
                 # Check if it should be an array or a normal variable in scope
                 if param.is_array:
                     self.curr_scope.set_array(param_name, value=[], dtype=var_dtype, arr_info={'dimension': param.dims, 'sizes': []}, const=False)
                 else:
                     self.curr_scope.set(param_name, value=self.default_vals[var_dtype[1]], dtype=var_dtype, const=False)
+                    # Arguments are passed through uncoerced
+                    self.track_stores(self.curr_scope.syms[param_name], exact=False)
 
         self.function_return_stack.append(return_type[1])
         
@@ -520,7 +654,7 @@ class SemanticAnalyzer:
     def visit_node_assign_stmt(self, node): 
         iden_name = node.id_t["tokenName"]
         iden_symbol = self.curr_scope.get(iden_name)
-        id_err = ErrorNode(node.id_t["tokenLine"], node.id_t["tokenCol"], node.id_t["tokenName"])
+        id_err = node.id_t
         
         if not iden_symbol: 
             self.logError(f"Symbol '{iden_name}' hasn't been declared yet.", id_err)
@@ -535,17 +669,18 @@ class SemanticAnalyzer:
         
         # Handle compound assignments (+=, -=, *=, /=, %=)
         op = node.op_t["tokenName"]
-        if op in ['+=', '-=', '*=', '/=', '%=']:
+        if op in self.compound_ops:
             if iden_symbol["dtype"][1] not in self.numtypes or val_type[1] not in self.numtypes:
-                if not (op == '+=' and iden_symbol["dtype"][1] == 'ign' and val_type[1] in ['ign', 'tag']):
+                if not (op == '+=' and iden_symbol["dtype"][1] == 'ign' and val_type[1] in self.text_types):
                     self.logError(f"Compound assignment '{op}' invalid between '{iden_symbol['dtype'][1]}' and '{val_type[1]}'.", id_err)
 
         self.check_type_and_range("variable", iden_symbol["dtype"], val_type, val, id_n=node.id_t, err_n=val_err)
+        self.record_store(iden_symbol, op, node.value_n)
 
     def visit_node_arr_assign_stmt(self, node):
             arr_name = node.arr_idx_n.id_t["tokenName"]
             arr_symbol = self.curr_scope.get(arr_name) 
-            arr_err = ErrorNode(node.arr_idx_n.id_t["tokenLine"], node.arr_idx_n.id_t["tokenCol"], node.arr_idx_n.id_t["tokenName"])
+            arr_err = node.arr_idx_n.id_t
 
             if not arr_symbol:
                 self.logError(f"Array '{arr_name}' hasn't been declared yet.", arr_err)
@@ -561,6 +696,7 @@ class SemanticAnalyzer:
                     self.logError(f"Symbol '{arr_name}' is not an array.", arr_err)
 
             arr_dim = arr_symbol["arr_info"]["dimension"]
+            node.arr_idx_n.symbol = arr_symbol
 
             if len(node.arr_idx_n.indices_n) != arr_dim:
                 self.logError(f"Array '{arr_name}' is {arr_dim}D but accessed with {len(node.arr_idx_n.indices_n)} indices.", arr_err)
@@ -574,9 +710,9 @@ class SemanticAnalyzer:
 
             # Handle compound assignments (+=, -=, *=, /=, %=)
             op = node.op_t["tokenName"]
-            if op in ['+=', '-=', '*=', '/=', '%=']:
+            if op in self.compound_ops:
                 if arr_symbol["dtype"][1] not in self.numtypes or value_type[1] not in self.numtypes:
-                    if not (op == '+=' and arr_symbol["dtype"][1] == 'ign' and value_type[1] in ['ign', 'tag']):
+                    if not (op == '+=' and arr_symbol["dtype"][1] == 'ign' and value_type[1] in self.text_types):
                         self.logError(f"Compound assignment '{op}' invalid between '{arr_symbol['dtype'][1]}' and '{value_type[1]}'.", arr_err)
 
             self.check_type_and_range("array element", arr_symbol["dtype"], value_type, value, id_n=node.arr_idx_n.id_t, err_n=val_err_n)
@@ -584,7 +720,7 @@ class SemanticAnalyzer:
     def visit_node_func_call(self, node, expected_val):
         func_name = node.id_t["tokenName"]
         func_symbol = self.curr_scope.get(func_name)
-        err_n = ErrorNode(node.id_t["tokenLine"], node.id_t["tokenCol"], node.id_t["tokenName"])
+        err_n = node.id_t
         
         if not func_symbol:
             self.logError(f"Function '{func_name}' hasn't been declared yet.", err_n)
@@ -600,10 +736,10 @@ class SemanticAnalyzer:
         else:
             val = self.default_vals[func_symbol["dtype"][1]]
 
-        return (('lit', f'{func_symbol["dtype"][1]}'), val, err_n) 
+        return (LIT_TYPE[func_symbol["dtype"][1]], val, err_n) 
 
     def check_function_params(self, func_symbol, args, node_id, call_string):
-        err_n = ErrorNode(node_id["tokenLine"], node_id["tokenCol"], node_id["tokenName"])
+        err_n = node_id
         if func_symbol["params"]:
             if len(func_symbol["params"]) != len(args):
                 self.logError(f"{call_string.capitalize()} '{node_id['tokenName']}' expects {len(func_symbol['params'])} parameters, got {len(args)}.", err_n)
@@ -628,41 +764,42 @@ class SemanticAnalyzer:
 
     def visit_node_method_call(self, node, expected_val):
         var_name = node.id_t["tokenName"]
-        target_err = ErrorNode(node.id_t["tokenLine"], node.id_t["tokenCol"], var_name)
+        target_err = node.id_t
         target_sym = self.curr_scope.get(var_name)
         if not target_sym:
             self.logError(f"Symbol '{var_name}' hasn't been declared yet.", target_err) 
         target_type = target_sym["dtype"]
         method_name = node.method_t["tokenName"]
-        err_n = ErrorNode(node.method_t["tokenLine"], node.method_t["tokenCol"], method_name)
+        err_n = node.method_t
 
-        if method_name in ["stack", "craft", "drop", "count"]:
+        if method_name in self.array_methods:
             is_valid_target = (target_type[0] == "arr") or (method_name == "count" and target_type[1] == "ign")
             if not is_valid_target:
                 self.logError(f"Method '{method_name}' is only valid for arrays.", target_err)
             if method_name == "count":
-                return (('lit', 'frag'), 0, err_n)
-            return (('lit', 'dodge'), None, err_n)
+                return (LIT_TYPE['frag'], 0, err_n)
+            return (LIT_TYPE['dodge'], None, err_n)
 
         elif method_name == "split":
             if target_type[1] != "ign":
                 self.logError(f"Method 'split' is only valid for string ('ign') types.", target_err)
-            return (('arr', 'ign'), [], err_n)
+            return (ARR_TYPE['ign'], [], err_n)
 
         self.logError(f"Unknown method '{method_name}'.", err_n)
 
     def visit_node_iden(self, node):
         iden_symbol = self.curr_scope.get(node.id_t["tokenName"])
-        err_n = ErrorNode(node.id_t["tokenLine"], node.id_t["tokenCol"], node.id_t["tokenName"])
+        err_n = node.id_t
         if not iden_symbol:
             self.logError(f"Symbol '{node.id_t['tokenName']}' hasn't been declared yet.", err_n)
         else:
             if iden_symbol["dtype"][0] == 'func':
                 self.logError(f"Symbol '{node.id_t['tokenName']}' is a function and needs to be called '()'.", err_n)
+            node.symbol = iden_symbol
             return (iden_symbol.get("dtype"), iden_symbol.get("value"), err_n)
 
     def visit_node_num(self, node):
-        err_n = ErrorNode(node.val_t["tokenLine"], node.val_t["tokenCol"], node.val_t["tokenName"])
+        err_n = node.val_t
         val = 0
         if node.dtype == "frag":
             val = int(node.val_t["tokenName"])
@@ -672,36 +809,37 @@ class SemanticAnalyzer:
             val = Decimal(node.val_t["tokenName"])
             if val > self.MAX_ELO or val < self.MIN_ELO:
                 self.logError(f"Value {val} is out of 'elo' bounds.", err_n)
-        return (('lit', node.dtype), val, err_n) 
+        return (LIT_TYPE[node.dtype], val, err_n) 
 
     def visit_node_str(self, node):
-        err_n = ErrorNode(node.val_t["tokenLine"], node.val_t["tokenCol"], node.val_t["tokenName"])
+        err_n = node.val_t
         val = str(node.val_t["tokenName"])
         # Only strip quotes if they are actually present
         if len(val) >= 2 and val.startswith('"') and val.endswith('"'):
             val = val[1:-1]
-        return (('lit', 'ign'), val, err_n)
+        return (LIT_TYPE['ign'], val, err_n)
     
     def visit_node_bool(self, node):
-        err_n = ErrorNode(node.val_t["tokenLine"], node.val_t["tokenCol"], node.val_t["tokenName"])
-        return (('lit', 'surebol'), node.val_t["tokenName"] == "buff", err_n)
+        err_n = node.val_t
+        return (LIT_TYPE['surebol'], node.val_t["tokenName"] == "buff", err_n)
 
     def visit_node_char(self, node):
-        err_n = ErrorNode(node.val_t["tokenLine"], node.val_t["tokenCol"], node.val_t["tokenName"])
+        err_n = node.val_t
         val = str(node.val_t["tokenName"])
         # Only strip quotes if they are actually present
         if len(val) >= 2 and val.startswith("'") and val.endswith("'"):
             val = val[1:-1]
-        return (('lit', 'tag'), val, err_n)
+        return (LIT_TYPE['tag'], val, err_n)
 
     def visit_node_arr_idx(self, node): 
             arr_sym = self.curr_scope.get(node.id_t["tokenName"])
-            arr_err = ErrorNode(node.id_t["tokenLine"], node.id_t["tokenCol"], node.id_t["tokenName"])
+            arr_err = node.id_t
             
             if not arr_sym:
                 self.logError(f"Symbol '{node.id_t['tokenName']}' has not been declared.", arr_err)
             
             dtype = arr_sym["dtype"][1]
+            node.symbol = arr_sym
 
             if arr_sym["dtype"][0] != 'arr':
                 # Allow string character indexing like str[0]
@@ -709,7 +847,7 @@ class SemanticAnalyzer:
                     idx_type, idx_val, idx_err = self.visit_node(node.indices_n[0])
                     if idx_type[1] != 'frag':
                         self.logError(f"Expected 'frag' (integer) for string indexing, got '{idx_type[1]}'.", idx_err)
-                    return (('lit', 'tag'), "", arr_err)
+                    return (LIT_TYPE['tag'], "", arr_err)
                 else:
                     self.logError(f"Symbol '{node.id_t['tokenName']}' is not an array.", arr_err)
 
@@ -721,7 +859,7 @@ class SemanticAnalyzer:
                 if idx_type[1] != 'frag':
                     self.logError(f"Expected 'frag' for array index, got '{idx_type[1]}'.", idx_err)
             
-            return (('var', dtype), self.default_vals[dtype], arr_err)
+            return (VAR_TYPE[dtype], self.default_vals[dtype], arr_err)
 
     def visit_node_bi_op(self, node):
         left_type, left_val, left_err = self.visit_node(node.left_n)
@@ -733,23 +871,23 @@ class SemanticAnalyzer:
         left_val = Decimal(left_val) if left_type[1] == 'elo' else int(left_val) if left_type[1] == 'frag' and left_val is not None else left_val
         right_val = Decimal(right_val) if right_type[1] == 'elo' else int(right_val) if right_type[1] == 'frag' and right_val is not None else right_val
 
-        dtype = ('lit', 'frag')
+        dtype = LIT_TYPE['frag']
         if left_type[1] == 'elo' or right_type[1] == 'elo':
-            dtype = ('lit', 'elo')
+            dtype = LIT_TYPE['elo']
 
         op = node.op_t["tokenName"]
 
         if op == '+': 
             if left_type[1] == 'ign':
-                if right_type[1] not in ['ign', 'tag']:
+                if right_type[1] not in self.text_types:
                     self.logError(f"Cannot concatenate 'ign' with '{right_type[1]}'.", right_err)
-                return (('lit', 'ign'), str(left_val or "") + str(right_val or ""), left_err)
+                return (LIT_TYPE['ign'], str(left_val or "") + str(right_val or ""), left_err)
             elif left_type[1] in self.numtypes and right_type[1] in self.numtypes:
                 return (dtype, (left_val or 0) + (right_val or 0), left_err)
             else:
                 self.logError(f"Type mismatch for '+', got {left_type[1]} and {right_type[1]}.", left_err)
 
-        elif op in ['-', '*', '/', '%']:
+        elif op in self.arith_ops:
             if left_type[1] not in self.numtypes or right_type[1] not in self.numtypes:
                 self.logError(f"Type mismatch for '{op}', requires numeric operands.", left_err)
             
@@ -768,25 +906,25 @@ class SemanticAnalyzer:
             elif op == '-': return (dtype, left_val - right_val, left_err)
             elif op == '*': return (dtype, left_val * right_val, left_err)
 
-        elif op in ['==', '!=', '<', '<=', '>', '>=']:
-            if op in ['==', '!=']:
+        elif op in self.relational_ops:
+            if op in self.equality_ops:
                 if left_type[1] != right_type[1]:
                     if not (left_type[1] in self.numtypes and right_type[1] in self.numtypes):
                         self.logError(f"Cannot compare {left_type[1]} with {right_type[1]}.", left_err)
             else:
                 if left_type[1] not in self.numtypes or right_type[1] not in self.numtypes:
                     self.logError(f"Relational '{op}' requires numeric types.", left_err)
-            return (('lit', 'surebol'), None, left_err)
+            return (LIT_TYPE['surebol'], None, left_err)
 
-        elif op in ['&&', '||']:
+        elif op in self.logical_ops:
             if left_type[1] != 'surebol' or right_type[1] != 'surebol':
                 self.logError(f"Logical '{op}' requires 'surebol' operands.", left_err)
-            return (('lit', 'surebol'), None, left_err)
+            return (LIT_TYPE['surebol'], None, left_err)
 
     def visit_node_pre_un_op(self, node):
         right_type, right_val, right_err = self.visit_node(node.right_n)
         op = node.op_t["tokenName"]
-        left_err = ErrorNode(node.op_t["tokenLine"], node.op_t["tokenCol"])
+        left_err = node.op_t
 
         if right_type[0] == 'arr':
             self.logError("Arrays cannot be used as operands.", right_err)
@@ -794,14 +932,14 @@ class SemanticAnalyzer:
         if op == '!':
             if right_type[1] != 'surebol':
                 self.logError(f"Expected 'surebol' for '!', got {right_type[1]}.", right_err)
-            return (('lit', 'surebol'), not right_val, left_err)
+            return (LIT_TYPE['surebol'], not right_val, left_err)
         
-        elif op in ['-', '+']:
+        elif op in self.sign_ops:
             if right_type[1] not in self.numtypes:
                 self.logError(f"Expected numeric type for '{op}', got {right_type[1]}.", right_err)
             return (right_type, -right_val if op == '-' else right_val, left_err)
 
-        elif op in ['++', '--']:
+        elif op in self.step_ops:
             if not hasattr(node.right_n, 'id_t'):
                 self.logError(f"Increment/decrement target must be a variable.", left_err)
             right_sym = self.curr_scope.get(node.right_n.id_t["tokenName"])
@@ -864,7 +1002,7 @@ class SemanticAnalyzer:
         self.switch_depth += 1
         
         switch_type, switch_val, err_n = self.visit_node(node.value_n)
-        if switch_type[1] not in ["ign", "frag", "tag"]:
+        if switch_type[1] not in self.switch_types:
             self.logError("Switch value must be 'ign', 'frag', or 'tag'.", err_n)
         
         case_value_list = []
@@ -914,12 +1052,12 @@ class SemanticAnalyzer:
         self.exit_scope(loop_name)
 
     def visit_node_break_stmt(self, node):
-        err_n = ErrorNode(node.id_t["tokenLine"], node.id_t["tokenCol"], node.id_t["tokenName"])
+        err_n = node.id_t
         if self.loop_depth == 0 and self.switch_depth == 0:
             self.logError("'afk' (break) must be inside a loop or switch.", err_n)
 
     def visit_node_continue_stmt(self, node):
-        err_n = ErrorNode(node.id_t["tokenLine"], node.id_t["tokenCol"], node.id_t["tokenName"])
+        err_n = node.id_t
         if self.loop_depth == 0:
             self.logError("'hop' (continue) must be inside a loop.", err_n)
 
@@ -959,7 +1097,10 @@ class SemanticAnalyzer:
                 self.logError("Input ('comsat') target must be a variable or array element.")
             if isinstance(target, node_iden):
                 sym = self.curr_scope.get(target.id_t["tokenName"])
-                if sym: sym["initialized"] = True
+                if sym:
+                    sym["initialized"] = True
+                    # Console input may come back as int, float or str
+                    self.record_store(sym, '=', None)
 
     def visit_node_output(self, node):
         for item in node.print_params_n:
@@ -977,12 +1118,7 @@ class SemanticAnalyzer:
         elif dtype[1] != val_type[1]:
             self.logError(f"Type Mismatch: expected '{dtype[1]}' for {dec_type} but found '{val_type[1]}'.", err_n)
 
-        if dtype[1] == "frag":
-            if value is not None and type(value) in [int, float, Decimal] and (value > self.MAX_FRAG or value < self.MIN_FRAG):
-                self.logError(f"Value '{value}' is out of 'frag' bounds.", err_n)
-        elif dtype[1] == "elo":
-            if value is not None and type(value) in [int, float, Decimal] and (value > self.MAX_ELO or value < self.MIN_ELO):
-                self.logError(f"Value '{value}' is out of 'elo' bounds.", err_n)
+        # 'frag'/'elo' range checks on stored values are done by IntervalAnalyzer (see intervals.py)
 
     def check_return_in_body(self, node):
         if node is None: return False
@@ -1555,25 +1691,36 @@ class ASTBuilder:
 # MAIN INTEGRATION EXPORT
 # ────────────────────────────────────────────────────────────────────────────────
 
-def analyze_semantics(tokens: List[Token]) -> Tuple[bool, str]:
+def analyze_semantics(tokens: List[Token], workers: int = 1) -> Tuple[bool, str]:
     """
     Main entry point for semantic analysis.
     Consumes tokens, builds an AST, enforces GGScript rules, and returns results.
+    With workers > 1, large programs have their function bodies checked on a process pool.
     """
-    errors: List[SemanticError] = []
+    success, message, _ = analyze_program(tokens, workers=workers)
+    return success, message
+
+def analyze_program(tokens: List[Token], errors: Optional[List[SemanticError]] = None, workers: int = 1) -> Tuple[bool, str, Optional[node_program]]:
+    """
+    Same as analyze_semantics, but also hands back the checked AST.
+    Expression nodes carry the 'static_type' annotations CodeGen uses to skip redundant casts.
+    Recoverable AST building errors are left in `errors` for the caller to report.
+    """
+    if errors is None:
+        errors = []
     
     # 1. Parse tokens into an Abstract Syntax Tree (AST) using the provided GGScript grammer classes
     builder = ASTBuilder(tokens, errors)
     try:
         ast = builder.parse_program()
     except SemanticError:
-        return False, "\n".join(str(e) for e in errors)
-    
-    # 2. Visit AST to enforce detailed semantic rules (types, scopes, definitions)
-    visitor = SemanticAnalyzer()
-    visitor_errors = visitor.interpret(ast)
+        return False, "\n".join(str(e) for e in errors), None
     
-    if visitor.errors:
-        return False, "\n".join(visitor.errors)
+    # 2. Visit AST to enforce detailed semantic rules (types, scopes, definitions) and 'frag'/'elo' ranges,
+    #    one function body at a time; unchanged bodies are served from the unit cache
+    from .incremental import check_program
+    error = check_program(ast, workers=workers)
+    if error:
+        return False, error, None
     
-    return True, "Semantic analysis successful ✓ No errors."
\ No newline at end of file
+    return True, "Semantic analysis successful ✓ No errors.", ast
\ No newline at end of file
@@ -0,0 +1,141 @@
+import copy
+from itertools import islice
+
+from .dce import DeadCodeEliminator, drop_unused_locals
+from .fold import ConstantFolder, literal_value, literal_type
+from .licm import expr_key
+from .loops import walk, written_names
+
+# ────────────────────────────────────────────────────────────────────────────────
+# SPECIALIZATION
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# A call passing literals ('frag', 'elo' or 'surebol' ones of the parameter's own type)
+# to parameters its function never assigns goes to a clone of the function,
+# `_specN_<name>`, whose body reads those literals instead and is then folded and
+# pruned (ConstantFolder, DeadCodeEliminator). The call still passes every argument,
+# so the clone keeps the signature. Calls in a clone are specialized in turn, and calls
+# with the same literals share a clone; a function gets at most SPECIALIZE_LIMIT.
+#
+# When every call to a function passes the same literals, the function itself is
+# folded instead. GGScript has no forward declarations, so the clones of a function
+# follow it, newest first: a clone only calls what precedes its function, the function
+# itself and its newer clones. Calls to a clone placed after the caller go back to the
+# function.
+
+SPECIALIZE_LIMIT = 4
+# Largest function body (in nodes) that is cloned
+SPECIALIZE_BUDGET = 200
+
+class Specializer:
+    """Clones functions for the literal arguments of their calls (see above)."""
+    def __init__(self, global_names=frozenset()):
+        self.global_names = global_names
+        self.program = None
+        self.functions = {}
+        # Every call to each function, and the values of the 'stun' globals
+        self.calls = {}
+        self.constants = {}
+        # (function name, literal arguments) -> clone, or None when the literals fold nothing
+        self.clones = {}
+        self.origin = {}
+        self.counts = {}
+        self.sites = []
+        # Names each function assigns, which its body only loses by folding
+        self.written = {}
+        self.changes = 0
+
+    def specialize_program(self, program):
+        self.program = program
+        self.functions = {func.id_t["tokenName"]: func for func in program.funcs_n}
+        self.record(program)
+        folder = ConstantFolder()
+        program.globals_n = folder.rewrite(program.globals_n)
+        self.constants = folder.scopes[0]
+
+        todo = list(program.funcs_n) + ([program.main_n] if program.main_n else [])
+        while todo:
+            unit = todo.pop()
+            for item in walk(unit.body_n):
+                if type(item).__name__ != 'node_func_call':
+                    continue
+                key = self.key(item)
+                if key is None:
+                    continue
+                if key not in self.clones:
+                    self.clones[key] = self.clone(item, key)
+                    if self.clones[key] is not None:
+                        todo.append(self.clones[key])
+                clone = self.clones[key]
+                if clone is not None:
+                    item.id_t = {**item.id_t, "tokenName": clone.id_t["tokenName"]}
+                    self.sites.append((unit, item))
+                    self.changes += 1
+        self.order()
+        return self.changes
+
+    def record(self, node):
+        for item in walk(node):
+            if type(item).__name__ == 'node_func_call':
+                self.calls.setdefault(self.origin.get(item.id_t["tokenName"], item.id_t["tokenName"]), []).append(item)
+
+    def key(self, call):
+        """The function `call` reaches and the literals it passes to parameters it could specialize, or None."""
+        name = self.origin.get(call.id_t["tokenName"], call.id_t["tokenName"])
+        func = self.functions.get(name)
+        if func is None:
+            return None
+        literals = []
+        for index, (param, arg) in enumerate(zip(func.params_n or [], call.args_n)):
+            value = literal_value(arg)
+            if param.is_array or value is None or literal_type(value) != param.dtype_t["tokenName"]:
+                continue
+            if name not in self.written:
+                self.written[name] = written_names(func.body_n)
+            if param.id_t["tokenName"] not in self.written[name]:
+                literals.append((index, expr_key(arg)))
+        return (name, tuple(literals)) if literals else None
+
+    def clone(self, call, key):
+        """
+        The clone of the function for the literals of `key`, or None if they fold nothing
+        or the limit is hit. When every call passes them the function itself is folded.
+        """
+        name, literals = key
+        func = self.functions[name]
+        if self.counts.get(name, 0) >= SPECIALIZE_LIMIT:
+            return None
+        if len(list(islice(walk(func.body_n), SPECIALIZE_BUDGET + 1))) > SPECIALIZE_BUDGET:
+            return None
+        in_place = all(self.key(site) == key for site in self.calls[name])
+        clone = func if in_place else copy.deepcopy(func)
+        folder = ConstantFolder()
+        folder.scopes = [self.constants, {param.id_t["tokenName"]: None for param in clone.params_n}]
+        for index, _ in literals:
+            folder.declare(clone.params_n[index].id_t["tokenName"], literal_value(call.args_n[index]))
+        clone.body_n = folder.visit(clone.body_n)
+        if not folder.changes:
+            return None
+        DeadCodeEliminator().visit(clone)
+        drop_unused_locals(clone, self.global_names)
+        self.counts[name] = self.counts.get(name, 0) + 1
+        if in_place:
+            return func
+
+        clone_name = f"_spec{len(self.origin) + 1}_{name}"
+        clone.id_t = {**clone.id_t, "tokenName": clone_name}
+        self.origin[clone_name] = name
+        funcs = self.program.funcs_n
+        funcs.insert(funcs.index(func) + 1, clone)
+        self.record(clone)
+        return clone
+
+    def order(self):
+        """Sends the calls to a clone declared after their caller back to its function."""
+        position = {func.id_t["tokenName"]: index for index, func in enumerate(self.program.funcs_n)}
+        for caller, call in self.sites:
+            name = call.id_t["tokenName"]
+            here = position.get(getattr(caller, 'id_t', {}).get("tokenName"), len(position))
+            if name in self.origin and position[name] > here:
+                call.id_t = {**call.id_t, "tokenName": self.origin[name]}
+                self.changes -= 1
@@ -0,0 +1,147 @@
+from typing import Optional
+
+from .fold import make_literal, first_token
+from .licm import temporary, read_temporary
+from .loops import child_fields, walk
+from .semantic import node_loop_stmt, node_code_block, node_assign_stmt, node_break_stmt, node_continue_stmt, \
+    node_return_block, node_str, node_char
+
+# ────────────────────────────────────────────────────────────────────────────────
+# TAIL CALLS
+# ────────────────────────────────────────────────────────────────────────────────
+#
+# A function whose self calls are tail calls runs its body in a `retry (buff)` loop: a
+# tail call assigns the arguments to the parameters and 'hop's to the next pass, and
+# falling off the body 'afk's out of the loop. A tail call is `ggwp f(...)`, or in a
+# 'dodge' function a call statement that is the last thing the function does. Tail
+# calls inside a loop of the body stay calls ('hop' would step that loop), and a body
+# with an 'afk' or 'hop' outside its loops is left alone (they'd start to act on the
+# new loop). Arrays can't be reassigned, so an array argument must be the parameter
+# itself.
+#
+# Semantic analysis doesn't look inside loops for a 'ggwp', so a function with a return
+# type gets one after its loop, which never runs: the body returned on every path.
+
+def outside_loops(node):
+    """The nodes below `node` (statements and expressions) that no loop of it encloses."""
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if type(item) is list:
+            stack.extend(item)
+            continue
+        fields = child_fields(item)
+        if fields is None:
+            continue
+        yield item
+        if type(item).__name__ != 'node_loop_stmt':
+            stack.extend(getattr(item, attr) for attr in fields)
+
+def default_return(dtype, token):
+    """A checked 'ggwp' of the default value of type `dtype`."""
+    if dtype == 'ign':
+        value = node_str({**token, "tokenName": '""'})
+    elif dtype == 'tag':
+        value = node_char({**token, "tokenName": "''"})
+    else:
+        value = make_literal({'frag': 0, 'elo': 0.0, 'surebol': False}[dtype], token)
+    value.static_type = dtype
+    return node_return_block(value)
+
+class TailCallEliminator:
+    """Turns the self tail calls of every function into parameter rebinding in a loop (see above)."""
+    def __init__(self):
+        self.temps = 0
+        self.changes = 0
+        self.func = None
+
+    def eliminate_program(self, program):
+        for func in program.funcs_n:
+            self.convert(func)
+        return self.changes
+
+    def convert(self, func):
+        if any(type(item).__name__ in ('node_break_stmt', 'node_continue_stmt') for item in outside_loops(func.body_n)):
+            return
+        self.func = func
+        before = self.changes
+        self.rewrite_block(func.body_n, func.dtype_t["tokenName"] == 'dodge')
+        if self.changes == before:
+            return
+        body = func.body_n.statements_n
+        token = func.id_t
+        if type(body[-1]).__name__ == 'node_continue_stmt':
+            # The loop goes round anyway
+            body.pop()
+        elif type(body[-1]).__name__ != 'node_return_block':
+            body.append(node_break_stmt({**token, "tokenName": 'afk'}))
+        loop = node_loop_stmt('retry', None, make_literal(True, token), None, node_code_block(body))
+        dtype = func.dtype_t["tokenName"]
+        func.body_n = node_code_block([loop] if dtype == 'dodge' else [loop, default_return(dtype, token)])
+
+    def rewrite_block(self, block, tail):
+        """Rewrites the tail calls in `block`; `tail` when its last statement ends the function."""
+        statements = []
+        for index, stmt in enumerate(block.statements_n):
+            last = index == len(block.statements_n) - 1
+            kind = type(stmt).__name__
+            rebound = None
+            if kind == 'node_return_block' and self.self_call(stmt.ret_value_n):
+                rebound = self.rebind(stmt.ret_value_n)
+            elif kind == 'node_func_call' and self.self_call(stmt):
+                following = None if last else block.statements_n[index + 1]
+                if (tail and last) or (type(following).__name__ == 'node_return_block' and following.ret_value_n is None):
+                    rebound = self.rebind(stmt)
+            elif kind == 'node_if_stmt':
+                branches = [stmt] + list(stmt.else_chain_n or []) + ([stmt.else_stmt_n] if stmt.else_stmt_n else [])
+                for branch in branches:
+                    self.rewrite_block(branch.body_n, tail and last)
+            elif kind == 'node_switch_stmt':
+                for case in list(stmt.cases_n) + ([stmt.default_n] if stmt.default_n else []):
+                    self.rewrite_block(case.body_n, tail and last)
+            if rebound is None:
+                statements.append(stmt)
+            else:
+                statements.extend(rebound)
+                self.changes += 1
+        block.statements_n = statements
+
+    def self_call(self, node) -> bool:
+        return type(node).__name__ == 'node_func_call' and node.id_t["tokenName"] == self.func.id_t["tokenName"]
+
+    def rebind(self, call) -> Optional[list]:
+        """
+        The statements that pass the arguments of self call `call` on to the next pass, or
+        None if it can't be rewritten. Arguments are evaluated in order, and one goes
+        straight into its parameter unless an argument evaluated after it reads that
+        parameter, or it reads a parameter assigned before it.
+        """
+        params = self.func.params_n or []
+        token = first_token(call)
+        reads = []
+        for param, arg in zip(params, call.args_n):
+            if any(type(item).__name__ in ('node_pre_un_op', 'node_post_un_op') and item.op_t["tokenName"] in ('++', '--')
+                   for item in walk(arg)):
+                return None
+            if param.is_array and (type(arg).__name__ != 'node_iden' or arg.id_t["tokenName"] != param.id_t["tokenName"]):
+                return None
+            if not param.is_array and not getattr(arg, 'static_type', None):
+                return None
+            reads.append({item.id_t["tokenName"] for item in walk(arg) if type(item).__name__ == 'node_iden'})
+
+        statements, assigned, pending = [], set(), []
+        for i, (param, arg) in enumerate(zip(params, call.args_n)):
+            name = param.id_t["tokenName"]
+            if param.is_array or (type(arg).__name__ == 'node_iden' and arg.id_t["tokenName"] == name):
+                continue
+            op = {**token, "tokenName": '='}
+            if not reads[i] & assigned and not any(name in later for later in reads[i + 1:]):
+                statements.append(node_assign_stmt({**token, "tokenName": name}, op, arg))
+                assigned.add(name)
+            else:
+                self.temps += 1
+                temp = f"_tail{self.temps}"
+                declared, symbol = temporary(temp, arg)
+                statements.extend(declared)
+                pending.append(node_assign_stmt({**token, "tokenName": name}, op, read_temporary(temp, symbol, token)))
+        return statements + pending + [node_continue_stmt({**token, "tokenName": 'hop'})]
@@ -0,0 +1,57 @@
+"""
+Helpers for the behaviour tests: compile GGScript source through the full pipeline and run
+it on the host runtime, collecting what it prints.
+"""
+import builtins
+import contextlib
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src import incremental
+from src.astgen import AstCodeGen
+from src.codegen import CodeGen
+from src.lexer import Lexer
+from src.passes import PassManager
+from src.runtime import runtime_namespace
+from src.semantic import analyze_program
+
+BACKENDS = (CodeGen, AstCodeGen)
+LEVELS = (0, 1, 2, 3)
+
+def check(source, cache=True):
+    """The checked AST of `source`; cache=False starts from an empty unit cache."""
+    if not cache:
+        incremental._unit_cache.clear()
+    tokens, errors = Lexer(source).make_tokens()
+    assert not errors, [error.as_string() for error in errors]
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        ok, message, ast = analyze_program(tokens, [])
+    assert ok, message
+    return ast
+
+def run(source, backend=CodeGen, level=0, answers=()):
+    """What `source` prints (one string per 'shout'), compiled by `backend` at -O`level`."""
+    ok, code = backend(opt_level=level).compile(check(source))
+    assert ok, code
+    out = []
+    answers = iter(answers)
+    env = {'console_disp': lambda *args: out.append("".join(map(str, args))),
+           'console_insp': lambda prompt='': next(answers), 'builtins': builtins,
+           **runtime_namespace()}
+    exec(code, env)
+    return out
+
+def outputs(source, answers=()):
+    """(backend, level, output) for every backend and optimization level."""
+    return [(backend.__name__, level, run(source, backend, level, answers)) for backend in BACKENDS for level in LEVELS]
+
+def pass_changes(source, level):
+    """Changes each pass of -O`level` makes to `source`, by pass name."""
+    manager = PassManager(level)
+    manager.run(check(source))
+    changes = {}
+    for name, _, count in manager.stats:
+        changes[name] = changes.get(name, 0) + count
+    return changes
@@ -0,0 +1,60 @@
+"""
+Regression programs for exact-type tracking of globals: a store a function body or the
+lobby makes to a global must keep CodeGen from treating that global as exactly typed.
+
+    python -m unittest tests/test_exact_globals.py
+"""
+import builtins
+import contextlib
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.astgen import AstCodeGen
+from src.codegen import CodeGen
+from src.lexer import Lexer
+from src.runtime import runtime_namespace
+from src.semantic import analyze_program
+
+# An 'elo' global given a 'frag' value in the lobby still prints as an 'elo'
+STORE_IN_LOBBY = """
+elo eg = 1.5;
+frag lobby() { eg = 3; elo x = eg; shout(x); ggwp; }
+"""
+
+# 'comsat' may give a 'frag' global a fractional number, the element store truncates it
+INPUT_INTO_GLOBAL = """
+frag g = 2;
+frag lobby() { frag a[2]; comsat g; a[0] = g + 1; shout(a[0]); ggwp; }
+"""
+
+def run(source, codegen, answer=None):
+    tokens, _ = Lexer(source).make_tokens()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        ok, message, ast = analyze_program(tokens, [])
+    assert ok, message
+    ok, code = codegen.compile(ast)
+    assert ok, code
+    out = []
+    env = {'console_disp': lambda *args: out.append("".join(map(str, args))),
+           'console_insp': lambda prompt='': answer, 'builtins': builtins, **runtime_namespace()}
+    exec(code, env)
+    return "".join(out)
+
+class ExactGlobalsTest(unittest.TestCase):
+    def check(self, source, expected, answer=None):
+        for backend in (CodeGen, AstCodeGen):
+            for level in range(4):
+                with self.subTest(backend=backend.__name__, level=level):
+                    self.assertEqual(run(source, backend(opt_level=level), answer), expected)
+
+    def test_store_in_lobby(self):
+        self.check(STORE_IN_LOBBY, "3.0")
+
+    def test_input_into_global(self):
+        self.check(INPUT_INTO_GLOBAL, "3", answer=2.5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Incremental checking (src/incremental.py): cached units replay to the same program as a
+cold check, and only the units an edit touches are checked again.
+
+    python -m pytest tests/test_incremental.py
+"""
+import unittest
+from unittest import mock
+
+from support import check, outputs, run
+from src.semantic import SemanticAnalyzer
+
+PROGRAM = """
+frag g = 3;
+frag K = 7;
+frag G = K * g;
+build frag sq(frag x) {
+    frag y = x * x;
+    ggwp y;
+}
+build elo half(frag x) {
+    elo h = x / 2;
+    g = x;
+    ggwp h;
+}
+build frag twice(frag x) {
+    ggwp sq(x) + sq(x);
+}
+frag lobby() {
+    shout(G);
+    shout(twice(2));
+    shout(half(5));
+    shout(g);
+    ggwp;
+}
+"""
+
+def checked_units(source):
+    """Names of the units checked (not replayed from the cache) while checking `source`."""
+    with mock.patch.object(SemanticAnalyzer, 'check_unit', autospec=True,
+                           side_effect=SemanticAnalyzer.check_unit) as spy:
+        check(source)
+    return [getattr(call.args[1], 'id_t', {"tokenName": 'lobby'})["tokenName"] for call in spy.call_args_list]
+
+class IncrementalTest(unittest.TestCase):
+    def test_global_initializer_reads_global(self):
+        check(PROGRAM, cache=False)
+        for backend, level, out in outputs("frag K = 7; frag G = K * 3; frag lobby() { shout(G); ggwp; }"):
+            with self.subTest(backend=backend, level=level):
+                self.assertEqual(out, ["21"])
+
+    def test_cached_units_replay(self):
+        check(PROGRAM, cache=False)
+        cold = run(PROGRAM)
+        for backend, level, out in outputs(PROGRAM):
+            with self.subTest(backend=backend, level=level):
+                self.assertEqual(out, cold)
+        self.assertEqual(cold, ["21", "8", "2.0", "5"])
+
+    def test_edit_rechecks_only_the_edited_body(self):
+        check(PROGRAM, cache=False)
+        self.assertEqual(checked_units(PROGRAM), [])
+        edited = PROGRAM.replace("frag y = x * x;", "frag y = x * x + 0;")
+        self.assertEqual(checked_units(edited), ['sq'])
+
+    def test_signature_change_rechecks_callers(self):
+        check(PROGRAM, cache=False)
+        edited = PROGRAM.replace("build elo half(frag x)", "build frag half(frag x)").replace("elo h", "frag h")
+        self.assertEqual(checked_units(edited), ['half', 'lobby'])
+
+    def test_global_change_rechecks_readers(self):
+        check(PROGRAM, cache=False)
+        # The lobby reads G, whose initializer reads K
+        self.assertEqual(checked_units(PROGRAM.replace("frag K = 7;", "frag K = 8;")), ['lobby'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,339 @@
+"""
+Optimization passes (src/passes.py): every program prints the same on both backends at
+every -O level as the text backend does at -O0.
+
+    python -m pytest tests/test_passes.py
+"""
+import unittest
+
+from support import outputs, pass_changes, run
+
+class PassesTest(unittest.TestCase):
+    def assert_unchanged(self, source, expected, answers=()):
+        self.assertEqual(run(source, answers=answers), expected)
+        for backend, level, out in outputs(source, answers):
+            with self.subTest(backend=backend, level=level):
+                self.assertEqual(out, expected)
+
+    def assert_optimized(self, source, expected, level, *names, answers=()):
+        """Like assert_unchanged, and each pass in `names` changes the program at -O`level`."""
+        self.assert_unchanged(source, expected, answers)
+        changes = pass_changes(source, level)
+        for name in names:
+            with self.subTest(name=name):
+                self.assertGreater(changes.get(name, 0), 0)
+
+    # ── counted loops (user-039) ──
+
+    def test_hop_runs_the_grind_update(self):
+        self.assert_optimized("""
+frag lobby() {
+    frag i;
+    grind (i = 0; i < 10; i++) { clutch (i % 2 == 0) { i++; hop; } shout(i); }
+    shout(i);
+    frag s = 0;
+    grind (frag j = 0; j < 6; j++) {
+        grind (frag k = 0; k < 3; k++) { clutch (k == 1) { k = 2; s += 10; hop; } s += k; }
+        s += j;
+    }
+    shout(s);
+    ggwp;
+}
+""", ["10", "75"], 1, 'counted_loops')
+
+    # ── constant folding (user-042) ──
+
+    def test_fold_constants_and_stun_reads(self):
+        self.assert_optimized("""
+stun frag H = 2 * 60 * 60;
+stun elo R = 7 / 2;
+frag g = 9 / 3;
+build frag f(frag n) { ggwp n + H; }
+frag lobby() {
+    stun frag K = (3600 % 7) - -3;
+    stun surebol B = nerf;
+    frag x = K * 2;
+    x++;
+    shout(H);
+    shout(R);
+    shout(B);
+    shout(f(K));
+    shout(x + 1 * 3);
+    shout(g / (K - 7));
+    ggwp;
+}
+""", ["7200", "3.0", "False", "7205", "14", "-2"], 1, 'fold')
+
+    # ── dead code elimination (user-043) ──
+
+    def test_dead_code_keeps_reachable_output(self):
+        self.assert_optimized("""
+stun frag DEBUG = 0;
+build frag unused(frag n) { ggwp n * 2; }
+build frag helper2(frag n) { ggwp n + 1; }
+build frag helper(frag n) { ggwp helper2(n); }
+build frag onlydead(frag n) { ggwp n; }
+frag lobby() {
+    frag x = 5;
+    frag y = x * 2;
+    elo unused_e = 3.5;
+    clutch (DEBUG == 1) { shout(onlydead(1)); }
+    clutch (DEBUG == 0) { shout(helper(x)); } choke clutch (x > 2) { shout(2); } choke { shout(3); }
+    clutch (x > 3) { shout(4); } choke clutch (nerf) { shout(5); } choke { shout(7); }
+    grind (frag i = 0; i < 3; i++) {
+        clutch (i == 1) { hop; shout(99); } choke { shout(i); afk; }
+        shout(100);
+    }
+    ggwp;
+    shout(1);
+}
+""", ["6", "4", "0"], 1, 'dead_code')
+
+    # ── dataflow optimizations (user-044) ──
+
+    def test_dataflow_propagates_copies_across_branches(self):
+        self.assert_optimized("""
+frag g = 4;
+build frag pick2(frag n) {
+    frag a = 3;
+    frag b = a;
+    frag c = 0;
+    clutch (n > 2) { c = b + 1; } choke { c = b + 1; }
+    frag d = c * 2;
+    frag unused = d + 5;
+    d = n;
+    ggwp c + d;
+}
+build frag loop(frag n) {
+    frag x = 1;
+    frag y = 0;
+    grind (frag i = 0; i < n; i++) {
+        y = x + i;
+        x = 1;
+    }
+    ggwp x + y;
+}
+frag lobby() {
+    frag q;
+    comsat q;
+    frag k = 5;
+    frag m = k;
+    g = m + 1;
+    shout(pick2(q));
+    shout(loop(q));
+    shout(g * m);
+    ggwp;
+}
+""", ["11", "8", "30"], 2, 'dataflow', answers=[7])
+
+
+    def test_cse_array_read_written_through_parameter_alias(self):
+        self.assert_unchanged("""
+build dodge f(frag a[3], frag b[3]) {
+    frag x = a[0] + 1;
+    b[0] = 9;
+    frag y = a[0] + 1;
+    shout(x);
+    shout(y);
+}
+frag lobby() { frag arr[3]; arr[0] = 1; f(arr, arr); ggwp; }
+""", ["2", "10"])
+
+    def test_cse_array_read_written_through_global(self):
+        self.assert_unchanged("""
+frag G[3] = {1, 2, 3};
+build dodge f(frag a[3]) {
+    frag x = a[0] * 2 + 1;
+    G[0] = 9;
+    frag y = a[0] * 2 + 1;
+    shout(x);
+    shout(y);
+}
+frag lobby() { f(G); ggwp; }
+""", ["3", "19"])
+
+    def test_cse_reuses_repeated_arithmetic(self):
+        self.assert_unchanged("""
+frag lobby() {
+    frag a[4] = {1, 2, 3, 4};
+    frag i = 2;
+    frag x = a[i] * 3 + a[i] * 3;
+    a[1] = 7;
+    frag y = a[i] * 3 - a[1];
+    shout(x);
+    shout(y);
+    ggwp;
+}
+""", ["18", "2"])
+
+    # ── loop-invariant code motion (user-045) ──
+
+    def test_licm_count_resized_through_parameter_alias(self):
+        self.assert_unchanged("""
+build dodge grow(frag a[3], frag b[3]) {
+    frag i = 0;
+    retry (i < a.count()) { clutch (i < 5) { b[i + 3] = i; } i++; }
+    shout(i);
+}
+frag lobby() { frag arr[3] = {1, 2, 3}; grow(arr, arr); ggwp; }
+""", ["8"])
+
+    def test_licm_count_resized_through_global(self):
+        self.assert_unchanged("""
+frag G[3] = {1, 2, 3};
+build dodge grow(frag a[3]) {
+    frag i = 0;
+    retry (i < a.count()) { clutch (i < 5) { G[i + 3] = i; } i++; }
+    shout(i);
+}
+frag lobby() { grow(G); ggwp; }
+""", ["8"])
+
+    def test_licm_hoists_invariant_arithmetic(self):
+        self.assert_unchanged("""
+frag lobby() {
+    frag n = 4;
+    frag k = 3;
+    frag s = 0;
+    grind (frag i = 0; i < n * k; i++) { s += n * k + i; }
+    shout(s);
+    ggwp;
+}
+""", ["210"])
+
+    # ── memoization (user-047) ──
+
+    def test_memoize_pure_functions_only(self):
+        self.assert_optimized("""
+frag depth = 0;
+build frag fib(frag n) {
+    clutch (n < 2) { ggwp n; }
+    ggwp fib(n - 1) + fib(n - 2);
+}
+build frag paths(frag r, frag c) {
+    clutch (r == 0 || c == 0) { ggwp 1; }
+    ggwp paths(r - 1, c) + paths(r, c - 1);
+}
+build frag bump(frag x) {
+    depth = depth + 1;
+    ggwp x + depth;
+}
+build surebol even(frag n) {
+    clutch (n < 2) { ggwp n == 0; }
+    ggwp even(n - 2);
+}
+frag lobby() {
+    frag q;
+    comsat q;
+    shout(fib(18));
+    shout(paths(6, 6));
+    shout(bump(1));
+    shout(bump(1));
+    shout(even(31));
+    shout(fib(q));
+    ggwp;
+}
+""", ["2584", "924", "2", "3", "False", "13"], 3, 'memoize', answers=[7])
+
+    # ── tail calls (user-048) ──
+
+    def test_tail_calls_become_loops(self):
+        self.assert_optimized("""
+build frag gcd(frag a, frag b) {
+    clutch (b == 0) { ggwp a; }
+    ggwp gcd(b, a % b);
+}
+build frag sumto(frag n, frag acc) {
+    clutch (n == 0) { ggwp acc; }
+    ggwp sumto(n - 1, acc + n);
+}
+build dodge countdown(frag n) {
+    clutch (n < 0) { ggwp; }
+    clutch (n % 100 == 0) { shout(n); }
+    countdown(n - 1);
+}
+build frag swap(frag a, frag b, frag k) {
+    clutch (k == 0) { ggwp a * 100 + b; }
+    ggwp swap(b, a, k - 1);
+}
+build frag fact(frag n) {
+    clutch (n <= 1) { ggwp 1; }
+    ggwp n * fact(n - 1);
+}
+frag lobby() {
+    shout(gcd(1071, 462));
+    shout(sumto(300, 0));
+    countdown(300);
+    shout(swap(1, 2, 3));
+    shout(fact(10));
+    ggwp;
+}
+""", ["21", "45150", "300", "200", "100", "0", "201", "3628800"], 2, 'tail_calls')
+
+    # ── inlining (user-049) ──
+
+    def test_inline_small_functions(self):
+        self.assert_optimized("""
+frag g = 0;
+build frag sq(frag x) { ggwp x * x; }
+build frag clampv(frag v, frag lo, frag hi) {
+    clutch (v < lo) { ggwp lo; }
+    clutch (v > hi) { ggwp hi; }
+    ggwp v;
+}
+build dodge bump(frag arr[3], frag k) { arr[k % 3] = arr[k % 3] + 1; g = g + k; }
+build elo half(elo e) { ggwp e / 2; }
+frag lobby() {
+    frag s = 0;
+    frag q;
+    comsat q;
+    frag a[3] = {0, 0, 0};
+    elo t = 0.0;
+    grind (frag i = 0; i < 6; i++) {
+        s = s + sq(i) + clampv(i, 3, q);
+        bump(a, i);
+        t += half(i);
+    }
+    shout(s);
+    shout(a[0]);
+    shout(g);
+    shout(t);
+    ggwp;
+}
+""", ["75", "2", "15", "6.0"], 2, 'inline', answers=[4])
+
+    # ── specialization (user-050) ──
+
+    def test_specialize_on_constant_arguments(self):
+        self.assert_optimized("""
+build frag power(frag x, frag n) {
+    clutch (n == 0) { ggwp 1; }
+    ggwp x * power(x, n - 1);
+}
+build dodge drawRow(frag n, surebol fancy) {
+    ign row = "";
+    grind (frag i = 0; i < n; i++) {
+        clutch (fancy) { row += "*"; } choke { row += "-"; }
+    }
+    shout(row);
+}
+build elo scale(elo v, frag mode) {
+    pick (mode) { role 0: ggwp v; role 1: ggwp v * 2.0; noob: ggwp v / 2.0; }
+    ggwp v;
+}
+frag lobby() {
+    frag q;
+    comsat q;
+    shout(power(q, 3));
+    shout(power(3, q % 5));
+    shout(power(2, 10));
+    drawRow(8, buff);
+    drawRow(5, nerf);
+    drawRow(q % 7, buff);
+    grind (frag i = 0; i < 3; i++) { shout(scale(1.5, i)); shout(scale(2.5, 1)); }
+    ggwp;
+}
+""", ["343", "9", "1024", "********", "-----", "", "1.5", "5.0", "3.0", "5.0", "0.0", "5.0"], 3, 'specialize', answers=[7])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Runtime arrays (src/runtime.py): typed and 2-D storage read and write like the plain
+list-backed arrays programs were written against.
+
+    python -m pytest tests/test_runtime_arrays.py
+"""
+import unittest
+
+from support import outputs
+from src.runtime import GGScriptArray, GGScriptArray2D, GGScriptEloArray, GGScriptFragArray, GGScriptFragArray2D
+
+BIG = 2 ** 70
+
+class RuntimeArraysTest(unittest.TestCase):
+    def assert_prints(self, source, expected):
+        for backend, level, out in outputs(source):
+            with self.subTest(backend=backend, level=level):
+                self.assertEqual(out, expected)
+
+    # ── typed storage (user-035) ──
+
+    def test_frag_array_past_int64(self):
+        self.assert_prints("""
+frag lobby() {
+    frag f[26];
+    frag m[2][2];
+    f[0] = 1;
+    grind (frag i = 1; i < 26; i++) { f[i] = f[i - 1] * i; }
+    m[1][1] = f[25];
+    shout(f[25]);
+    shout(m[1][1] / f[24]);
+    ggwp;
+}
+""", ["15511210043330985984000000", "25"])
+
+    def test_frag_array_widens_in_place(self):
+        stores = {
+            'put': lambda a: a.put(1, BIG),
+            'setitem': lambda a: a.__setitem__(1, BIG),
+            'append': lambda a: a.append(BIG),
+            'insert': lambda a: a.insert(0, BIG),
+        }
+        for name, store in stores.items():
+            with self.subTest(store=name):
+                a = GGScriptFragArray('frag', 1, [1, 2])
+                alias = a
+                store(a)
+                self.assertIs(type(alias), GGScriptArray)
+                self.assertIn(BIG, alias.data)
+                a.put(5, 3)
+                self.assertEqual(a[5], 3)
+                self.assertEqual(a[4], 0)
+
+        self.assertEqual(GGScriptFragArray('frag', 1, [BIG, 1]).data, [BIG, 1])
+
+    def test_frag_array_2d_widens_in_place(self):
+        a = GGScriptFragArray2D('frag', 2, sizes=(2, 2))
+        a[1, 1] = BIG
+        a.put((0, 3), 4)
+        self.assertIs(type(a), GGScriptArray2D)
+        self.assertEqual(repr(a), f"[[0, 0, 0, 4], [0, {BIG}, 0, 0]]")
+        self.assertEqual(GGScriptFragArray2D('frag', 2, [[1], [BIG]])[1, 0], BIG)
+
+    def test_sparse_frag_array_densifies_to_list_storage(self):
+        a = GGScriptFragArray('frag')
+        a.put(100000, BIG)
+        a.insert(0, 1)
+        for i in range(1, 100001):
+            a.put(i, i)
+        self.assertIs(type(a), GGScriptArray)
+        self.assertEqual((a[0], a[100001], len(a)), (1, BIG, 100002))
+
+    # ── 2-D storage (user-035) ──
+
+    def test_2d_negative_indexes_count_from_the_end(self):
+        self.assert_prints("""
+frag lobby() {
+    frag a[2][3];
+    frag k = 1;
+    a[1][2] = 5;
+    shout(a[1][k - 2]);
+    a[k - 2][0] = 7;
+    shout(a[1][0]);
+    shout(a[0][0]);
+    ggwp;
+}
+""", ["5", "7", "0"])
+
+    def test_2d_negative_indexes_dense_and_sparse(self):
+        for cls in (GGScriptArray2D, GGScriptFragArray2D):
+            with self.subTest(cls=cls.__name__):
+                a = cls('frag', 2, sizes=(2, 3))
+                a[1, 2] = 5
+                a[-1, 0] = 7
+                a.put((0, -1), 4)
+                self.assertEqual(repr(a), "[[0, 0, 4], [7, 0, 5]]")
+                self.assertEqual(a[-2, -1], 4)
+                with self.assertRaises(IndexError):
+                    a[-3, 0]
+
+                far = cls('frag', 2)
+                far.put((100000, 100000), 1)
+                self.assertEqual(type(far).__name__, 'GGScriptSparseArray2D')
+                far[-1, 0] = 3
+                self.assertEqual((far[-1, -1], far[100000, 0]), (1, 3))
+
+    # ── preallocation (user-037) ──
+
+    def test_declared_2d_sizes_are_allocated_up_front(self):
+        a = GGScriptFragArray2D('frag', 2, sizes=(3, 4))
+        data = a.data
+        self.assertEqual((len(a), len(data)), (0, 12))
+        for r in range(3):
+            for c in range(4):
+                a.put((r, c), r * c)
+        self.assertIs(a.data, data)
+        self.assertEqual((len(a), a[2, 3]), (3, 6))
+
+        huge = GGScriptFragArray2D('frag', 2, sizes=(1 << 20, 1 << 20))
+        self.assertEqual(len(huge.data), 0)
+
+    # ── sparse storage (user-038) ──
+
+    def test_far_writes(self):
+        self.assert_prints("""
+frag lobby() {
+    frag a[3] = {1, 2, 3};
+    a[1000000] = 5;
+    shout(a.count());
+    shout(a[1000000] + a[2] + a[999999]);
+    elo m[2][2];
+    m[500][700] = 1.5;
+    shout(m.count());
+    shout(m[500][700] + m[499][699]);
+    frag d[4][5];
+    grind (frag i = 0; i < 4; i++) { grind (frag j = 0; j < 5; j++) { d[i][j] = i * j; } }
+    shout(d.count());
+    shout(d[3][4]);
+    ggwp;
+}
+""", ["1000001", "8", "501", "1.5", "4", "12"])
+
+    def test_far_write_goes_sparse_and_back(self):
+        a = GGScriptEloArray('elo', 1, [1.0])
+        a.put(1000000, 2.5)
+        self.assertEqual(type(a).__name__, 'GGScriptSparseArray')
+        self.assertEqual((len(a), a[1000000], a[7]), (1000001, 2.5, 0.0))
+        a[3] = 4
+        self.assertEqual(a[3], 4.0)
+        for i in range(0, 1000000, 7):
+            a.put(i, 1.0)
+        self.assertIs(type(a), GGScriptEloArray)
+        self.assertEqual((len(a), a[1000000], a[3], a[14]), (1000001, 2.5, 4.0, 1.0))
+
+if __name__ == '__main__':
+    unittest.main()